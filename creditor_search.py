@@ -0,0 +1,166 @@
+"""
+Borçlu Arama Modülü
+Borçlu adlarını bellekte Türkçe harf katlamasıyla dizinler; arama SQLite'a gitmez.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Benzerlik aramasında Türkçe harfler ve şapkalı harfler yalın karşılıklarına indirgenir
+# ("Yılmaz" ≈ "Yilmaz", "Çelik" ≈ "Celik")
+_LOOSE_LETTERS = str.maketrans('ıçğöşüâîû', 'icgosuaiu')
+
+def turkish_casefold(text: str) -> str:
+    """Metni Türkçe kurallarına göre küçük harfe çevir (İ→i, I→ı)"""
+    return text.replace('İ', 'i').replace('I', 'ı').lower()
+
+def trigrams(text: str) -> Set[str]:
+    """Metnin üçlü harf dizilerini getir"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def fuzzy_trigrams(text: str) -> Set[str]:
+    """Benzerlik için kelime bazlı üçlüler: harfler yalınlaştırılır, kelimeler boşlukla doldurulur"""
+    words = re.findall(r'\w+', turkish_casefold(text).translate(_LOOSE_LETTERS))
+    return set(chain.from_iterable(trigrams(f"  {word} ") for word in words))
+
+def similarity(first: str, second: str) -> float:
+    """İki adın trigram benzerliği (Jaccard, 0-1 arası)"""
+    first_grams, second_grams = fuzzy_trigrams(first), fuzzy_trigrams(second)
+    if not first_grams or not second_grams:
+        return 0.0
+    shared = len(first_grams & second_grams)
+    return shared / (len(first_grams) + len(second_grams) - shared)
+
+class CreditorSearchIndex:
+    """Borçlu adları için bellekte tutulan üçlü harf (trigram) dizini
+
+    Borçlular liste sırasıyla (ada göre) tutulur ve sonuçlar bu sırada döner.
+    Arama, katlanmış adda alt dize olarak yapılır (önek de alt dizedir). Üç ve
+    daha uzun sorgularda adaylar trigram dizininden gelir; sorgu bir önceki
+    sorguyu içeriyorsa yalnızca önceki sonuçlar daraltılır. Dizin tek iş
+    parçacığından (arayüz) kullanılır.
+
+    Yazım farklılıkları için ayrıca yalınlaştırılmış kelime üçlülerinden bir
+    benzerlik dizini tutulur ("Mehmet Yilmaz", "M. Yılmaz" → "Mehmet Yılmaz").
+    """
+
+    def __init__(self):
+        self._entries: List[Dict[str, Any]] = []
+        self._rank: Dict[int, int] = {}
+        self._folded: Dict[int, str] = {}
+        # Liste sırasıyla katlanmış adlar (kısa sorgularda doğrudan taranır)
+        self._folded_list: List[str] = []
+        self._grams: Dict[str, Set[int]] = defaultdict(set)
+        self._fuzzy_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._fuzzy_size: Dict[int, int] = {}
+        self._last_query: Optional[str] = None
+        self._last_ranks: Optional[List[int]] = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add_name(self, creditor_id: int, name: str):
+        folded = turkish_casefold(name)
+        self._folded[creditor_id] = folded
+        for gram in trigrams(folded):
+            self._grams[gram].add(creditor_id)
+        fuzzy_grams = fuzzy_trigrams(name)
+        self._fuzzy_size[creditor_id] = len(fuzzy_grams)
+        for gram in fuzzy_grams:
+            self._fuzzy_grams[gram].add(creditor_id)
+
+    def _remove_name(self, creditor_id: int, name: str):
+        folded = self._folded.pop(creditor_id)
+        for gram in trigrams(folded):
+            ids = self._grams[gram]
+            ids.discard(creditor_id)
+            if not ids:
+                del self._grams[gram]
+        del self._fuzzy_size[creditor_id]
+        for gram in fuzzy_trigrams(name):
+            ids = self._fuzzy_grams[gram]
+            ids.discard(creditor_id)
+            if not ids:
+                del self._fuzzy_grams[gram]
+
+    def set_creditors(self, creditors: Iterable[Dict[str, Any]]):
+        """Ada göre sıralı borçlu listesini dizine al; yalnızca eklenen, silinen ve adı değişenler yeniden dizinlenir"""
+        creditors = list(creditors)
+        old_names = {c['id']: c['name'] for c in self._entries}
+        names = {c['id']: c['name'] for c in creditors}
+        for creditor_id in [i for i in old_names if i not in names]:
+            self._remove_name(creditor_id, old_names[creditor_id])
+        for creditor_id, name in names.items():
+            old_name = old_names.get(creditor_id)
+            if old_name == name:
+                continue
+            if old_name is not None:
+                self._remove_name(creditor_id, old_name)
+            self._add_name(creditor_id, name)
+
+        self._entries = creditors
+        self._rank = {c['id']: rank for rank, c in enumerate(creditors)}
+        self._folded_list = [self._folded[c['id']] for c in creditors]
+        self._last_query = self._last_ranks = None
+
+    def update_creditors(self, creditors: Iterable[Dict[str, Any]]) -> List[int]:
+        """Bakiyesi değişen borçluları güncelle
+
+        Dizinde bulunmayan ya da adı değişen (sırası bozulan) borçluların id'leri döndürülür.
+        """
+        missing = []
+        for c in creditors:
+            rank = self._rank.get(c['id'])
+            if rank is None or self._entries[rank]['name'] != c['name']:
+                missing.append(c['id'])
+                continue
+            self._entries[rank] = c
+        return missing
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Adında sorguyu içeren borçluları liste sırasıyla getir"""
+        folded_query = turkish_casefold(query.strip())
+        if not folded_query:
+            return list(self._entries)
+
+        folded_list = self._folded_list
+        if self._last_query is not None and self._last_query in folded_query:
+            # Uzayan sorgunun sonuçları bir önceki sonuçların alt kümesidir
+            ranks = [rank for rank in self._last_ranks if folded_query in folded_list[rank]]
+        elif len(folded_query) >= 3:
+            # En küçük listeden başlayarak sorgunun tüm üçlülerini içeren adlar
+            posting_lists = sorted((self._grams.get(gram, set()) for gram in trigrams(folded_query)), key=len)
+            candidates = posting_lists[0].intersection(*posting_lists[1:])
+            ranks = sorted(self._rank[i] for i in candidates if folded_query in self._folded[i])
+        else:
+            ranks = [rank for rank, folded in enumerate(folded_list) if folded_query in folded]
+
+        self._last_query, self._last_ranks = folded_query, ranks
+        return [self._entries[rank] for rank in ranks]
+
+    def fuzzy_search(self, query: str, limit: int = 10,
+                     threshold: float = 0.3) -> List[Tuple[Dict[str, Any], float]]:
+        """Adı sorguya benzeyen borçluları benzerlik puanıyla, en benzerden başlayarak getir"""
+        query_grams = fuzzy_trigrams(query)
+        if not query_grams:
+            return []
+
+        # Ortak üçlü sayıları posting listelerinden C tarafında sayılır
+        shared_counts = Counter(chain.from_iterable(
+            self._fuzzy_grams.get(gram, ()) for gram in query_grams))
+        # Jaccard ≤ ortak / sorgu üçlüsü: eşiğe ulaşamayacak adaylar hesaplanmaz
+        min_shared = max(1, math.ceil(threshold * len(query_grams)))
+        scored = []
+        for creditor_id, shared in shared_counts.items():
+            if shared < min_shared:
+                continue
+            score = shared / (len(query_grams) + self._fuzzy_size[creditor_id] - shared)
+            if score >= threshold:
+                scored.append((score, -self._rank[creditor_id]))
+
+        return [(self._entries[-negative_rank], score)
+                for score, negative_rank in heapq.nlargest(limit, scored)]
@@ -2,13 +2,24 @@
 Veritabanı yönetimi ve yedekleme sistemi
 """
 import sqlite3
+import gzip
+import hashlib
 import json
 import os
-import shutil
+import re
 import sys
-from datetime import datetime, timedelta
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
 from typing import List, Optional, Dict, Any
 
+from creditor_search import CreditorSearchIndex, turkish_casefold
+
 def get_data_dir():
     """Veri dosyaları için uygun dizini döndür"""
     if getattr(sys, 'frozen', False):
@@ -23,10 +34,386 @@ def get_data_dir():
     os.makedirs(app_data_dir, exist_ok=True)
     return app_data_dir
 
+# Kayıt tutarları kuruş cinsinden tamsayı, tarihler gün numarası (date.toordinal(),
+# 0001-01-01 = 1) olarak saklanır; API sınırında lira ve "YYYY-MM-DD" metnine çevrilir
+MONEY_SCALE = 100
+JULIAN_DAY_OFFSET = 1721424.5  # gün numarası + bu değer = SQLite julianday
+
+# Bir kaydın borçlu bakiyesine etkisi (kuruş): borç - ödeme - iskonto + müşteri masrafı
+BALANCE_DELTA_SQL = "({row}.debt_amount - {row}.payment_amount - {row}.iskonto + {row}.musteri_masrafi)"
+# Göç 3'ün REAL lira ve NULL olabilen sütunlar için yazdığı ifade (yalnızca o göçte kullanılır)
+LEGACY_BALANCE_DELTA_SQL = ("(COALESCE({row}.debt_amount, 0.0) - COALESCE({row}.payment_amount, 0.0)"
+                            " - COALESCE({row}.iskonto, 0.0) + COALESCE({row}.musteri_masrafi, 0.0))")
+
+# Ödeme durumu kodları; listede olmayan durumlar ilk kullanımda sıradaki kodu alır
+PAYMENT_STATUSES = ((0, 'Ödenmedi'), (1, 'Ödendi'))
+# Sıkıştırmada eski kayıtların yerine geçen devir kaydının açıklaması
+OPENING_BALANCE_DESCRIPTION = 'Devreden Bakiye'
+
+# FTS5 tablo seçenekleri: Türkçe harfler (ç, ğ, ı, ö, ş, ü) korunur, 2-3 harflik
+# önekler indekslenir
+FTS_OPTIONS = "tokenize = 'unicode61 remove_diacritics 0', prefix = '2 3'"
+
+# Artımlı yedeklerde parça boyutu (varsayılan sayfa boyutunun katı) ve manifest uzantısı
+BACKUP_CHUNK_SIZE = 64 * 1024
+MANIFEST_SUFFIX = '.manifest.json'
+
+# Değişiklik günlüğüne satır görüntüsü yazılan tablolar ve sütunları
+JOURNAL_COLUMNS = {
+    'creditors': ('id', 'name', 'created_at', 'updated_at'),
+    'records': ('id', 'creditor_id', 'date', 'description', 'debt_amount', 'payment_amount',
+                'payment_status', 'kod1', 'kod2', 'birim', 'iskonto', 'musteri_masrafi', 'created_at'),
+}
+
+# İstatistik satırındaki toplamlar ve records tablosundaki karşılık gelen sütunlar
+STATS_AMOUNT_COLUMNS = (
+    ('total_debt', 'debt_amount'),
+    ('total_payment', 'payment_amount'),
+    ('total_iskonto', 'iskonto'),
+    ('total_masraf', 'musteri_masrafi'),
+)
+
+# Ağ dosya sistemleri: WAL'ın paylaşımlı bellek dizini (-shm) farklı bilgisayarlar
+# arasında paylaşılamaz, bu sistemlerdeki veritabanları geri alma günlüğü kipinde açılır
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'afs', '9p', 'ceph', 'glusterfs',
+                       'fuse.sshfs', 'fuse.davfs2', 'davfs', 'ncpfs'}
+
+def is_network_path(path: str) -> bool:
+    """Dosya bir ağ paylaşımında mı (UNC yolu, ağ sürücüsü ya da ağ dosya sistemi)"""
+    path = os.path.realpath(path)
+    if sys.platform == 'win32':
+        if path.startswith('\\\\'):
+            return True
+        import ctypes
+        drive = os.path.splitdrive(path)[0] + '\\'
+        return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+    try:
+        with open('/proc/mounts', encoding='utf-8') as f:
+            # Bağlama noktalarındaki boşluklar \040 olarak yazılır
+            mounts = [(point.replace('\\040', ' '), fs_type)
+                      for point, fs_type in (line.split()[1:3] for line in f)]
+    except OSError:
+        return False
+    # Yolu içeren en uzun bağlama noktasının dosya sistemi
+    matching = [mount for mount in mounts
+                if path == mount[0] or path.startswith(mount[0].rstrip('/') + '/')]
+    if not matching:
+        return False
+    return max(matching, key=lambda mount: len(mount[0]))[1] in NETWORK_FILESYSTEMS
+
+# Günlük zaman damgası: yerel saat, milisaniye hassasiyetinde ("YYYY-MM-DD HH:MM:SS.SSS")
+JOURNAL_TIME_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+# Günlük kaydını yazan yönetici: her yönetici kendi bağlantılarına "origin_<kimlik>"
+# adıyla boş bir bellek veritabanı bağlar, günlük tetikleyicisi kimliği bağlı
+# veritabanı listesinden okur. Diğer süreçlerin (ve araçların) yazmalarında NULL kalır
+ORIGIN_SCHEMA_PREFIX = 'origin_'
+JOURNAL_ORIGIN_SQL = (f"(SELECT substr(name, {len(ORIGIN_SCHEMA_PREFIX) + 1}) FROM pragma_database_list"
+                      f" WHERE name LIKE '{ORIGIN_SCHEMA_PREFIX.replace('_', '!_')}%' ESCAPE '!')")
+
+def _journal_timestamp(value) -> str:
+    """datetime ya da ISO biçimli metni günlük zaman damgası biçimine çevir"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+def to_minor_units(amount) -> int:
+    """Lira tutarını kuruş cinsinden tamsayıya çevir"""
+    if not amount:
+        return 0
+    return int((Decimal(str(amount)) * MONEY_SCALE).to_integral_value(rounding=ROUND_HALF_UP))
+
+def from_minor_units(value) -> float:
+    """Kuruş cinsinden tamsayıyı lira tutarına çevir"""
+    return (value or 0) / MONEY_SCALE
+
+def to_day_number(value) -> int:
+    """"YYYY-MM-DD" (ya da "GG.AA.YYYY") tarihini gün numarasına çevir"""
+    if isinstance(value, (date, datetime)):
+        return value.toordinal()
+    text = str(value).strip()
+    try:
+        return date.fromisoformat(text[:10]).toordinal()
+    except ValueError:
+        return datetime.strptime(text, '%d.%m.%Y').toordinal()
+
+def from_day_number(day: int) -> str:
+    """Gün numarasını "YYYY-MM-DD" tarihine çevir"""
+    return date.fromordinal(day).isoformat()
+
+def month_number(day: int) -> int:
+    """Gün numarasının ait olduğu ay numarası (yıl * 12 + ay - 1)"""
+    value = date.fromordinal(day)
+    return value.year * 12 + value.month - 1
+
+def month_start_day(month: int) -> int:
+    """Ay numarasının ilk gününün gün numarası"""
+    return date(month // 12, month % 12 + 1, 1).toordinal()
+
+def _month_sql(day_expression: str) -> str:
+    """Gün numarasından SQL tarafında ay numarası (yıl * 12 + ay - 1)"""
+    julian = f"{day_expression} + {JULIAN_DAY_OFFSET}"
+    return f"(CAST(strftime('%Y', {julian}) AS INTEGER) * 12 + CAST(strftime('%m', {julian}) AS INTEGER) - 1)"
+
+def _legacy_day_sql(expression: str, fallback: str) -> str:
+    """Metin tarihi (YYYY-MM-DD ya da GG.AA.YYYY) SQL tarafında gün numarasına çevir"""
+    dmy = f"substr({expression}, 7, 4) || '-' || substr({expression}, 4, 2) || '-' || substr({expression}, 1, 2)"
+    return (f"CAST(COALESCE(julianday({expression}), julianday({dmy}), julianday({fallback}),"
+            f" julianday('now', 'localtime')) - {JULIAN_DAY_OFFSET} AS INTEGER)")
+
+def _sql_minor_units(value) -> int:
+    """SQL göçleri için to_minor_units; sayıya çevrilemeyen eski değerler 0 sayılır"""
+    try:
+        return to_minor_units(value)
+    except (ArithmeticError, ValueError, TypeError):
+        return 0
+
+def _legacy_money_sql(expression: str) -> str:
+    """Lira tutarını SQL tarafında kuruşa çevir (to_minor_units ile aynı yarımı yukarı yuvarlama)"""
+    return f"minor_units({expression})"
+
+def _fold_sql(expression: str) -> str:
+    """SQL tarafında Türkçe I/İ katlaması; kalan harfleri FTS5 tokenizer küçültür"""
+    return f"replace(replace(COALESCE({expression}, ''), 'I', 'ı'), 'İ', 'i')"
+
+def _copy_result(value):
+    """Önbellekteki sonucun sığ kopyası: satır sözlükleri çağıranlar arasında paylaşılmaz"""
+    if isinstance(value, list):
+        return [dict(row) if isinstance(row, dict) else row for row in value]
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+class ImportCancelledError(Exception):
+    """Toplu içe aktarma kullanıcı tarafından iptal edildi"""
+
+class CompactedHistoryError(Exception):
+    """İstenen tarih devir kaydına sıkıştırılmış döneme düşüyor"""
+
+class SimilarCreditorWarning(Exception):
+    """Eklenmek istenen ada benzeyen borçlular var; eşleşmeler `matches` içindedir"""
+
+    def __init__(self, name: str, matches: List[Dict[str, Any]]):
+        names = ', '.join(f"{c['name']} (%{c['similarity'] * 100:.0f})" for c in matches)
+        super().__init__(f"'{name}' adına benzer borçlular var: {names}")
+        self.name = name
+        self.matches = matches
+
+class BackupScheduler:
+    """Yazma işlemlerini biriktirip yedeği arka plan thread'inde alan zamanlayıcı
+
+    İlk bekleyen değişiklikten `interval_seconds` saniye sonra ya da bekleyen
+    değişiklik sayısı `max_changes` değerine ulaştığında tek bir yedek alınır.
+    """
+
+    def __init__(self, backup_func, interval_seconds: float = 300, max_changes: int = 50):
+        self._backup_func = backup_func
+        self.interval_seconds = interval_seconds
+        self.max_changes = max_changes
+
+        self._condition = threading.Condition()
+        self._pending_changes = 0
+        self._first_change_at = None
+        self._last_operation = None
+        self._running_backup = False
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._run, name="BackupScheduler", daemon=True)
+        self._thread.start()
+
+    def notify_change(self, operation_type: str):
+        """Bir yazma işlemini kaydet, gerekirse yedeklemeyi tetikle"""
+        with self._condition:
+            if self._stopped:
+                return
+            if self._pending_changes == 0:
+                self._first_change_at = time.monotonic()
+            self._pending_changes += 1
+            self._last_operation = operation_type
+            self._condition.notify()
+
+    def _take_pending(self) -> Optional[str]:
+        """Bekleyen değişiklikleri sıfırla ve yedek türünü döndür (kilit altında çağrılır)"""
+        if self._pending_changes == 0:
+            return None
+        operation_type = self._last_operation if self._pending_changes == 1 else "auto"
+        self._pending_changes = 0
+        self._first_change_at = None
+        self._last_operation = None
+        return operation_type
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._pending_changes == 0:
+                        self._condition.wait()
+                        continue
+                    remaining = self.interval_seconds - (time.monotonic() - self._first_change_at)
+                    if self._pending_changes >= self.max_changes or remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._stopped:
+                    return
+                operation_type = self._take_pending()
+                self._running_backup = True
+
+            try:
+                self._backup_func(operation_type)
+            finally:
+                with self._condition:
+                    self._running_backup = False
+                    self._condition.notify_all()
+
+    def flush(self):
+        """Bekleyen değişiklik varsa yedeği hemen (çağıran thread'de) al"""
+        with self._condition:
+            # Arka planda süren yedeğin bitmesini bekle
+            while self._running_backup:
+                self._condition.wait()
+            operation_type = self._take_pending()
+        if operation_type:
+            self._backup_func(operation_type)
+
+    def shutdown(self):
+        """Zamanlayıcıyı durdur ve bekleyen değişikliklerin yedeğini al"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+        self.flush()
+
+class GroupCommitWriter:
+    """Kayıt eklemelerini kuyrukta biriktirip tek transaction'da yazan arka plan thread'i
+
+    Kuyrukta tek yazma varsa hemen yazılır; bir commit sürerken gelen yazmalar
+    bir sonraki grupta toplanır. Birden fazla yazma bekliyorsa grup, ilk
+    bekleyen yazmadan `max_delay` saniye sonra ya da kuyruk `max_batch`
+    yazmaya ulaştığında tek commit ile diske yazılır. Her yazmanın Future
+    nesnesi ancak grup commit'i diske yazıldıktan sonra sonuçlanır.
+    """
+
+    def __init__(self, commit_func, max_delay: float = 0.02, max_batch: int = 100):
+        self._commit_func = commit_func
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+
+        self._condition = threading.Condition()
+        self._pending = []
+        self._first_write_at = None
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._run, name="GroupCommitWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        """Yazmayı kuyruğa ekle; sonuç grup commit'inden sonra Future'a yazılır"""
+        future = Future()
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Yazma kuyruğu kapatıldı")
+            if not self._pending:
+                self._first_write_at = time.monotonic()
+            self._pending.append((item, future))
+            self._condition.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._pending:
+                        if self._stopped:
+                            return
+                        self._condition.wait()
+                        continue
+                    remaining = self.max_delay - (time.monotonic() - self._first_write_at)
+                    if (self._stopped or len(self._pending) == 1 or len(self._pending) >= self.max_batch
+                            or remaining <= 0):
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                self._first_write_at = time.monotonic() if self._pending else None
+
+            items = [item for item, _ in batch]
+            try:
+                results = self._commit_func(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def shutdown(self):
+        """Kuyruktaki yazmaları diske yaz ve thread'i durdur"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+
+class QueryCache:
+    """Sorgu sonuçlarını yazma kuşağına göre saklayan, sorgu başına LRU önbellek
+
+    Her sonuç, sorgu başlamadan önce okunan kuşak numarasıyla saklanır;
+    invalidate() kuşağı artırıp tüm sonuçları düşürür. Sorgu sürerken kuşak
+    değişmişse sonuç önbelleğe alınmaz.
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        self._limits = dict(limits)
+        self._entries = {name: OrderedDict() for name in self._limits}
+        self._hits = dict.fromkeys(self._limits, 0)
+        self._misses = dict.fromkeys(self._limits, 0)
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, name: str, key, generation: int):
+        """(bulundu, değer) döndür; değer yalnızca aynı kuşakta saklanmışsa geçerlidir"""
+        with self._lock:
+            entries = self._entries[name]
+            if generation == self.generation and key in entries:
+                entries.move_to_end(key)
+                self._hits[name] += 1
+                return True, entries[key]
+            self._misses[name] += 1
+            return False, None
+
+    def put(self, name: str, key, generation: int, value):
+        """Sonucu sakla, sorgunun sınırı aşılırsa en az kullanılanı çıkar"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            entries = self._entries[name]
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self._limits[name]:
+                entries.popitem(last=False)
+
+    def invalidate(self):
+        """Kuşağı artır ve saklanan tüm sonuçları düşür"""
+        with self._lock:
+            self.generation += 1
+            for entries in self._entries.values():
+                entries.clear()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Sorgu başına isabet, ıska ve kayıt sayıları"""
+        with self._lock:
+            return {name: {'hits': self._hits[name], 'misses': self._misses[name],
+                           'size': len(self._entries[name]), 'max_entries': self._limits[name]}
+                    for name in self._limits}
+
 class DatabaseManager:
     """SQLite veritabanı yönetimi ve yedekleme sistemi"""
     
-    def __init__(self, db_path: str = None, backup_dir: str = None):
+    def __init__(self, db_path: str = None, backup_dir: str = None,
+                 backup_interval: float = 300, backup_max_changes: int = 50,
+                 commit_delay: float = 0.02, commit_batch_size: int = 100):
         # Veri dizinini al
         data_dir = get_data_dir()
 
@@ -36,15 +423,178 @@ class DatabaseManager:
         else:
             self.db_path = db_path
 
+        # Ağ paylaşımındaki veritabanı WAL yerine geri alma günlüğü kipinde açılır
+        self.network_storage = is_network_path(self.db_path)
+        if self.network_storage:
+            print("⚠️ Veritabanı ağ paylaşımında: WAL kapalı, geri alma günlüğü kullanılacak")
+
+        # Bu yöneticinin yazdığı günlük kayıtları değişiklik izlemesinde atlanır
+        self._origin = uuid.uuid4().hex
+
+        # Eski kayıtların taşındığı arşiv veritabanı
+        self.archive_path = os.path.splitext(self.db_path)[0] + "_archive.db"
+
         # Varsayılan yedek dizini
         if backup_dir is None:
             self.backup_dir = os.path.join(data_dir, "backups")
         else:
             self.backup_dir = backup_dir
+        self.chunk_dir = os.path.join(self.backup_dir, "chunks")
+        self.catalog_path = os.path.join(self.backup_dir, "backup_catalog.db")
+
+        # Thread başına kalıcı bağlantı havuzu
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._backup_lock = threading.RLock()
+        self._catalog = None  # Yedek kataloğu bağlantısı
+
+        # Ödeme durumu kod <-> ad eşlemesi (tablo yalnızca büyür, commit edilmiş hali tutulur)
+        self._status_codes = {}
+        self._status_names = {}
+
+        # Sık tekrarlanan okumaların sonuçları, veritabanı değişene kadar bellekten sunulur
+        self._query_cache = QueryCache(self.QUERY_CACHE_LIMITS)
+
+        # Benzer ad kontrolü için borçlu adlarının trigram dizini (önbellekteki listeyle eşitlenir)
+        self._name_index = CreditorSearchIndex()
+        self._name_index_source = None
+        self._name_index_lock = threading.Lock()
 
         self.ensure_backup_directory()
         self.init_database()
-    
+
+        # Yazma sonrası yedekler biriktirilip arka planda alınır
+        self._backup_scheduler = BackupScheduler(self.create_backup, backup_interval, backup_max_changes)
+
+        # Kayıt eklemeleri gruplanıp tek commit ile yazılır
+        self._record_writer = GroupCommitWriter(self._commit_record_batch, commit_delay, commit_batch_size)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Bu thread'e ait kalıcı bağlantıyı döndür (yoksa oluştur)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False yalnızca close() çağrısının başka thread'den
+            # yapılabilmesi için; her bağlantıyı sadece kendi thread'i kullanır
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._configure_connection(conn)
+            self._attach_origin(conn)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """Bağlantı performans ve bütünlük ayarlarını uygula"""
+        if self.network_storage:
+            # WAL tek bilgisayarda çalışır; ağ paylaşımında dosya kilitleriyle geri alma günlüğü
+            conn.execute('PRAGMA journal_mode = DELETE')
+            conn.execute('PRAGMA synchronous = FULL')
+        else:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute('PRAGMA mmap_size = 268435456')  # 256 MB bellek eşlemeli okuma
+        conn.execute('PRAGMA foreign_keys = ON')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute('PRAGMA cache_size = -16000')  # ~16 MB sayfa önbelleği
+
+    def _attach_origin(self, conn: sqlite3.Connection):
+        """Bağlantıyı yöneticinin kimliğiyle işaretle (günlük tetikleyicileri origin'i buradan okur)
+
+        Bağlanan boş bellek veritabanına hiç yazılmaz; işaret bağlantıya özeldir.
+        """
+        conn.execute(f"ATTACH DATABASE ':memory:' AS {ORIGIN_SCHEMA_PREFIX}{self._origin}")
+
+    def close(self):
+        """Bekleyen yazmaları ve yedeği tamamla, havuzdaki tüm bağlantıları kapat"""
+        self._record_writer.shutdown()
+        self._backup_scheduler.shutdown()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        with self._backup_lock:
+            if self._catalog is not None:
+                connections.append(self._catalog)
+                self._catalog = None
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                print(f"Bağlantı kapatılırken hata: {e}")
+        self._local = threading.local()
+
+    # Önbelleğe alınan sorgular ve her birinde saklanacak en fazla sonuç sayısı
+    QUERY_CACHE_LIMITS = {
+        'get_all_creditors': 1,
+        'get_creditor_by_name': 256,
+        'get_creditor_records': 32,
+    }
+
+    def _cache_generation(self) -> int:
+        """Önbellek kuşağını döndür; veritabanı değiştiyse önce önbelleği geçersiz kıl
+
+        data_version başka bağlantıların (diğer thread'ler ve süreçler) commit'lerinde,
+        total_changes bu bağlantının kendi yazmalarında değişir. Yeni açılan
+        bağlantının önceki hali bilinmediği için ilk okumada da önbellek düşürülür.
+        """
+        conn = self._get_connection()
+        state = (conn.execute('PRAGMA data_version').fetchone()[0], conn.total_changes)
+        if getattr(self._local, 'cache_state', None) != state:
+            self._local.cache_state = state
+            self._query_cache.invalidate()
+        return self._query_cache.generation
+
+    def _cached_query(self, name: str, key, loader):
+        """Sorgu sonucunun kopyasını önbellekten döndür, yoksa loader() ile yükleyip sakla
+
+        Çağıran dönen satırları değiştirebilir; önbellekteki satırlar etkilenmez.
+        """
+        return _copy_result(self._cached_rows(name, key, loader))
+
+    def _cached_rows(self, name: str, key, loader):
+        """Önbellekteki sonucun kendisini döndür (yalnızca satırları değiştirmeyen iç kullanım için)"""
+        generation = self._cache_generation()
+        found, value = self._query_cache.get(name, key, generation)
+        if not found:
+            value = loader()
+            self._query_cache.put(name, key, generation, value)
+        return value
+
+    def _load_payment_statuses(self):
+        """Ödeme durumu tablosunu belleğe oku"""
+        rows = self._get_connection().execute('SELECT code, name FROM payment_statuses').fetchall()
+        self._status_names = dict(rows)
+        self._status_codes = {name: code for code, name in rows}
+
+    def _payment_status_code(self, name: str) -> int:
+        """Ödeme durumu adının kodunu döndür; yeni bir durumsa tabloya ekleyip commit et
+
+        Açık bir transaction dışında çağrılmalıdır: geri alınabilecek bir kod
+        önbelleğe girmesin diye yeni durum hemen commit edilir.
+        """
+        name = name or PAYMENT_STATUSES[0][1]
+        code = self._status_codes.get(name)
+        if code is None:
+            conn = self._get_connection()
+            with conn:
+                conn.execute('INSERT OR IGNORE INTO payment_statuses (name) VALUES (?)', (name,))
+            self._load_payment_statuses()
+            code = self._status_codes[name]
+        return code
+
+    def _payment_status_name(self, code: int) -> str:
+        """Ödeme durumu kodunun adını döndür"""
+        if code not in self._status_names:
+            self._load_payment_statuses()
+        return self._status_names.get(code, PAYMENT_STATUSES[0][1])
+
+    def invalidate_query_cache(self):
+        """Sorgu önbelleğini elle geçersiz kıl (satır sayacına yansımayan değişiklikler için)"""
+        self._query_cache.invalidate()
+
+    def get_query_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Sorgu önbelleğinin sorgu başına isabet/ıska sayıları"""
+        return self._query_cache.get_stats()
+
     def ensure_backup_directory(self):
         """Yedek klasörünün var olduğundan emin ol"""
         try:
@@ -52,230 +602,1873 @@ class DatabaseManager:
         except Exception as e:
             print(f"Yedek klasörü oluşturulamadı: {e}")
     
+    # Şema göçleri: (sürüm, açıklama, metot adı). Her göç PRAGMA user_version
+    # üzerinden bir kez ve kendi transaction'ı içinde uygulanır; yeni şema
+    # değişiklikleri listenin sonuna yeni sürüm numarasıyla eklenir
+    MIGRATIONS = [
+        (1, "Temel tablolar", '_migrate_base_tables'),
+        (2, "Defter sıralama indeksleri", '_migrate_ledger_indexes'),
+        (3, "Borçlu bakiye özet tablosu", '_migrate_creditor_balances'),
+        (4, "Tam metin arama indeksi", '_migrate_search_index'),
+        (5, "Değişiklik günlüğü", '_migrate_change_journal'),
+        (6, "Veritabanı istatistik sayaçları", '_migrate_database_stats'),
+        (7, "Kuruş tutarlar, durum kodları ve gün numaralı tarihler", '_migrate_compact_records'),
+        (8, "Aylık bakiye kontrol noktaları", '_migrate_monthly_totals'),
+        (9, "Değişiklik günlüğü kaynak işareti", '_migrate_journal_origin'),
+        (10, "Defter bilgileri (sıkıştırma kesim tarihi)", '_migrate_ledger_meta'),
+        (11, "Borçlu başına sıkıştırma kesim tarihi", '_migrate_creditor_compaction'),
+        (12, "Aylık kümülatif bakiye kontrol noktaları", '_migrate_monthly_balances'),
+        (13, "Günlük kaynağı tetikleyicide yazılır", '_migrate_journal_origin_triggers'),
+    ]
+    SCHEMA_VERSION = MIGRATIONS[-1][0]
+
     def init_database(self):
-        """Veritabanını başlat ve tabloları oluştur"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Veritabanı şemasını güncel sürüme getir"""
+        conn = self._get_connection()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+
+        # Artımlı vakum kipi bir kez, yeni (boş) veritabanında açılır; WAL kipine geçişte
+        # dosya başlığı yazıldığı için kip ancak VACUUM ile kalıcı olur (boş dosyada
+        # anlıktır). Mevcut dosyalar ilk kayıt arşivlemesinde (_reclaim_free_pages)
+        # tam VACUUM ile bu kipe geçirilir
+        if version == 0 and conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()[0] == 0:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+
+        # Şema güncelse açılışta hiçbir DDL çalıştırılmaz
+        if version < self.SCHEMA_VERSION:
+            self.migrate_schema(conn)
+        elif version > self.SCHEMA_VERSION:
+            print(f"⚠️ Veritabanı şema sürümü ({version}) uygulamanınkinden ({self.SCHEMA_VERSION}) yeni")
+
+        cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'creditors_fts'")
+        self.fts_enabled = cursor.fetchone() is not None
+
+    def get_schema_version(self) -> int:
+        """Veritabanının şema sürümünü döndür"""
+        return self._get_connection().execute('PRAGMA user_version').fetchone()[0]
+
+    def migrate_schema(self, conn: sqlite3.Connection):
+        """Uygulanmamış şema göçlerini sırayla, her birini ayrı transaction'da uygula"""
+        # Eski REAL tutarlar Python'daki Decimal kuralıyla kuruşa çevrilir (SQL ROUND
+        # ikili kayan nokta yüzünden 1.005'i 100'e yuvarlar)
+        conn.create_function('minor_units', 1, _sql_minor_units, deterministic=True)
+        for version, description, method_name in self.MIGRATIONS:
+            with conn:
+                cursor = conn.cursor()
+                # Aynı anda açılan başka bir süreç göçü uygulamış olabilir; sürüm
+                # yazma kilidi alındıktan sonra yeniden okunur
+                cursor.execute('BEGIN IMMEDIATE')
+                current = cursor.execute('PRAGMA user_version').fetchone()[0]
+                if current >= version:
+                    continue
+                getattr(self, method_name)(cursor)
+                cursor.execute(f'PRAGMA user_version = {version}')
+            self._query_cache.invalidate()
+            print(f"✅ Şema sürüm {version} uygulandı: {description}")
+
+    def _migrate_base_tables(self, cursor: sqlite3.Cursor):
+        """Göç 1: borçlular ve kayıtlar tabloları"""
+        # Borçlular tablosu
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creditors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Kayıtlar tablosu
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                creditor_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                description TEXT NOT NULL,
+                debt_amount REAL DEFAULT 0.0,
+                payment_amount REAL DEFAULT 0.0,
+                payment_status TEXT DEFAULT 'Ödenmedi',
+                kod1 TEXT DEFAULT '',
+                kod2 TEXT DEFAULT '',
+                birim TEXT DEFAULT '',
+                iskonto REAL DEFAULT 0.0,
+                musteri_masrafi REAL DEFAULT 0.0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (creditor_id) REFERENCES creditors (id) ON DELETE CASCADE
+            )
+        ''')
+
+        # Sürüm takibinden önceki eski veritabanlarında eksik sütunları ekle
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(records)')}
+        if 'iskonto' not in columns:
+            cursor.execute('ALTER TABLE records ADD COLUMN iskonto REAL DEFAULT 0.0')
+        if 'musteri_masrafi' not in columns:
+            cursor.execute('ALTER TABLE records ADD COLUMN musteri_masrafi REAL DEFAULT 0.0')
+
+    def _migrate_ledger_indexes(self, cursor: sqlite3.Cursor):
+        """Göç 2: defter sıralaması ve tarih indeksleri"""
+        # Borçlu defteri sıralaması ve sayfalama için bileşik indeks; tek sütunlu
+        # creditor_id indeksinin işini de gördüğü için o indeks kaldırılır
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_records_creditor_order ON records(creditor_id, date, created_at, id)')
+        cursor.execute('DROP INDEX IF EXISTS idx_creditor_id')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_date ON records(date)')
+
+    def _migrate_creditor_balances(self, cursor: sqlite3.Cursor):
+        """Göç 3: borçlu bakiye özet tablosu ve onu güncel tutan trigger'lar
+
+        Yayımlanmış göçtür, değiştirilmez: tutarlar henüz REAL liradır. Güncel
+        tanımlar göç 7'de _create_creditor_balances ile kurulur.
+        """
+        # Bakiye ve kayıt sayısı kayıt eklendikçe/silindikçe trigger'larla güncellenir,
+        # böylece borçlu listesi records tablosunu taramadan yüklenir
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creditor_balances (
+                creditor_id INTEGER PRIMARY KEY REFERENCES creditors (id) ON DELETE CASCADE,
+                total_debt REAL NOT NULL DEFAULT 0.0,
+                record_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_creditors_balance_insert
+            AFTER INSERT ON creditors
+            BEGIN
+                INSERT OR IGNORE INTO creditor_balances (creditor_id) VALUES (new.id);
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_balance_insert
+            AFTER INSERT ON records
+            BEGIN
+                INSERT OR IGNORE INTO creditor_balances (creditor_id) VALUES (new.creditor_id);
+                UPDATE creditor_balances
+                SET total_debt = total_debt + {LEGACY_BALANCE_DELTA_SQL.format(row='new')},
+                    record_count = record_count + 1
+                WHERE creditor_id = new.creditor_id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_balance_delete
+            AFTER DELETE ON records
+            BEGIN
+                UPDATE creditor_balances
+                SET total_debt = total_debt - {LEGACY_BALANCE_DELTA_SQL.format(row='old')},
+                    record_count = record_count - 1
+                WHERE creditor_id = old.creditor_id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_balance_update
+            AFTER UPDATE OF creditor_id, debt_amount, payment_amount, iskonto, musteri_masrafi ON records
+            BEGIN
+                UPDATE creditor_balances
+                SET total_debt = total_debt - {LEGACY_BALANCE_DELTA_SQL.format(row='old')},
+                    record_count = record_count - 1
+                WHERE creditor_id = old.creditor_id;
+                INSERT OR IGNORE INTO creditor_balances (creditor_id) VALUES (new.creditor_id);
+                UPDATE creditor_balances
+                SET total_debt = total_debt + {LEGACY_BALANCE_DELTA_SQL.format(row='new')},
+                    record_count = record_count + 1
+                WHERE creditor_id = new.creditor_id;
+            END
+        ''')
+
+        # Mevcut kayıtlardan özet tabloyu doldur
+        cursor.execute('DELETE FROM creditor_balances')
+        cursor.execute(f'''
+            INSERT INTO creditor_balances (creditor_id, total_debt, record_count)
+            SELECT c.id, COALESCE(SUM({LEGACY_BALANCE_DELTA_SQL.format(row='r')}), 0.0), COUNT(r.id)
+            FROM creditors c
+            LEFT JOIN records r ON r.creditor_id = c.id
+            GROUP BY c.id
+        ''')
+
+    def _migrate_search_index(self, cursor: sqlite3.Cursor):
+        """Göç 4: borçlu adları ve kayıt metinleri için FTS5 arama indeksi"""
+        # Metinler Türkçe büyük/küçük harf katlamasıyla saklanır; satır kimliği
+        # (rowid) kaynak tablodaki id ile aynıdır
+        try:
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS creditors_fts
+                USING fts5(name, {FTS_OPTIONS})
+            ''')
+        except sqlite3.OperationalError as e:
+            # SQLite FTS5 desteği olmadan derlenmişse basit aramaya geri dönülür
+            print(f"⚠️ Tam metin arama kullanılamıyor, basit arama kullanılacak: {e}")
+            return
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS records_fts
+            USING fts5(description, kod1, kod2, birim, {FTS_OPTIONS})
+        ''')
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_creditors_fts_insert
+            AFTER INSERT ON creditors
+            BEGIN
+                INSERT INTO creditors_fts (rowid, name) VALUES (new.id, {_fold_sql('new.name')});
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_creditors_fts_delete
+            AFTER DELETE ON creditors
+            BEGIN
+                DELETE FROM creditors_fts WHERE rowid = old.id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_creditors_fts_update
+            AFTER UPDATE OF name ON creditors
+            BEGIN
+                UPDATE creditors_fts SET name = {_fold_sql('new.name')} WHERE rowid = new.id;
+            END
+        ''')
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_fts_insert
+            AFTER INSERT ON records
+            BEGIN
+                INSERT INTO records_fts (rowid, description, kod1, kod2, birim)
+                VALUES (new.id, {_fold_sql('new.description')}, {_fold_sql('new.kod1')},
+                        {_fold_sql('new.kod2')}, {_fold_sql('new.birim')});
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_records_fts_delete
+            AFTER DELETE ON records
+            BEGIN
+                DELETE FROM records_fts WHERE rowid = old.id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_fts_update
+            AFTER UPDATE OF description, kod1, kod2, birim ON records
+            BEGIN
+                UPDATE records_fts
+                SET description = {_fold_sql('new.description')}, kod1 = {_fold_sql('new.kod1')},
+                    kod2 = {_fold_sql('new.kod2')}, birim = {_fold_sql('new.birim')}
+                WHERE rowid = new.id;
+            END
+        ''')
+
+        # Mevcut verileri indeksle
+        cursor.execute('DELETE FROM creditors_fts')
+        cursor.execute('DELETE FROM records_fts')
+        cursor.execute(f'''
+            INSERT INTO creditors_fts (rowid, name)
+            SELECT id, {_fold_sql('name')} FROM creditors
+        ''')
+        cursor.execute(f'''
+            INSERT INTO records_fts (rowid, description, kod1, kod2, birim)
+            SELECT id, {_fold_sql('description')}, {_fold_sql('kod1')},
+                   {_fold_sql('kod2')}, {_fold_sql('birim')}
+            FROM records
+        ''')
+
+    def _migrate_change_journal(self, cursor: sqlite3.Cursor):
+        """Göç 5: ekleme/güncelleme/silme işlemlerinin satır görüntülerini tutan değişiklik günlüğü"""
+        # Günlük trigger'larla, değişikliği yapan transaction içinde yazılır; yalnızca
+        # sona eklenir ve eski kısımları yedeklerle birlikte budanır
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                changed_at TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                row_data TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_change_journal_time ON change_journal(changed_at)')
+
+        for table, columns in JOURNAL_COLUMNS.items():
+            for operation, row in (('insert', 'new'), ('update', 'new'), ('delete', 'old')):
+                row_image = ', '.join(f"'{column}', {row}.{column}" for column in columns)
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_journal_{operation}
+                    AFTER {operation.upper()} ON {table}
+                    BEGIN
+                        INSERT INTO change_journal (changed_at, table_name, operation, row_id, row_data)
+                        VALUES ({JOURNAL_TIME_SQL}, '{table}', '{operation}', {row}.id, json_object({row_image}));
+                    END
+                ''')
+
+    def _migrate_database_stats(self, cursor: sqlite3.Cursor):
+        """Göç 6: yazmalarla birlikte güncellenen tek satırlık veritabanı istatistikleri
+
+        Yayımlanmış göçtür, değiştirilmez: toplamlar henüz REAL liradır. Güncel
+        tanımlar göç 7'de _create_database_stats ile kurulur.
+        """
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS db_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                creditor_count INTEGER NOT NULL DEFAULT 0,
+                record_count INTEGER NOT NULL DEFAULT 0,
+                {', '.join(f'{total} REAL NOT NULL DEFAULT 0.0' for total, _ in STATS_AMOUNT_COLUMNS)}
+            )
+        ''')
+        cursor.execute('INSERT OR IGNORE INTO db_stats (id) VALUES (1)')
+
+        for operation, sign in (('insert', '+'), ('delete', '-')):
+            row = 'new' if operation == 'insert' else 'old'
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_creditors_stats_{operation}
+                AFTER {operation.upper()} ON creditors
+                BEGIN
+                    UPDATE db_stats SET creditor_count = creditor_count {sign} 1 WHERE id = 1;
+                END
+            ''')
+            totals = ', '.join(f'{total} = {total} {sign} COALESCE({row}.{column}, 0.0)'
+                               for total, column in STATS_AMOUNT_COLUMNS)
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_records_stats_{operation}
+                AFTER {operation.upper()} ON records
+                BEGIN
+                    UPDATE db_stats SET record_count = record_count {sign} 1, {totals} WHERE id = 1;
+                END
+            ''')
+
+        totals = ', '.join(f'{total} = {total} - COALESCE(old.{column}, 0.0) + COALESCE(new.{column}, 0.0)'
+                           for total, column in STATS_AMOUNT_COLUMNS)
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_stats_update
+            AFTER UPDATE OF {', '.join(column for _, column in STATS_AMOUNT_COLUMNS)} ON records
+            BEGIN
+                UPDATE db_stats SET {totals} WHERE id = 1;
+            END
+        ''')
+
+        # Mevcut verilerden sayaçları doldur
+        totals = ', '.join(total for total, _ in STATS_AMOUNT_COLUMNS)
+        sums = ', '.join(f'COALESCE(SUM({column}), 0.0)' for _, column in STATS_AMOUNT_COLUMNS)
+        cursor.execute(f'''
+            UPDATE db_stats
+            SET (record_count, {totals}) = (SELECT COUNT(*), {sums} FROM records),
+                creditor_count = (SELECT COUNT(*) FROM creditors)
+            WHERE id = 1
+        ''')
+
+    def _migrate_compact_records(self, cursor: sqlite3.Cursor):
+        """Göç 7: kuruş cinsinden tamsayı tutarlar, ödeme durumu kodları ve gün numaralı tarihler
+
+        records tablosu yeni sütun türleriyle yeniden kurulur; tabloya bağlı özet
+        tabloları, indeksler ve trigger'lar güncel tanımlarıyla yeniden oluşturulur.
+        Değişiklik günlüğündeki eski kayıt görüntüleri de yeni biçime çevrilir.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS payment_statuses (
+                code INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.executemany('INSERT OR IGNORE INTO payment_statuses (code, name) VALUES (?, ?)', PAYMENT_STATUSES)
+
+        # Özet tabloları ve trigger'ları göç 3 ve 6'da REAL lira ile oluşturulmuştu;
+        # aşağıda kuruş cinsinden tanımlarıyla yeniden kurulur
+        for trigger in ('trg_creditors_balance_insert', 'trg_records_balance_insert', 'trg_records_balance_delete',
+                        'trg_records_balance_update', 'trg_creditors_stats_insert', 'trg_creditors_stats_delete',
+                        'trg_records_stats_insert', 'trg_records_stats_delete', 'trg_records_stats_update'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        cursor.execute('DROP TABLE IF EXISTS creditor_balances')
+        cursor.execute('DROP TABLE IF EXISTS db_stats')
+
+        # Sürüm numarası elle geri alınmış bir veritabanında kayıtlar zaten dönüştürülmüştür
+        date_type = next(row[2] for row in cursor.execute('PRAGMA table_info(records)') if row[1] == 'date')
+        if date_type.upper() != 'INTEGER':
+            self._convert_legacy_records(cursor)
+
+        # records tablosu yeniden kurulduysa indeksleri ve trigger'ları da silinmiştir
+        self._migrate_ledger_indexes(cursor)
+        self._migrate_search_index(cursor)
+        self._migrate_change_journal(cursor)
+        self._create_creditor_balances(cursor)
+        self._create_database_stats(cursor)
+
+    def _create_creditor_balances(self, cursor: sqlite3.Cursor):
+        """Kuruş cinsinden bakiye özet tablosu ve trigger'ları (göç 7 ve sonrası)"""
+        # Bakiye ve kayıt sayısı kayıt eklendikçe/silindikçe trigger'larla güncellenir,
+        # böylece borçlu listesi records tablosunu taramadan yüklenir
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creditor_balances (
+                creditor_id INTEGER PRIMARY KEY REFERENCES creditors (id) ON DELETE CASCADE,
+                total_debt INTEGER NOT NULL DEFAULT 0,
+                record_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_creditors_balance_insert
+            AFTER INSERT ON creditors
+            BEGIN
+                INSERT OR IGNORE INTO creditor_balances (creditor_id) VALUES (new.id);
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_balance_insert
+            AFTER INSERT ON records
+            BEGIN
+                INSERT OR IGNORE INTO creditor_balances (creditor_id) VALUES (new.creditor_id);
+                UPDATE creditor_balances
+                SET total_debt = total_debt + {BALANCE_DELTA_SQL.format(row='new')},
+                    record_count = record_count + 1
+                WHERE creditor_id = new.creditor_id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_balance_delete
+            AFTER DELETE ON records
+            BEGIN
+                UPDATE creditor_balances
+                SET total_debt = total_debt - {BALANCE_DELTA_SQL.format(row='old')},
+                    record_count = record_count - 1
+                WHERE creditor_id = old.creditor_id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_balance_update
+            AFTER UPDATE OF creditor_id, debt_amount, payment_amount, iskonto, musteri_masrafi ON records
+            BEGIN
+                UPDATE creditor_balances
+                SET total_debt = total_debt - {BALANCE_DELTA_SQL.format(row='old')},
+                    record_count = record_count - 1
+                WHERE creditor_id = old.creditor_id;
+                INSERT OR IGNORE INTO creditor_balances (creditor_id) VALUES (new.creditor_id);
+                UPDATE creditor_balances
+                SET total_debt = total_debt + {BALANCE_DELTA_SQL.format(row='new')},
+                    record_count = record_count + 1
+                WHERE creditor_id = new.creditor_id;
+            END
+        ''')
+
+        # Mevcut kayıtlardan özet tabloyu doldur
+        self._rebuild_creditor_balances(cursor)
+
+
+    def _create_database_stats(self, cursor: sqlite3.Cursor):
+        """Kuruş cinsinden tek satırlık istatistik tablosu ve trigger'ları (göç 7 ve sonrası)"""
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS db_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                creditor_count INTEGER NOT NULL DEFAULT 0,
+                record_count INTEGER NOT NULL DEFAULT 0,
+                {', '.join(f'{total} INTEGER NOT NULL DEFAULT 0' for total, _ in STATS_AMOUNT_COLUMNS)}
+            )
+        ''')
+        cursor.execute('INSERT OR IGNORE INTO db_stats (id) VALUES (1)')
+
+        for operation, sign in (('insert', '+'), ('delete', '-')):
+            row = 'new' if operation == 'insert' else 'old'
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_creditors_stats_{operation}
+                AFTER {operation.upper()} ON creditors
+                BEGIN
+                    UPDATE db_stats SET creditor_count = creditor_count {sign} 1 WHERE id = 1;
+                END
+            ''')
+            totals = ', '.join(f'{total} = {total} {sign} {row}.{column}'
+                               for total, column in STATS_AMOUNT_COLUMNS)
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_records_stats_{operation}
+                AFTER {operation.upper()} ON records
+                BEGIN
+                    UPDATE db_stats SET record_count = record_count {sign} 1, {totals} WHERE id = 1;
+                END
+            ''')
+
+        totals = ', '.join(f'{total} = {total} - old.{column} + new.{column}'
+                           for total, column in STATS_AMOUNT_COLUMNS)
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_stats_update
+            AFTER UPDATE OF {', '.join(column for _, column in STATS_AMOUNT_COLUMNS)} ON records
+            BEGIN
+                UPDATE db_stats SET {totals} WHERE id = 1;
+            END
+        ''')
+
+        # Mevcut verilerden sayaçları doldur
+        self._rebuild_database_stats(cursor)
+
+    def _migrate_monthly_totals(self, cursor: sqlite3.Cursor):
+        """Göç 8: borçlu ve ay başına hareket toplamları (tarihe göre bakiye kontrol noktaları)"""
+        # Geçmiş bir tarihteki bakiye, güncel bakiyeden o tarihten sonraki ayların
+        # toplamları ve o ayın kalan günlerindeki kayıtlar çıkarılarak bulunur
+        # Yabancı anahtar yok: borçlu silinirken kayıtların silme tetikleyicisi satırları kendisi temizler
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS monthly_totals (
+                creditor_id INTEGER NOT NULL,
+                month INTEGER NOT NULL,
+                debt INTEGER NOT NULL DEFAULT 0,
+                payment INTEGER NOT NULL DEFAULT 0,
+                net INTEGER NOT NULL DEFAULT 0,
+                record_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (creditor_id, month)
+            ) WITHOUT ROWID
+        ''')
+
+        def add_sql(row: str, sign: str) -> str:
+            month = _month_sql(f'{row}.date')
+            return f'''
+                INSERT OR IGNORE INTO monthly_totals (creditor_id, month) VALUES ({row}.creditor_id, {month});
+                UPDATE monthly_totals
+                SET debt = debt {sign} {row}.debt_amount,
+                    payment = payment {sign} {row}.payment_amount,
+                    net = net {sign} {BALANCE_DELTA_SQL.format(row=row)},
+                    record_count = record_count {sign} 1
+                WHERE creditor_id = {row}.creditor_id AND month = {month};
+                DELETE FROM monthly_totals
+                WHERE creditor_id = {row}.creditor_id AND month = {month} AND record_count = 0;
+            '''
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_monthly_insert
+            AFTER INSERT ON records
+            BEGIN {add_sql('new', '+')} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_monthly_delete
+            AFTER DELETE ON records
+            BEGIN {add_sql('old', '-')} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_monthly_update
+            AFTER UPDATE OF creditor_id, date, debt_amount, payment_amount, iskonto, musteri_masrafi ON records
+            BEGIN {add_sql('old', '-')} {add_sql('new', '+')} END
+        ''')
+
+        self._rebuild_monthly_totals(cursor)
+
+    def _migrate_journal_origin(self, cursor: sqlite3.Cursor):
+        """Göç 9: günlük kaydını yazan yöneticinin kimliği (kendi yazmaları izlemede atlanır)"""
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(change_journal)')}
+        if 'origin' not in columns:
+            cursor.execute('ALTER TABLE change_journal ADD COLUMN origin TEXT')
+
+    def _migrate_ledger_meta(self, cursor: sqlite3.Cursor):
+        """Göç 10: anahtar/değer defter bilgileri; sıkıştırılmış defterlerde kesim günü"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ledger_meta (
+                key TEXT PRIMARY KEY,
+                value
+            )
+        ''')
+        # Daha önce sıkıştırılmış defterlerde kesim, en son devir kaydının ertesi günüdür
+        cursor.execute('''
+            INSERT OR IGNORE INTO ledger_meta (key, value)
+            SELECT 'compacted_before', last_day + 1
+            FROM (SELECT MAX(date) AS last_day FROM records WHERE description = ?)
+            WHERE last_day IS NOT NULL
+        ''', (OPENING_BALANCE_DESCRIPTION,))
+
+    def _migrate_creditor_compaction(self, cursor: sqlite3.Cursor):
+        """Göç 11: sıkıştırma kesim günü defter yerine borçlu başına tutulur"""
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(creditors)')}
+        if 'compacted_before' not in columns:
+            cursor.execute('ALTER TABLE creditors ADD COLUMN compacted_before INTEGER')
+        # Sıkıştırılmış her borçlunun kesimi, en son devir kaydının ertesi günüdür
+        cursor.execute('''
+            UPDATE creditors
+            SET compacted_before = (SELECT MAX(r.date) + 1 FROM records r
+                                    WHERE r.creditor_id = creditors.id AND r.description = ?)
+            WHERE compacted_before IS NULL
+        ''', (OPENING_BALANCE_DESCRIPTION,))
+        cursor.execute("DELETE FROM ledger_meta WHERE key = 'compacted_before'")
+
+    def _migrate_monthly_balances(self, cursor: sqlite3.Cursor):
+        """Göç 12: aylık kontrol noktalarına borçlunun o ay sonundaki kümülatif bakiyesi eklenir
+
+        Geçmiş bir tarihteki bakiye, o aydan önceki son kontrol noktasının bakiyesine
+        (birincil anahtarda tek arama) o ayın o güne kadarki kayıtları eklenerek bulunur.
+        Bir kayıt, ayından sonraki kontrol noktalarının bakiyesini de günceller;
+        güncel aya yazılan kayıtta bu tek satırdır.
+        """
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(monthly_totals)')}
+        if 'balance' not in columns:
+            cursor.execute('ALTER TABLE monthly_totals ADD COLUMN balance INTEGER NOT NULL DEFAULT 0')
+        for operation in ('insert', 'delete', 'update'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS trg_records_monthly_{operation}')
+
+        def add_sql(row: str, sign: str) -> str:
+            month = _month_sql(f'{row}.date')
+            return f'''
+                INSERT OR IGNORE INTO monthly_totals (creditor_id, month, balance)
+                VALUES ({row}.creditor_id, {month},
+                        COALESCE((SELECT balance FROM monthly_totals
+                                  WHERE creditor_id = {row}.creditor_id AND month < {month}
+                                  ORDER BY month DESC LIMIT 1), 0));
+                UPDATE monthly_totals
+                SET debt = debt {sign} {row}.debt_amount,
+                    payment = payment {sign} {row}.payment_amount,
+                    net = net {sign} {BALANCE_DELTA_SQL.format(row=row)},
+                    record_count = record_count {sign} 1
+                WHERE creditor_id = {row}.creditor_id AND month = {month};
+                UPDATE monthly_totals
+                SET balance = balance {sign} {BALANCE_DELTA_SQL.format(row=row)}
+                WHERE creditor_id = {row}.creditor_id AND month >= {month};
+                DELETE FROM monthly_totals
+                WHERE creditor_id = {row}.creditor_id AND month = {month} AND record_count = 0;
+            '''
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_monthly_insert
+            AFTER INSERT ON records
+            BEGIN {add_sql('new', '+')} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_monthly_delete
+            AFTER DELETE ON records
+            BEGIN {add_sql('old', '-')} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_records_monthly_update
+            AFTER UPDATE OF creditor_id, date, debt_amount, payment_amount, iskonto, musteri_masrafi ON records
+            BEGIN {add_sql('old', '-')} {add_sql('new', '+')} END
+        ''')
+
+        self._rebuild_monthly_balances(cursor)
+
+    def _migrate_journal_origin_triggers(self, cursor: sqlite3.Cursor):
+        """Göç 13: günlük tetikleyicileri origin'i satırı eklerken yazar (ikinci bir UPDATE gerekmez)"""
+        for table, columns in JOURNAL_COLUMNS.items():
+            for operation, row in (('insert', 'new'), ('update', 'new'), ('delete', 'old')):
+                row_image = ', '.join(f"'{column}', {row}.{column}" for column in columns)
+                cursor.execute(f'DROP TRIGGER IF EXISTS trg_{table}_journal_{operation}')
+                cursor.execute(f'''
+                    CREATE TRIGGER trg_{table}_journal_{operation}
+                    AFTER {operation.upper()} ON {table}
+                    BEGIN
+                        INSERT INTO change_journal (changed_at, table_name, operation, row_id, row_data, origin)
+                        VALUES ({JOURNAL_TIME_SQL}, '{table}', '{operation}', {row}.id, json_object({row_image}),
+                                {JOURNAL_ORIGIN_SQL});
+                    END
+                ''')
+
+    def _rebuild_monthly_balances(self, cursor: sqlite3.Cursor):
+        """Aylık toplamları ve kümülatif bakiyeleri records tablosundan hesapla (açık transaction içinde)"""
+        cursor.execute('DELETE FROM monthly_totals')
+        cursor.execute(f'''
+            INSERT INTO monthly_totals (creditor_id, month, debt, payment, net, record_count, balance)
+            SELECT creditor_id, month, debt, payment, net, record_count,
+                   SUM(net) OVER (PARTITION BY creditor_id ORDER BY month)
+            FROM (SELECT creditor_id, {_month_sql('date')} AS month, SUM(debt_amount) AS debt,
+                         SUM(payment_amount) AS payment, SUM({BALANCE_DELTA_SQL.format(row='records')}) AS net,
+                         COUNT(*) AS record_count
+                  FROM records
+                  GROUP BY 1, 2)
+        ''')
+
+    def _rebuild_monthly_totals(self, cursor: sqlite3.Cursor):
+        """Aylık toplamları records tablosundan hesapla (açık transaction içinde)"""
+        cursor.execute('DELETE FROM monthly_totals')
+        cursor.execute(f'''
+            INSERT INTO monthly_totals (creditor_id, month, debt, payment, net, record_count)
+            SELECT creditor_id, {_month_sql('date')}, SUM(debt_amount), SUM(payment_amount),
+                   SUM({BALANCE_DELTA_SQL.format(row='records')}), COUNT(*)
+            FROM records
+            GROUP BY 1, 2
+        ''')
+
+    def _convert_legacy_records(self, cursor: sqlite3.Cursor):
+        """records tablosunu ve günlükteki kayıt görüntülerini kuruş/gün numarası/durum koduna çevir"""
+        # Kayıtlarda ve günlükte geçen diğer durumlar sıradaki kodları alır
+        cursor.execute('''
+            INSERT OR IGNORE INTO payment_statuses (name)
+            SELECT payment_status FROM records WHERE payment_status != ''
+            UNION
+            SELECT json_extract(row_data, '$.payment_status') FROM change_journal
+            WHERE table_name = 'records' AND json_extract(row_data, '$.payment_status') != ''
+            ORDER BY 1
+        ''')
+        cursor.execute('''
+            CREATE TABLE records_compact (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                creditor_id INTEGER NOT NULL,
+                date INTEGER NOT NULL,
+                description TEXT NOT NULL DEFAULT '',
+                debt_amount INTEGER NOT NULL DEFAULT 0,
+                payment_amount INTEGER NOT NULL DEFAULT 0,
+                payment_status INTEGER NOT NULL DEFAULT 0,
+                kod1 TEXT NOT NULL DEFAULT '',
+                kod2 TEXT NOT NULL DEFAULT '',
+                birim TEXT NOT NULL DEFAULT '',
+                iskonto INTEGER NOT NULL DEFAULT 0,
+                musteri_masrafi INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (creditor_id) REFERENCES creditors (id) ON DELETE CASCADE
+            )
+        ''')
+        # Borçlusu silinmiş (yabancı anahtar kapalıyken kalmış) kayıtlar taşınmaz
+        cursor.execute(f'''
+            INSERT INTO records_compact (id, creditor_id, date, description, debt_amount, payment_amount,
+                                         payment_status, kod1, kod2, birim, iskonto, musteri_masrafi, created_at)
+            SELECT r.id, r.creditor_id, {_legacy_day_sql('r.date', 'r.created_at')}, COALESCE(r.description, ''),
+                   {_legacy_money_sql('r.debt_amount')}, {_legacy_money_sql('r.payment_amount')},
+                   COALESCE(s.code, 0), COALESCE(r.kod1, ''), COALESCE(r.kod2, ''), COALESCE(r.birim, ''),
+                   {_legacy_money_sql('r.iskonto')}, {_legacy_money_sql('r.musteri_masrafi')},
+                   COALESCE(r.created_at, CURRENT_TIMESTAMP)
+            FROM records r
+            JOIN creditors c ON c.id = r.creditor_id
+            LEFT JOIN payment_statuses s ON s.name = r.payment_status
+        ''')
+
+        # AUTOINCREMENT sayacı korunur: silinmiş en yüksek id'ler yeniden kullanılmaz
+        row = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'records'").fetchone()
+        cursor.execute('DROP TABLE records')
+        cursor.execute('ALTER TABLE records_compact RENAME TO records')
+        if row:
+            cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'records'", row)
+
+        # Günlükteki eski satır görüntüleri zamana göre geri yüklemede yeni şemaya uygulanır
+        data = "json_extract(row_data, '$.{}')".format
+        cursor.execute(f'''
+            UPDATE change_journal
+            SET row_data = json_set(row_data,
+                '$.date', {_legacy_day_sql(data('date'), data('created_at'))},
+                '$.description', COALESCE({data('description')}, ''),
+                '$.debt_amount', {_legacy_money_sql(data('debt_amount'))},
+                '$.payment_amount', {_legacy_money_sql(data('payment_amount'))},
+                '$.payment_status', COALESCE((SELECT code FROM payment_statuses
+                                              WHERE name = {data('payment_status')}), 0),
+                '$.kod1', COALESCE({data('kod1')}, ''),
+                '$.kod2', COALESCE({data('kod2')}, ''),
+                '$.birim', COALESCE({data('birim')}, ''),
+                '$.iskonto', {_legacy_money_sql(data('iskonto'))},
+                '$.musteri_masrafi', {_legacy_money_sql(data('musteri_masrafi'))})
+            WHERE table_name = 'records'
+        ''')
+
+    def _rebuild_creditor_balances(self, cursor: sqlite3.Cursor):
+        """Bakiye özet tablosunu records tablosundan hesapla (açık transaction içinde)"""
+        cursor.execute('DELETE FROM creditor_balances')
+        cursor.execute(f'''
+            INSERT INTO creditor_balances (creditor_id, total_debt, record_count)
+            SELECT c.id, COALESCE(SUM({BALANCE_DELTA_SQL.format(row='r')}), 0), COUNT(r.id)
+            FROM creditors c
+            LEFT JOIN records r ON r.creditor_id = c.id
+            GROUP BY c.id
+        ''')
+
+    def rebuild_creditor_balances(self) -> bool:
+        """Bakiye özet tablosunu ve aylık toplamları records tablosundan baştan hesapla"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN')
+                self._rebuild_creditor_balances(cursor)
+                self._rebuild_monthly_balances(cursor)
+            return True
+        except Exception as e:
+            print(f"Bakiye tablosu yeniden oluşturulurken hata: {e}")
+            return False
+
+    def verify_creditor_balances(self) -> Optional[List[Dict[str, Any]]]:
+        """Bakiye özet tablosunu gerçek toplamlarla karşılaştır, tutarsızlıkları döndür"""
+        try:
+            cursor = self._get_connection().cursor()
+            cursor.execute(f'''
+                SELECT c.id, c.name,
+                       b.total_debt, b.record_count,
+                       COALESCE(SUM({BALANCE_DELTA_SQL.format(row='r')}), 0), COUNT(r.id)
+                FROM creditors c
+                LEFT JOIN creditor_balances b ON b.creditor_id = c.id
+                LEFT JOIN records r ON r.creditor_id = c.id
+                GROUP BY c.id
+            ''')
+
+            mismatches = []
+            for row in cursor.fetchall():
+                stored_debt, stored_count, actual_debt, actual_count = row[2], row[3], row[4], row[5]
+                # Kuruş cinsinden tamsayılar birebir karşılaştırılır
+                if stored_debt != actual_debt or stored_count != actual_count:
+                    mismatches.append({
+                        'id': row[0],
+                        'name': row[1],
+                        'stored_total_debt': None if stored_debt is None else from_minor_units(stored_debt),
+                        'stored_record_count': stored_count,
+                        'total_debt': from_minor_units(actual_debt),
+                        'record_count': actual_count
+                    })
+            return mismatches
+        except Exception as e:
+            print(f"Bakiye doğrulama hatası: {e}")
+            return None
+    
+    def create_backup(self, operation_type: str = "manual"):
+        """Veritabanının artımlı yedeğini oluştur
+
+        Veritabanı anlık görüntüsü sabit boyutlu parçalara bölünür; her parça içerik
+        özetiyle (SHA-256) adlandırılıp sıkıştırılarak chunks klasörüne bir kez yazılır.
+        Her yedek yalnızca parça listesini tutan bir manifest dosyasıdır, böylece
+        değişmeyen parçalar yedekler arasında paylaşılır. Yedek bilgileri ve parça
+        referans sayıları yedek kataloğuna kaydedilir.
+        """
+        try:
+            # Zamanlayıcı ve manuel yedekler aynı anda çalışmasın
+            with self._backup_lock:
+                # Artımlı yedekler ucuz olduğu için aynı saniyede birden fazla alınabilir
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+                backup_filename = f"veresiye_defteri_backup_{timestamp}_{operation_type}{MANIFEST_SUFFIX}"
+                backup_path = os.path.join(self.backup_dir, backup_filename)
+
+                conn = self._get_connection()
+                snapshot_path = os.path.join(self.backup_dir, 'snapshot.tmp')
+                try:
+                    # Anlık görüntü, sayaçlar ve değişiklik günlüğü sırası aynı okuma
+                    # transaction'ında alınır; zamana göre geri yükleme günlüğü bu sıradan
+                    # itibaren uygular
+                    with conn:
+                        conn.execute('BEGIN')
+                        journal_seq = self._journal_high_water(conn)
+                        creditor_count, record_count = conn.execute(
+                            'SELECT creditor_count, record_count FROM db_stats WHERE id = 1').fetchone()
+                        self._snapshot_database(snapshot_path)
+                    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+
+                    # Anlık görüntü parça parça okunur; veritabanının tamamı belleğe alınmaz
+                    catalog = self._get_catalog()
+                    with catalog, open(snapshot_path, 'rb') as snapshot:
+                        chunks = []
+                        new_chunks = 0
+                        size = 0
+                        file_digest = hashlib.sha256()
+                        for chunk in iter(lambda: snapshot.read(BACKUP_CHUNK_SIZE), b''):
+                            size += len(chunk)
+                            file_digest.update(chunk)
+                            digest = hashlib.sha256(chunk).hexdigest()
+                            if self._store_chunk(catalog, digest, chunk):
+                                new_chunks += 1
+                            chunks.append(digest)
+                finally:
+                    if os.path.exists(snapshot_path):
+                        os.remove(snapshot_path)
+
+                with catalog:
+                    manifest = {
+                        'format': 1,
+                        'created_at': datetime.now().isoformat(),
+                        'operation_type': operation_type,
+                        'size': size,
+                        'page_size': page_size,
+                        'chunk_size': BACKUP_CHUNK_SIZE,
+                        'sha256': file_digest.hexdigest(),
+                        'journal_seq': journal_seq,
+                        'creditor_count': creditor_count,
+                        'record_count': record_count,
+                        'chunks': chunks,
+                    }
+                    temp_path = backup_path + '.tmp'
+                    with open(temp_path, 'w', encoding='utf-8') as f:
+                        json.dump(manifest, f, separators=(',', ':'))
+                    os.replace(temp_path, backup_path)
+
+                    self._catalog_add_manifest(catalog, backup_filename, manifest,
+                                               os.path.getsize(backup_path))
+
+                # Eski yedekleri temizle (son 200 yedek hariç)
+                self.cleanup_old_backups()
+
+            print(f"✅ Yedek oluşturuldu: {backup_filename} ({new_chunks}/{len(chunks)} yeni parça)")
+            return backup_path
+            
+        except Exception as e:
+            print(f"❌ Yedek oluşturulamadı: {e}")
+            return None
+
+    def _snapshot_database(self, target_path: str):
+        """Veritabanının tutarlı bir kopyasını çevrimiçi yedekleme API'si ile dosyaya yaz"""
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        backup_conn = sqlite3.connect(target_path)
+        try:
+            self._get_connection().backup(backup_conn)
+        finally:
+            backup_conn.close()
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunk_dir, digest[:2], digest + '.z')
+
+    def _store_chunk(self, catalog: sqlite3.Connection, digest: str, chunk: bytes) -> bool:
+        """Katalogda olmayan parçayı sıkıştırarak yaz; yeni yazıldıysa True döndür"""
+        if catalog.execute('SELECT 1 FROM chunks WHERE hash = ?', (digest,)).fetchone():
+            return False
+        chunk_path = self._chunk_path(digest)
+        os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+        compressed = zlib.compress(chunk, 6)
+        temp_path = chunk_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(temp_path, chunk_path)
+        catalog.execute('INSERT INTO chunks (hash, stored_size, ref_count) VALUES (?, ?, 0)',
+                        (digest, len(compressed)))
+        return True
+
+    def extract_backup(self, backup_path: str, target_path: str) -> Optional[str]:
+        """Yedeği (manifest ya da eski tam .db kopyası) çalışır bir .db dosyası olarak çıkar"""
+        try:
+            temp_path = target_path + '.tmp'
+            if not backup_path.endswith(MANIFEST_SUFFIX):
+                # Eski biçim: tam veritabanı kopyası
+                source = sqlite3.connect(backup_path)
+                target = sqlite3.connect(temp_path)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                    source.close()
+            else:
+                with open(backup_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+
+                digest = hashlib.sha256()
+                with open(temp_path, 'wb') as out:
+                    for chunk_hash in manifest['chunks']:
+                        with open(self._chunk_path(chunk_hash), 'rb') as f:
+                            chunk = zlib.decompress(f.read())
+                        digest.update(chunk)
+                        out.write(chunk)
+
+                if digest.hexdigest() != manifest['sha256']:
+                    os.remove(temp_path)
+                    print(f"❌ Yedek bozuk, özet uyuşmuyor: {backup_path}")
+                    return None
+
+            os.replace(temp_path, target_path)
+            return target_path
+
+        except Exception as e:
+            print(f"Yedek çıkarılırken hata: {e}")
+            return None
+
+    # ---------- YEDEK KATALOĞU ----------
+    def _get_catalog(self) -> sqlite3.Connection:
+        """Yedek kataloğu bağlantısını döndür (_backup_lock altında kullanılır)
+
+        Katalog yedek klasöründeki küçük bir SQLite veritabanıdır; yedeklerin zamanı,
+        türü, boyutu, özeti ve kayıt sayıları ile parçaların referans sayılarını tutar.
+        Klasör yalnızca katalog ilk oluşturulurken ya da yeniden kurulurken taranır.
+        """
+        with self._backup_lock:
+            if self._catalog is None:
+                is_new = not os.path.exists(self.catalog_path)
+                catalog = sqlite3.connect(self.catalog_path, check_same_thread=False)
+                catalog.executescript('''
+                    CREATE TABLE IF NOT EXISTS backups (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        filename TEXT NOT NULL UNIQUE,
+                        created_at TEXT NOT NULL,
+                        operation_type TEXT NOT NULL,
+                        format TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        stored_bytes INTEGER NOT NULL,
+                        sha256 TEXT,
+                        creditor_count INTEGER,
+                        record_count INTEGER,
+                        journal_seq INTEGER
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_backups_created ON backups(created_at);
+                    CREATE TABLE IF NOT EXISTS chunks (
+                        hash TEXT PRIMARY KEY,
+                        stored_size INTEGER NOT NULL,
+                        ref_count INTEGER NOT NULL
+                    ) WITHOUT ROWID;
+                ''')
+                self._catalog = catalog
+                if is_new:
+                    self.rebuild_backup_catalog()
+            return self._catalog
+
+    def _catalog_add_manifest(self, catalog: sqlite3.Connection, backup_filename: str,
+                              manifest: Dict[str, Any], stored_bytes: int):
+        """Manifest yedeğini kataloğa ekle ve parçalarının referans sayılarını artır"""
+        catalog.execute('''
+            INSERT OR REPLACE INTO backups
+                (filename, created_at, operation_type, format, size, stored_bytes, sha256,
+                 creditor_count, record_count, journal_seq)
+            VALUES (?, ?, ?, 'chunked', ?, ?, ?, ?, ?, ?)
+        ''', (backup_filename, manifest['created_at'], manifest['operation_type'], manifest['size'],
+              stored_bytes, manifest['sha256'], manifest.get('creditor_count'),
+              manifest.get('record_count'), manifest.get('journal_seq')))
+        catalog.executemany('UPDATE chunks SET ref_count = ref_count + 1 WHERE hash = ?',
+                            [(digest,) for digest in set(manifest['chunks'])])
+
+    def rebuild_backup_catalog(self) -> bool:
+        """Yedek kataloğunu yedek klasörünü tarayarak baştan oluştur"""
+        try:
+            with self._backup_lock:
+                catalog = self._get_catalog()
+                pattern = re.compile(r'^veresiye_defteri_backup_(\d{8}_\d{6})(?:_\d{6})?_(.+?)'
+                                     r'(' + re.escape(MANIFEST_SUFFIX) + r'|\.db)$')
+                with catalog:
+                    catalog.execute('DELETE FROM backups')
+                    catalog.execute('DELETE FROM chunks')
+
+                    # Diskteki parçalar referans sayısı sıfır olarak eklenir
+                    if os.path.exists(self.chunk_dir):
+                        for prefix in os.listdir(self.chunk_dir):
+                            prefix_dir = os.path.join(self.chunk_dir, prefix)
+                            for chunk_file in os.listdir(prefix_dir):
+                                if chunk_file.endswith('.z'):
+                                    catalog.execute('INSERT INTO chunks (hash, stored_size, ref_count) VALUES (?, ?, 0)',
+                                                    (chunk_file[:-2], os.path.getsize(os.path.join(prefix_dir, chunk_file))))
+
+                    for backup_file in os.listdir(self.backup_dir):
+                        match = pattern.match(backup_file)
+                        if not match:
+                            continue
+                        backup_path = os.path.join(self.backup_dir, backup_file)
+                        if match.group(3) == MANIFEST_SUFFIX:
+                            self._catalog_add_manifest(catalog, backup_file, self._read_manifest(backup_file),
+                                                       os.path.getsize(backup_path))
+                        else:
+                            self._catalog_add_full_backup(catalog, backup_file, match)
+
+                    # Hiçbir yedeğin kullanmadığı parçaları sil
+                    orphans = catalog.execute('SELECT hash FROM chunks WHERE ref_count = 0').fetchall()
+                    for (digest,) in orphans:
+                        os.remove(self._chunk_path(digest))
+                    catalog.execute('DELETE FROM chunks WHERE ref_count = 0')
+            return True
+        except Exception as e:
+            print(f"Yedek kataloğu oluşturulurken hata: {e}")
+            return False
+
+    def _catalog_add_full_backup(self, catalog: sqlite3.Connection, backup_file: str, match):
+        """Eski biçim tam .db yedeğini (ve JSON kopyalarını) kataloğa ekle"""
+        backup_path = os.path.join(self.backup_dir, backup_file)
+        stored_bytes = os.path.getsize(backup_path)
+        for json_path in (os.path.splitext(backup_path)[0] + '.json',
+                          os.path.splitext(backup_path)[0] + '.json.gz'):
+            if os.path.exists(json_path):
+                stored_bytes += os.path.getsize(json_path)
+
+        creditor_count = record_count = None
+        try:
+            source = sqlite3.connect(f'file:{backup_path}?mode=ro', uri=True)
+            try:
+                creditor_count = source.execute('SELECT COUNT(*) FROM creditors').fetchone()[0]
+                record_count = source.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+            finally:
+                source.close()
+        except sqlite3.Error:
+            pass
+
+        created_at = datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').isoformat()
+        catalog.execute('''
+            INSERT OR REPLACE INTO backups
+                (filename, created_at, operation_type, format, size, stored_bytes,
+                 creditor_count, record_count)
+            VALUES (?, ?, ?, 'full', ?, ?, ?, ?)
+        ''', (backup_file, created_at, match.group(2), os.path.getsize(backup_path), stored_bytes,
+              creditor_count, record_count))
+
+    def _read_manifest(self, backup_file: str) -> Dict[str, Any]:
+        with open(os.path.join(self.backup_dir, backup_file), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list_backups(self) -> List[str]:
+        """Yedek dosyalarının adlarını en yeniden eskiye doğru döndür"""
+        return [backup['filename'] for backup in self.get_backup_catalog()]
+
+    def get_backup_catalog(self) -> List[Dict[str, Any]]:
+        """Katalogdaki yedekleri en yeniden eskiye doğru döndür"""
+        try:
+            with self._backup_lock:
+                cursor = self._get_catalog().execute('''
+                    SELECT filename, created_at, operation_type, format, size, stored_bytes,
+                           sha256, creditor_count, record_count, journal_seq
+                    FROM backups ORDER BY created_at DESC, id DESC
+                ''')
+                columns = [col[0] for col in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Yedek kataloğu okunurken hata: {e}")
+            return []
+
+    def cleanup_old_backups(self, keep_count: int = 200):
+        """Eski yedekleri ve artık hiçbir yedeğin kullanmadığı parçaları temizle"""
+        try:
+            with self._backup_lock:
+                catalog = self._get_catalog()
+                old_backups = catalog.execute('''
+                    SELECT id, filename, format FROM backups
+                    ORDER BY created_at DESC, id DESC LIMIT -1 OFFSET ?
+                ''', (keep_count,)).fetchall()
+
+                deleted_count = 0
+                removed_chunks = 0
+                with catalog:
+                    for backup_id, backup_file, backup_format in old_backups:
+                        old_path = os.path.join(self.backup_dir, backup_file)
+                        if backup_format == 'chunked' and os.path.exists(old_path):
+                            # Parçaların referans sayılarını düşür, sıfıra inenleri sil
+                            chunk_hashes = set(self._read_manifest(backup_file)['chunks'])
+                            catalog.executemany('UPDATE chunks SET ref_count = ref_count - 1 WHERE hash = ?',
+                                                [(digest,) for digest in chunk_hashes])
+                        # Eski tam yedeklerin JSON kopyalarını da sil (.json ve .json.gz biçimi)
+                        for path in (old_path, os.path.splitext(old_path)[0] + '.json',
+                                     os.path.splitext(old_path)[0] + '.json.gz'):
+                            if os.path.exists(path):
+                                os.remove(path)
+                        catalog.execute('DELETE FROM backups WHERE id = ?', (backup_id,))
+                        deleted_count += 1
+
+                    for (digest,) in catalog.execute('SELECT hash FROM chunks WHERE ref_count <= 0').fetchall():
+                        chunk_path = self._chunk_path(digest)
+                        if os.path.exists(chunk_path):
+                            os.remove(chunk_path)
+                        removed_chunks += 1
+                    catalog.execute('DELETE FROM chunks WHERE ref_count <= 0')
+
+                # Silinen yedeklerle birlikte, kalan en eski yedekten önceki günlük kayıtları
+                # artık hiçbir geri yüklemede kullanılmaz. Budama yalnızca yedek silindiğinde
+                # ve en eski yedeğin sırasına kadar yapılır: günlüğün tamamını silmek neredeyse
+                # tüm sayfaları değiştirir ve sonraki yedek bütün parçaları yeniden yazar
+                oldest_seq = catalog.execute('SELECT MIN(journal_seq) FROM backups').fetchone()[0]
+                if deleted_count > 0 and oldest_seq is not None:
+                    self.prune_change_journal(oldest_seq)
+
+            if deleted_count > 0:
+                print(f"🗑️ {deleted_count} eski yedek dosyası temizlendi")
+            if removed_chunks > 0:
+                print(f"🗑️ {removed_chunks} kullanılmayan yedek parçası temizlendi")
+            return deleted_count
+
+        except Exception as e:
+            print(f"Eski yedekler temizlenirken hata: {e}")
+            return 0
+
+    def _get_backup_stats(self) -> Dict[str, int]:
+        """Yedek sayısı ve diskte kapladığı toplam boyut (katalogdan)"""
+        with self._backup_lock:
+            catalog = self._get_catalog()
+            count, backup_bytes = catalog.execute('SELECT COUNT(*), COALESCE(SUM(stored_bytes), 0) FROM backups').fetchone()
+            chunk_bytes = catalog.execute('SELECT COALESCE(SUM(stored_size), 0) FROM chunks').fetchone()[0]
+            return {'count': count, 'size': backup_bytes + chunk_bytes}
+
+    # ---------- GERİ YÜKLEME ----------
+    def restore_backup(self, backup_file: str) -> bool:
+        """Katalogdaki bir yedeği çalışan veritabanına geri yükle (uygulama yeniden başlatılmaz)"""
+        temp_path = os.path.join(self.backup_dir, 'restore.tmp.db')
+        try:
+            if not self.extract_backup(os.path.join(self.backup_dir, backup_file), temp_path):
+                return False
+            return self._restore_into_live(temp_path, backup_file)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def rollback_to_point_in_time(self, target_time) -> bool:
+        """Çalışan veritabanını verilen andaki haline döndür"""
+        temp_path = os.path.join(self.backup_dir, 'restore.tmp.db')
+        try:
+            if not self.restore_to_point_in_time(target_time, temp_path):
+                return False
+            return self._restore_into_live(temp_path, str(target_time))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _restore_into_live(self, source_path: str, label: str) -> bool:
+        """Hazırlanmış veritabanı dosyasını SQLite yedekleme API'si ile canlı veritabanına kopyala"""
+        try:
+            # Geri yüklemeden önceki hal de bir yedek olarak saklanır
+            self.create_backup("before_restore")
+
+            source = sqlite3.connect(source_path)
+            try:
+                source.backup(self._get_connection())
+            finally:
+                source.close()
+            # Sayfa kopyalaması bu bağlantının satır sayacına yansımaz
+            self._query_cache.invalidate()
+            self._status_codes, self._status_names = {}, {}
+
+            # Eski sürümden alınmış yedek şema göçlerinden geçirilir
+            conn = self._get_connection()
+            if conn.execute('PRAGMA user_version').fetchone()[0] < self.SCHEMA_VERSION:
+                self.migrate_schema(conn)
+            cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'creditors_fts'")
+            self.fts_enabled = cursor.fetchone() is not None
+
+            # Geri yüklenen günlüğe eklenecek yeni kayıtların sıra numaraları, katalogdaki
+            # yedeklerin başvurduğu numaralarla çakışmasın. Sayaç bir fazlasına alınır:
+            # değişiklik izleyicileri boş kalan numaradan toptan değişikliği anlar
+            with self._backup_lock:
+                max_seq = self._get_catalog().execute('SELECT MAX(journal_seq) FROM backups').fetchone()[0] or 0
+            max_seq = max(max_seq, self._journal_high_water(conn)) + 1
+            with conn:
+                conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'change_journal'", (max_seq,))
+                conn.execute('''
+                    INSERT INTO sqlite_sequence (name, seq)
+                    SELECT 'change_journal', ? WHERE NOT EXISTS
+                        (SELECT 1 FROM sqlite_sequence WHERE name = 'change_journal')
+                ''', (max_seq,))
+
+            # Geri yüklenen hal hemen yedeklenir; sonraki zamana göre geri yüklemeler
+            # bu yeni başlangıç noktasını kullanır
+            self.create_backup("after_restore")
+            print(f"✅ Geri yükleme tamamlandı: {label}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Geri yükleme hatası: {e}")
+            return False
+
+    def cleanup_old_records(self, keep_days: int = 365):
+        """Eski kayıtları temizle - sadece son X gün tutulsun (kayıtlar arşive taşınır)"""
+        result = self.archive_old_records(keep_days)
+        return result['archived_count'] if result else 0
+
+    def _attach_archive(self, conn: sqlite3.Connection):
+        """Arşiv veritabanını 'archive' adıyla bağla, tablo yoksa oluştur"""
+        conn.execute('ATTACH DATABASE ? AS archive', (self.archive_path,))
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS archive.archived_records (
+                id INTEGER PRIMARY KEY,
+                creditor_id INTEGER NOT NULL,
+                creditor_name TEXT NOT NULL,
+                date TEXT NOT NULL,
+                description TEXT NOT NULL,
+                debt_amount REAL DEFAULT 0.0,
+                payment_amount REAL DEFAULT 0.0,
+                payment_status TEXT DEFAULT 'Ödenmedi',
+                kod1 TEXT DEFAULT '',
+                kod2 TEXT DEFAULT '',
+                birim TEXT DEFAULT '',
+                iskonto REAL DEFAULT 0.0,
+                musteri_masrafi REAL DEFAULT 0.0,
+                created_at TIMESTAMP,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS archive.idx_archived_creditor ON archived_records(creditor_id, date)')
+        conn.execute('CREATE INDEX IF NOT EXISTS archive.idx_archived_date ON archived_records(date)')
+        conn.commit()
+
+    def _detach_archive(self, conn: sqlite3.Connection):
+        try:
+            conn.execute('DETACH DATABASE archive')
+        except sqlite3.OperationalError as e:
+            print(f"Arşiv veritabanı ayrılırken hata: {e}")
+
+    def archive_old_records(self, keep_days: int = 365, chunk_size: int = 500,
+                            progress_callback=None) -> Optional[Dict[str, int]]:
+        """Eski kayıtları parça parça arşiv veritabanına taşı ve boşalan alanı geri kazan
+
+        Her parça ayrı bir transaction'da taşınır; böylece yazma kilidi kısa tutulur
+        ve WAL dosyası büyümez. progress_callback(tasinan, toplam) False döndürürse
+        işlem o parçadan sonra durur (taşınmış kayıtlar arşivde kalır).
+        Sonuçta taşınan kayıt, silinen boş borçlu ve geri kazanılan bayt sayısı döner.
+        """
+        cutoff_date = datetime.now() - timedelta(days=keep_days)
+        params = (cutoff_date.toordinal(), cutoff_date.isoformat())
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM records WHERE date < ? AND created_at < ?', params)
+            total = cursor.fetchone()[0]
+            if total == 0:
+                return {'archived_count': 0, 'deleted_creditors': 0, 'reclaimed_bytes': 0}
+
+            self._attach_archive(conn)
+            try:
+                archived = 0
+                affected_creditors = set()
+                while archived < total:
+                    with conn:
+                        cursor.execute('BEGIN IMMEDIATE')
+                        cursor.execute('''
+                            SELECT id, creditor_id FROM records
+                            WHERE date < ? AND created_at < ?
+                            ORDER BY id LIMIT ?
+                        ''', params + (chunk_size,))
+                        rows = cursor.fetchall()
+                        if not rows:
+                            break
+                        ids = [row[0] for row in rows]
+                        affected_creditors.update(row[1] for row in rows)
+                        placeholders = ','.join('?' * len(ids))
+
+                        self._move_to_archive(cursor, f'r.id IN ({placeholders})', ids)
+                    archived += len(ids)
+
+                    if progress_callback and progress_callback(archived, total) is False:
+                        break
+
+                # Yalnızca kayıtları arşivlenen ve hiç kaydı kalmayan borçlular silinir
+                with conn:
+                    cursor.execute('BEGIN IMMEDIATE')
+                    cursor.executemany('''
+                        DELETE FROM creditors
+                        WHERE id = ? AND NOT EXISTS (SELECT 1 FROM records WHERE creditor_id = ?)
+                    ''', [(creditor_id, creditor_id) for creditor_id in affected_creditors])
+                    deleted_creditors = max(cursor.rowcount, 0)
+            finally:
+                self._detach_archive(conn)
+
+            reclaimed_bytes = self._reclaim_free_pages(conn)
+
+            print(f"🗑️ {archived} eski kayıt arşive taşındı")
+            if deleted_creditors > 0:
+                print(f"🗑️ {deleted_creditors} boş borçlu kaydı temizlendi")
+            print(f"💾 {reclaimed_bytes / 1024:.1f} KB alan geri kazanıldı")
+
+            # Temizlik sonrası yedeklemeyi zamanlayıcıya bildir
+            self._backup_scheduler.notify_change("cleanup")
+
+            return {'archived_count': archived, 'deleted_creditors': deleted_creditors,
+                    'reclaimed_bytes': reclaimed_bytes}
+
+        except Exception as e:
+            print(f"Eski kayıtlar arşivlenirken hata: {e}")
+            return None
+
+    def _move_to_archive(self, cursor: sqlite3.Cursor, where: str, params) -> int:
+        """Koşula uyan kayıtları arşive kopyala ve ana tablodan sil (açık transaction içinde)"""
+        # WAL kipinde iki dosyalı commit dosya bazında atomiktir; yarıda kalan bir
+        # işlem yeniden çalıştırıldığında OR IGNORE ile tekrar eklenmez. Arşiv, ana
+        # şemadan bağımsız olarak lira, metin tarih ve durum adıyla saklanır
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO archive.archived_records
+                (id, creditor_id, creditor_name, date, description, debt_amount,
+                 payment_amount, payment_status, kod1, kod2, birim, iskonto,
+                 musteri_masrafi, created_at)
+            SELECT r.id, r.creditor_id, c.name, date(r.date + {JULIAN_DAY_OFFSET}), r.description,
+                   r.debt_amount / {MONEY_SCALE}.0, r.payment_amount / {MONEY_SCALE}.0,
+                   COALESCE(s.name, '{PAYMENT_STATUSES[0][1]}'), r.kod1, r.kod2, r.birim,
+                   r.iskonto / {MONEY_SCALE}.0, r.musteri_masrafi / {MONEY_SCALE}.0, r.created_at
+            FROM records r
+            JOIN creditors c ON c.id = r.creditor_id
+            LEFT JOIN payment_statuses s ON s.code = r.payment_status
+            WHERE {where}
+        ''', params)
+        cursor.execute(f'DELETE FROM records WHERE id IN (SELECT r.id FROM records r WHERE {where})', params)
+        return cursor.rowcount
+
+    def compact_opening_balances(self, keep_days: int = 365, creditor_id: int = None,
+                                 progress_callback=None) -> Optional[Dict[str, int]]:
+        """Kesim tarihinden önceki kayıtları borçlu başına tek bir devir kaydında topla
+
+        Eski kayıtlar arşive taşınır; yerlerine kesimden bir gün önceye tarihli,
+        aynı bakiyeyi taşıyan bir "Devreden Bakiye" kaydı eklenir. Böylece güncel
+        bakiye değişmez ama defter, PDF ve yazdırma yalnızca yakın tarihli kayıtları
+        dolaşır. Kesim günü borçlunun compacted_before sütununa yazılır; o borçlunun
+        devir kaydından önceki günlerine ait bakiye ve hareket raporları artık
+        CompactedHistoryError ile reddedilir.
+        Her borçlu ayrı bir transaction'da sıkıştırılır; progress_callback(islenen, toplam)
+        False döndürürse işlem o borçludan sonra durur.
+        """
+        cutoff_day = (date.today() - timedelta(days=keep_days)).toordinal()
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            # Kesimden önce tek kaydı olan borçlu zaten sıkıştırılmış sayılır
+            cursor.execute('''
+                SELECT creditor_id FROM records
+                WHERE date < ? AND (? IS NULL OR creditor_id = ?)
+                GROUP BY creditor_id HAVING COUNT(*) > 1
+            ''', (cutoff_day, creditor_id, creditor_id))
+            creditor_ids = [row[0] for row in cursor.fetchall()]
+            if not creditor_ids:
+                return {'compacted_creditors': 0, 'archived_count': 0, 'reclaimed_bytes': 0}
+
+            self._attach_archive(conn)
+            try:
+                compacted = archived = 0
+                for current_id in creditor_ids:
+                    with conn:
+                        cursor.execute('BEGIN IMMEDIATE')
+                        cursor.execute(f'''
+                            SELECT SUM({BALANCE_DELTA_SQL.format(row='records')}), MAX(created_at)
+                            FROM records WHERE creditor_id = ? AND date < ?
+                        ''', (current_id, cutoff_day))
+                        balance, created_at = cursor.fetchone()
+                        if balance is None:
+                            continue
+                        archived += self._move_to_archive(cursor, 'r.creditor_id = ? AND r.date < ?',
+                                                          (current_id, cutoff_day))
+                        # Borç bakiyesi borç, alacak bakiyesi ödeme olarak devredilir
+                        status_code = PAYMENT_STATUSES[0][0] if balance > 0 else PAYMENT_STATUSES[1][0]
+                        cursor.execute('''
+                            INSERT INTO records (creditor_id, date, description, debt_amount,
+                                                 payment_amount, payment_status, created_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ''', (current_id, cutoff_day - 1, OPENING_BALANCE_DESCRIPTION, max(balance, 0),
+                              max(-balance, 0), status_code, created_at))
+                        cursor.execute('''
+                            UPDATE creditors
+                            SET updated_at = CURRENT_TIMESTAMP,
+                                compacted_before = MAX(COALESCE(compacted_before, 0), ?)
+                            WHERE id = ?
+                        ''', (cutoff_day, current_id))
+                    compacted += 1
+
+                    if progress_callback and progress_callback(compacted, len(creditor_ids)) is False:
+                        break
+            finally:
+                self._detach_archive(conn)
+
+            reclaimed_bytes = self._reclaim_free_pages(conn)
+
+            print(f"📦 {compacted} borçlunun {archived} eski kaydı devir kaydına sıkıştırıldı")
+            print(f"💾 {reclaimed_bytes / 1024:.1f} KB alan geri kazanıldı")
+
+            self._backup_scheduler.notify_change("compact")
+
+            return {'compacted_creditors': compacted, 'archived_count': archived,
+                    'reclaimed_bytes': reclaimed_bytes}
+
+        except Exception as e:
+            print(f"Kayıtlar sıkıştırılırken hata: {e}")
+            return None
+
+    def _reclaim_free_pages(self, conn: sqlite3.Connection) -> int:
+        """Boş sayfaları dosyadan geri ver, kazanılan bayt sayısını döndür"""
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        pages_before = conn.execute('PRAGMA page_count').fetchone()[0]
+
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            # Pragma her adımda bir sayfa boşaltır; executescript onu sonuna kadar
+            # çalıştırır (execute yalnızca ilk adımı atar)
+            conn.executescript('PRAGMA incremental_vacuum;')
+        else:
+            # Artımlı vakum kipi sonradan ancak tam bir VACUUM ile açılabilir;
+            # bu yalnızca ilk temizlikte bir kez yapılır
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+        conn.commit()
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+        pages_after = conn.execute('PRAGMA page_count').fetchone()[0]
+        return max(pages_before - pages_after, 0) * page_size
+
+    def get_archived_records(self, creditor_id: int = None, year: int = None) -> List[Dict[str, Any]]:
+        """Arşivlenmiş kayıtları getir (isteğe bağlı borçlu ve yıl filtresiyle)"""
+        if not os.path.exists(self.archive_path):
+            return []
+        conn = self._get_connection()
+        try:
+            self._attach_archive(conn)
+            try:
+                conditions, params = [], []
+                if creditor_id is not None:
+                    conditions.append('creditor_id = ?')
+                    params.append(creditor_id)
+                if year is not None:
+                    # Yıl filtresi tarih indeksini kullanabilmesi için aralık olarak yazılır
+                    conditions.append('date >= ? AND date < ?')
+                    params.extend([f'{year:04d}-01-01', f'{year + 1:04d}-01-01'])
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+                cursor = conn.execute(f'''
+                    SELECT id, creditor_id, creditor_name, date, description, debt_amount,
+                           payment_amount, payment_status, kod1, kod2, birim, iskonto,
+                           musteri_masrafi, created_at, archived_at
+                    FROM archive.archived_records
+                    {where}
+                    ORDER BY creditor_name, date, created_at, id
+                ''', params)
+                columns = [col[0] for col in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            finally:
+                self._detach_archive(conn)
+        except Exception as e:
+            print(f"Arşiv kayıtları getirilirken hata: {e}")
+            return []
+
+    def get_archive_years(self) -> List[int]:
+        """Arşivde kaydı bulunan yılları döndür"""
+        if not os.path.exists(self.archive_path):
+            return []
+        conn = self._get_connection()
+        try:
+            self._attach_archive(conn)
+            try:
+                cursor = conn.execute('''
+                    SELECT DISTINCT CAST(substr(date, 1, 4) AS INTEGER)
+                    FROM archive.archived_records ORDER BY 1
+                ''')
+                return [row[0] for row in cursor.fetchall()]
+            finally:
+                self._detach_archive(conn)
+        except Exception as e:
+            print(f"Arşiv yılları getirilirken hata: {e}")
+            return []
+
+    def export_to_json(self, json_path: str, compact: bool = False, compress: bool = False) -> bool:
+        """Veritabanını JSON formatında akış halinde dışa aktar
+
+        Borçlular ve kayıtları tek bir sıralı JOIN sorgusundan okunup dosyaya
+        parça parça yazılır; bellek kullanımı veritabanı boyutuyla büyümez.
+        compact=True satır sonu ve boşluk içermeyen çıktı, compress=True gzip
+        sıkıştırılmış dosya üretir.
+        """
+        temp_path = json_path + '.tmp'
+        separators = (',', ':') if compact else (', ', ': ')
+        newline = '' if compact else '\n'
+
+        def dump(obj):
+            return json.dumps(obj, ensure_ascii=False, separators=separators)
+
+        try:
+            conn = self._get_connection()
             cursor = conn.cursor()
-            
-            # Borçlular tablosu
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS creditors (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Kayıtlar tablosu
+            # Borçlu adı indeksi üzerinden taranır; kayıtlar borçlu bazında sıralanır
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS records (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    creditor_id INTEGER NOT NULL,
-                    date TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    debt_amount REAL DEFAULT 0.0,
-                    payment_amount REAL DEFAULT 0.0,
-                    payment_status TEXT DEFAULT 'Ödenmedi',
-                    kod1 TEXT DEFAULT '',
-                    kod2 TEXT DEFAULT '',
-                    birim TEXT DEFAULT '',
-                    iskonto REAL DEFAULT 0.0,
-                    musteri_masrafi REAL DEFAULT 0.0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (creditor_id) REFERENCES creditors (id) ON DELETE CASCADE
-                )
+                SELECT c.id, c.name, c.created_at,
+                       r.id, r.date, r.description, r.debt_amount, r.payment_amount, r.payment_status,
+                       r.kod1, r.kod2, r.birim, r.iskonto, r.musteri_masrafi, r.created_at
+                FROM creditors c
+                LEFT JOIN records r ON r.creditor_id = c.id
+                ORDER BY c.name, r.date, r.created_at, r.id
             ''')
 
-            # Mevcut tabloda yeni sütunları ekle (upgrade için)
-            try:
-                cursor.execute('ALTER TABLE records ADD COLUMN iskonto REAL DEFAULT 0.0')
-            except sqlite3.OperationalError:
-                pass  # Sütun zaten var
+            opener = gzip.open if compress else open
+            with opener(temp_path, 'wt', encoding='utf-8') as f:
+                f.write('{' + newline + dump('export_date') + separators[1] + dump(datetime.now().isoformat())
+                        + ',' + newline + dump('creditors') + separators[1] + '[')
 
-            try:
-                cursor.execute('ALTER TABLE records ADD COLUMN musteri_masrafi REAL DEFAULT 0.0')
-            except sqlite3.OperationalError:
-                pass  # Sütun zaten var
+                current_creditor = None
+                first_record = True
+                for row in cursor:
+                    if row[0] != current_creditor:
+                        # Önceki borçlunun kayıt listesini kapat, yenisini aç
+                        if current_creditor is not None:
+                            f.write(newline + ']},')
+                        current_creditor = row[0]
+                        first_record = True
+                        header = dump({'id': row[0], 'name': row[1], 'created_at': row[2]})
+                        f.write(newline + header[:-1] + separators[0] + dump('records') + separators[1] + '[')
 
-            # İndeksler oluştur
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_creditor_id ON records(creditor_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_date ON records(date)')
-            
-            conn.commit()
+                    if row[3] is None:
+                        continue  # Kaydı olmayan borçlu (LEFT JOIN)
+
+                    # Dosya biçimi şemadan bağımsızdır: lira, "YYYY-MM-DD" ve durum adı
+                    record = {
+                        'date': from_day_number(row[4]),
+                        'description': row[5],
+                        'debt_amount': from_minor_units(row[6]),
+                        'payment_amount': from_minor_units(row[7]),
+                        'payment_status': self._payment_status_name(row[8]),
+                        'kod1': row[9],
+                        'kod2': row[10],
+                        'birim': row[11],
+                        'iskonto': from_minor_units(row[12]),
+                        'musteri_masrafi': from_minor_units(row[13]),
+                        'created_at': row[14]
+                    }
+                    f.write(('' if first_record else ',') + newline + dump(record))
+                    first_record = False
+
+                if current_creditor is not None:
+                    f.write(newline + ']}')
+                f.write(newline + ']}' + newline)
+
+            os.replace(temp_path, json_path)
+            return True
+
+        except Exception as e:
+            print(f"JSON dışa aktarma hatası: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
     
-    def create_backup(self, operation_type: str = "manual"):
-        """Veritabanının yedeğini oluştur"""
+    @staticmethod
+    def _change_from_row(row) -> Dict[str, Any]:
+        return {
+            'seq': row[0],
+            'changed_at': row[1],
+            'table': row[2],
+            'operation': row[3],
+            'row_id': row[4],
+            'data': json.loads(row[5])
+        }
+
+    @staticmethod
+    def _journal_high_water(conn: sqlite3.Connection) -> int:
+        """Günlüğe verilmiş en büyük sıra numarası (budanan kayıtlar da dahil)"""
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_journal'").fetchone()
+        return row[0] if row else 0
+
+    def get_last_change_seq(self) -> int:
+        """Değişiklik günlüğündeki son sıra numarasını döndür"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"veresiye_defteri_backup_{timestamp}_{operation_type}.db"
-            backup_path = os.path.join(self.backup_dir, backup_filename)
-            
-            # Veritabanı dosyasını kopyala
-            shutil.copy2(self.db_path, backup_path)
-            
-            # JSON formatında da yedek oluştur
-            json_backup_path = backup_path.replace('.db', '.json')
-            self.export_to_json(json_backup_path)
-            
-            # Eski yedekleri temizle (son 10 yedek hariç)
-            self.cleanup_old_backups()
-            
-            print(f"✅ Yedek oluşturuldu: {backup_filename}")
-            return backup_path
-            
+            return self._journal_high_water(self._get_connection())
         except Exception as e:
-            print(f"❌ Yedek oluşturulamadı: {e}")
+            print(f"Günlük sırası alınırken hata: {e}")
+            return 0
+
+    def get_changes_since(self, since_seq: int = 0, until=None, limit: int = None) -> List[Dict[str, Any]]:
+        """since_seq sonrasındaki değişiklikleri sırayla getir (isteğe bağlı zaman sınırıyla)"""
+        try:
+            return self._read_changes(self._get_connection(), since_seq, until, limit)
+        except Exception as e:
+            print(f"Değişiklikler getirilirken hata: {e}")
+            return []
+
+    def _read_changes(self, conn: sqlite3.Connection, since_seq: int, until=None,
+                      limit: int = None) -> List[Dict[str, Any]]:
+        """Verilen bağlantının değişiklik günlüğünü oku"""
+        sql = '''
+                SELECT seq, changed_at, table_name, operation, row_id, row_data
+                FROM change_journal WHERE seq > ?
+            '''
+        params = [since_seq]
+        if until is not None:
+            sql += ' AND changed_at <= ?'
+            params.append(_journal_timestamp(until))
+        sql += ' ORDER BY seq'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        cursor = conn.execute(sql, params)
+        return [self._change_from_row(row) for row in cursor.fetchall()]
+
+    def get_data_version(self) -> Optional[int]:
+        """Bu thread'in bağlantısı için PRAGMA data_version (başka bağlantı commit ettikçe artar)"""
+        try:
+            return self._get_connection().execute('PRAGMA data_version').fetchone()[0]
+        except Exception as e:
+            print(f"Veri sürümü alınırken hata: {e}")
             return None
-    
-    def cleanup_old_backups(self, keep_count: int = 10):
-        """Eski yedekleri temizle"""
+
+    def get_changed_creditor_ids(self, since_seq: int, limit: int = 1000) -> Optional[Dict[str, Any]]:
+        """since_seq sonrasında başka bağlantıların değiştirdiği borçluların id'lerini topla
+
+        Bu yöneticinin kendi yazmaları atlanır. Dönen sözlük: 'last_seq' (bir
+        sonraki çağrının since_seq değeri), 'creditor_ids' ve 'full_reload'.
+        Aradaki sıra numaralarından biri günlükte yoksa (geri yükleme ya da
+        budama) veya limit'ten fazla değişiklik varsa full_reload True olur.
+        """
         try:
-            if not os.path.exists(self.backup_dir):
-                return
-                
-            # Yedek dosyalarını listele
-            backup_files = [f for f in os.listdir(self.backup_dir) 
-                          if f.startswith('veresiye_defteri_backup_') and f.endswith('.db')]
-            
-            # Tarihe göre sırala (en yeni önce)
-            backup_files.sort(reverse=True)
-            
-            # Fazla olanları sil
-            deleted_count = 0
-            for old_backup in backup_files[keep_count:]:
-                old_path = os.path.join(self.backup_dir, old_backup)
-                os.remove(old_path)
-                deleted_count += 1
-
-                # JSON yedeğini de sil
-                json_path = old_path.replace('.db', '.json')
-                if os.path.exists(json_path):
-                    os.remove(json_path)
-                    
-            if deleted_count > 0:
-                print(f"🗑️ {deleted_count} eski yedek dosyası temizlendi")
+            conn = self._get_connection()
+            # Sayaç ve günlük aynı okuma transaction'ında okunur
+            with conn:
+                conn.execute('BEGIN')
+                last_seq = self._journal_high_water(conn)
+                if last_seq <= since_seq:
+                    return {'last_seq': last_seq, 'creditor_ids': set(), 'full_reload': last_seq < since_seq}
 
+                # Sayaç geri alınan transaction'larla birlikte geri alındığından numaralar boşluksuzdur
+                count = conn.execute('SELECT COUNT(*) FROM change_journal WHERE seq > ? AND seq <= ?',
+                                     (since_seq, last_seq)).fetchone()[0]
+                if count != last_seq - since_seq:
+                    return {'last_seq': last_seq, 'creditor_ids': set(), 'full_reload': True}
+
+                rows = conn.execute('''
+                    SELECT seq, CASE table_name WHEN 'creditors' THEN row_id
+                                                ELSE json_extract(row_data, '$.creditor_id') END
+                    FROM change_journal
+                    WHERE seq > ? AND seq <= ? AND origin IS NOT ?
+                    ORDER BY seq
+                    LIMIT ?
+                ''', (since_seq, last_seq, self._origin, limit + 1)).fetchall()
+            if len(rows) > limit:
+                return {'last_seq': last_seq, 'creditor_ids': set(), 'full_reload': True}
+
+            return {
+                'last_seq': last_seq,
+                'creditor_ids': {creditor_id for _, creditor_id in rows if creditor_id is not None},
+                'full_reload': False
+            }
         except Exception as e:
-            print(f"Eski yedekler temizlenirken hata: {e}")
-    
-    def cleanup_old_records(self, keep_days: int = 365):
-        """Eski kayıtları temizle - sadece son X gün tutulsun"""
+            print(f"Değişen borçlular alınırken hata: {e}")
+            return None
+
+    def get_creditors_by_ids(self, creditor_ids) -> List[Dict[str, Any]]:
+        """Verilen id'lerdeki borçluları bakiyeleriyle getir (silinmiş olanlar dönmez)"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=keep_days)
-            cutoff_date_str = cutoff_date.strftime('%Y-%m-%d')
+            creditor_ids = list(creditor_ids)
+            if not creditor_ids:
+                return []
+            cursor = self._get_connection().cursor()
+            cursor.execute('''
+                SELECT c.id, c.name, c.created_at, c.updated_at,
+                       COALESCE(b.total_debt, 0) as total_debt,
+                       COALESCE(b.record_count, 0) as record_count
+                FROM creditors c
+                LEFT JOIN creditor_balances b ON b.creditor_id = c.id
+                WHERE c.id IN (SELECT value FROM json_each(?))
+                ORDER BY c.name
+            ''', (json.dumps(creditor_ids),))
+            return [self._creditor_from_row(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Borçlular getirme hatası: {e}")
+            return []
 
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+    def export_changes_since(self, json_path: str, since_seq: int = 0, compress: bool = False) -> Optional[int]:
+        """since_seq sonrasındaki değişiklikleri JSON olarak dışa aktar, son sıra numarasını döndür
 
-                # Silinecek kayıtları say
-                cursor.execute('''
-                    SELECT COUNT(*) FROM records 
-                    WHERE date < ? AND created_at < ?
-                ''', (cutoff_date_str, cutoff_date.isoformat()))
+        Dönen sıra numarası bir sonraki artımlı dışa aktarmada since_seq olarak kullanılır.
+        """
+        temp_path = json_path + '.tmp'
+        try:
+            cursor = self._get_connection().cursor()
+            cursor.execute('''
+                SELECT seq, changed_at, table_name, operation, row_id, row_data
+                FROM change_journal WHERE seq > ? ORDER BY seq
+            ''', (since_seq,))
 
-                old_count = cursor.fetchone()[0]
+            last_seq = since_seq
+            opener = gzip.open if compress else open
+            with opener(temp_path, 'wt', encoding='utf-8') as f:
+                f.write('{"export_date": ' + json.dumps(datetime.now().isoformat())
+                        + ', "since_seq": ' + json.dumps(since_seq) + ', "changes": [')
+                for index, row in enumerate(cursor):
+                    change = self._change_from_row(row)
+                    f.write((',' if index else '') + '\n' + json.dumps(change, ensure_ascii=False))
+                    last_seq = change['seq']
+                f.write('\n], "last_seq": ' + json.dumps(last_seq) + '}\n')
 
-                if old_count > 0:
-                    # Eski kayıtları sil
-                    cursor.execute('''
-                        DELETE FROM records 
-                        WHERE date < ? AND created_at < ?
-                    ''', (cutoff_date_str, cutoff_date.isoformat()))
+            os.replace(temp_path, json_path)
+            return last_seq
 
-                    # Hiç kaydı kalmayan borçluları sil
-                    cursor.execute('''
-                        DELETE FROM creditors 
-                        WHERE id NOT IN (SELECT DISTINCT creditor_id FROM records)
-                    ''')
+        except Exception as e:
+            print(f"Değişiklikler dışa aktarılırken hata: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+    def prune_change_journal(self, up_to_seq: int) -> int:
+        """Verilen sıra numarasına kadarki günlük kayıtlarını sil"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute('DELETE FROM change_journal WHERE seq <= ?', (up_to_seq,))
+                return cursor.rowcount
+        except Exception as e:
+            print(f"Değişiklik günlüğü budanırken hata: {e}")
+            return 0
 
-                    deleted_creditors = cursor.rowcount
+    @staticmethod
+    def _apply_change(cursor: sqlite3.Cursor, change: Dict[str, Any]):
+        """Tek bir günlük kaydını veritabanına uygula"""
+        table = change['table']
+        columns = JOURNAL_COLUMNS[table]
+        if change['operation'] == 'delete':
+            cursor.execute(f'DELETE FROM {table} WHERE id = ?', (change['row_id'],))
+            return
 
-                    conn.commit()
+        # Satır varsa güncellenir, yoksa eklenir. REPLACE ya da UPSERT kullanılmaz:
+        # REPLACE çakışan borçlu satırını kayıtlarıyla birlikte siler, UPSERT'in çakışma
+        # kuralı ise trigger'lardaki INSERT OR IGNORE davranışını geçersiz kılar
+        data = change['data']
+        assignments = ', '.join(f'{column} = ?' for column in columns if column != 'id')
+        cursor.execute(f'UPDATE {table} SET {assignments} WHERE id = ?',
+                       [data.get(column) for column in columns if column != 'id'] + [data['id']])
+        if cursor.rowcount == 0:
+            cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                           [data.get(column) for column in columns])
 
-                    print(f"🗑️ {old_count} eski kayıt temizlendi")
-                    if deleted_creditors > 0:
-                        print(f"🗑️ {deleted_creditors} boş borçlu kaydı temizlendi")
+    def restore_to_point_in_time(self, target_time, target_path: str) -> Optional[str]:
+        """Veritabanının verilen andaki halini target_path dosyasına oluştur
 
-                    # Temizlik sonrası yedek oluştur
-                    self.create_backup("cleanup")
+        O andan önceki en yeni yedek çıkarılır ve üzerine yedekten sonraki günlük
+        kayıtları sırayla uygulanır; maliyet veritabanı boyutuna değil, o aradaki
+        değişiklik sayısına bağlıdır. Günlük, hedef andan sonra alınan ilk yedekten
+        okunur (o yedek o ana kadarki günlüğün tamamını içerir, sonradan yapılmış bir
+        geri yükleme onu değiştirmemiştir); böyle bir yedek yoksa canlı veritabanından.
+        """
+        try:
+            target = datetime.fromisoformat(target_time) if isinstance(target_time, str) else target_time
+
+            with self._backup_lock:
+                catalog = self._get_catalog()
+                snapshot = catalog.execute('''
+                    SELECT filename, journal_seq FROM backups
+                    WHERE journal_seq IS NOT NULL AND created_at <= ?
+                    ORDER BY created_at DESC, id DESC LIMIT 1
+                ''', (target.isoformat(),)).fetchone()
+                journal_source = catalog.execute('''
+                    SELECT filename FROM backups
+                    WHERE journal_seq IS NOT NULL AND created_at > ?
+                    ORDER BY created_at, id LIMIT 1
+                ''', (target.isoformat(),)).fetchone()
+            if snapshot is None:
+                print("❌ Bu tarihten önce alınmış uygun bir yedek yok")
+                return None
+
+            backup_file, journal_seq = snapshot
+            if not self.extract_backup(os.path.join(self.backup_dir, backup_file), target_path):
+                return None
+
+            if journal_source is None:
+                changes = self._read_changes(self._get_connection(), journal_seq, until=target)
+            else:
+                journal_path = target_path + '.journal'
+                if not self.extract_backup(os.path.join(self.backup_dir, journal_source[0]), journal_path):
+                    return None
+                try:
+                    source_conn = sqlite3.connect(journal_path)
+                    try:
+                        # Günlükteki satır görüntüleri güncel şema biçimine getirilir
+                        if source_conn.execute('PRAGMA user_version').fetchone()[0] < self.SCHEMA_VERSION:
+                            self.migrate_schema(source_conn)
+                        changes = self._read_changes(source_conn, journal_seq, until=target)
+                    finally:
+                        source_conn.close()
+                finally:
+                    os.remove(journal_path)
+
+            target_conn = sqlite3.connect(target_path)
+            try:
+                target_conn.execute('PRAGMA foreign_keys = ON')
+                if target_conn.execute('PRAGMA user_version').fetchone()[0] < self.SCHEMA_VERSION:
+                    self.migrate_schema(target_conn)
+                with target_conn:
+                    cursor = target_conn.cursor()
+                    cursor.execute('BEGIN')
+                    for change in changes:
+                        self._apply_change(cursor, change)
+            finally:
+                target_conn.close()
 
-                    return old_count
+            print(f"✅ {backup_file} üzerine {len(changes)} değişiklik uygulandı")
+            return target_path
 
         except Exception as e:
-            print(f"Eski kayıtlar temizlenirken hata: {e}")
-            return 0
+            print(f"Zamana göre geri yükleme hatası: {e}")
+            return None
 
-    def export_to_json(self, json_path: str):
-        """Veritabanını JSON formatında dışa aktar"""
+    def find_similar_creditors(self, name: str, limit: int = 5,
+                               threshold: float = 0.5) -> List[Dict[str, Any]]:
+        """Adı verilen ada benzeyen borçluları benzerlik puanıyla ('similarity') getir"""
         try:
-            data = {
-                'export_date': datetime.now().isoformat(),
-                'creditors': []
-            }
-            
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Tüm borçluları al
-                cursor.execute('SELECT id, name, created_at FROM creditors ORDER BY name')
-                creditors = cursor.fetchall()
-                
-                for creditor_id, name, created_at in creditors:
-                    # Borçlunun kayıtlarını al
-                    cursor.execute('''
-                        SELECT date, description, debt_amount, payment_amount, payment_status,
-                               kod1, kod2, birim, COALESCE(iskonto, 0.0), COALESCE(musteri_masrafi, 0.0), created_at
-                        FROM records 
-                        WHERE creditor_id = ? 
-                        ORDER BY date, created_at
-                    ''', (creditor_id,))
-                    
-                    records = cursor.fetchall()
-                    
-                    creditor_data = {
-                        'id': creditor_id,
-                        'name': name,
-                        'created_at': created_at,
-                        'records': [
-                            {
-                                'date': record[0],
-                                'description': record[1],
-                                'debt_amount': record[2],
-                                'payment_amount': record[3],
-                                'payment_status': record[4],
-                                'kod1': record[5],
-                                'kod2': record[6],
-                                'birim': record[7],
-                                'iskonto': record[8],
-                                'musteri_masrafi': record[9],
-                                'created_at': record[10]
-                            }
-                            for record in records
-                        ]
-                    }
-                    
-                    data['creditors'].append(creditor_data)
-            
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
+            creditors = self._cached_rows('get_all_creditors', None, self._load_all_creditors)
+            with self._name_index_lock:
+                # Önbellek aynı listeyi döndürdükçe dizin yeniden eşitlenmez
+                if creditors is not self._name_index_source:
+                    self._name_index.set_creditors(creditors)
+                    self._name_index_source = creditors
+                matches = self._name_index.fuzzy_search(name, limit, threshold)
+            return [dict(creditor, similarity=round(score, 3)) for creditor, score in matches]
         except Exception as e:
-            print(f"JSON dışa aktarma hatası: {e}")
-    
-    def add_creditor(self, name: str) -> Optional[int]:
-        """Yeni borçlu ekle"""
+            print(f"Benzer borçlu arama hatası: {e}")
+            return []
+
+    def add_creditor(self, name: str, warn_similar: bool = False) -> Optional[int]:
+        """Yeni borçlu ekle
+
+        warn_similar ise benzer adlı borçlular varken ekleme yapılmaz ve eşleşmeleri
+        taşıyan SimilarCreditorWarning fırlatılır; çağıran onay aldıktan sonra
+        warn_similar=False ile yeniden çağırır. Benzerlik denetimi ve ekleme aynı
+        yazma transaction'ında yapılır, arada başka bir bağlantı borçlu ekleyemez.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                if warn_similar:
+                    similar = [c for c in self.find_similar_creditors(name) if c['name'] != name]
+                    if similar:
+                        raise SimilarCreditorWarning(name, similar)
                 cursor.execute('INSERT INTO creditors (name) VALUES (?)', (name,))
                 creditor_id = cursor.lastrowid
                 conn.commit()
                 
-                # İşlem sonrası yedek oluştur
-                self.create_backup("add_creditor")
+                # Yedeklemeyi zamanlayıcıya bildir
+                self._backup_scheduler.notify_change("add_creditor")
                 
                 return creditor_id
+        except SimilarCreditorWarning:
+            raise
         except sqlite3.IntegrityError:
             return None  # Aynı isimde borçlu var
         except Exception as e:
@@ -285,15 +2478,15 @@ class DatabaseManager:
     def delete_creditor(self, creditor_id: int) -> bool:
         """Borçluyu sil"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM creditors WHERE id = ?', (creditor_id,))
                 success = cursor.rowcount > 0
                 conn.commit()
                 
                 if success:
-                    # İşlem sonrası yedek oluştur
-                    self.create_backup("delete_creditor")
+                    # Yedeklemeyi zamanlayıcıya bildir
+                    self._backup_scheduler.notify_change("delete_creditor")
                 
                 return success
         except Exception as e:
@@ -304,217 +2497,670 @@ class DatabaseManager:
                    debt_amount: float = 0.0, payment_amount: float = 0.0, 
                    payment_status: str = 'Ödenmedi', kod1: str = '', kod2: str = '', birim: str = '',
                    iskonto: float = 0.0, musteri_masrafi: float = 0.0) -> Optional[int]:
-        """Yeni kayıt ekle"""
+        """Yeni kayıt ekle (kayıt diske yazıldıktan sonra id döner)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO records (creditor_id, date, description, debt_amount, payment_amount, payment_status, kod1, kod2, birim, iskonto, musteri_masrafi)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (creditor_id, date, description, debt_amount, payment_amount, payment_status, kod1, kod2, birim, iskonto, musteri_masrafi))
-
-                record_id = cursor.lastrowid
-                
-                # Borçlunun updated_at'ini güncelle
-                cursor.execute('UPDATE creditors SET updated_at = CURRENT_TIMESTAMP WHERE id = ?', (creditor_id,))
-                
-                conn.commit()
-                
-                # İşlem sonrası yedek oluştur
-                self.create_backup("add_record")
-                
-                return record_id
+            return self.add_record_async(creditor_id, date, description, debt_amount, payment_amount,
+                                         payment_status, kod1, kod2, birim, iskonto, musteri_masrafi).result()
         except Exception as e:
             print(f"Kayıt ekleme hatası: {e}")
             return None
-    
+
+    def add_record_async(self, creditor_id: int, date: str, description: str,
+                         debt_amount: float = 0.0, payment_amount: float = 0.0,
+                         payment_status: str = 'Ödenmedi', kod1: str = '', kod2: str = '', birim: str = '',
+                         iskonto: float = 0.0, musteri_masrafi: float = 0.0) -> Future:
+        """Kaydı yazma kuyruğuna ekle; Future grup commit'inden sonra kaydın id'si ile sonuçlanır"""
+        # Tutarlar kuruşa, tarih gün numarasına, durum koda kuyruğa girmeden çevrilir
+        return self._record_writer.submit((
+            creditor_id, to_day_number(date), description or '', to_minor_units(debt_amount),
+            to_minor_units(payment_amount), self._payment_status_code(payment_status),
+            kod1 or '', kod2 or '', birim or '', to_minor_units(iskonto), to_minor_units(musteri_masrafi)))
+
+    def _commit_record_batch(self, rows: List[tuple]) -> List[Any]:
+        """Kuyruktaki kayıtları tek transaction'da ekle (yazma kuyruğu thread'inde çalışır)
+
+        Her kayıt kendi savepoint'i içinde eklenir; hatalı bir kayıt yalnızca
+        kendi sonucunu hataya çevirir, gruptaki diğer kayıtlar yazılır.
+        """
+        conn = self._get_connection()
+        # Future'lar commit'ten sonra sonuçlanır; WAL'da NORMAL commit'te fsync
+        # yapmadığından kuyruğun bağlantısı FULL ile çalışır (grup başına bir fsync)
+        conn.execute('PRAGMA synchronous = FULL')
+        results = []
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            for row in rows:
+                cursor.execute('SAVEPOINT record_write')
+                try:
+                    cursor.execute('''
+                        INSERT INTO records (creditor_id, date, description, debt_amount, payment_amount, payment_status, kod1, kod2, birim, iskonto, musteri_masrafi)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', row)
+                    results.append(cursor.lastrowid)
+                except sqlite3.Error as e:
+                    cursor.execute('ROLLBACK TO record_write')
+                    results.append(e)
+                cursor.execute('RELEASE record_write')
+
+            # Borçluların updated_at'i grup başına bir kez güncellenir
+            creditor_ids = sorted({row[0] for row, result in zip(rows, results)
+                                   if not isinstance(result, Exception)})
+            cursor.executemany('UPDATE creditors SET updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                               [(creditor_id,) for creditor_id in creditor_ids])
+
+        # Yedeklemeyi zamanlayıcıya bildir
+        for result in results:
+            if not isinstance(result, Exception):
+                self._backup_scheduler.notify_change("add_record")
+        return results
+
     def get_all_creditors(self) -> List[Dict[str, Any]]:
-        """Tüm borçluları getir"""
+        """Tüm borçluları getir (değişiklik yoksa önbellekten)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT c.id, c.name, c.created_at, c.updated_at,
-                           COALESCE(SUM(r.debt_amount - r.payment_amount - COALESCE(r.iskonto, 0.0) + COALESCE(r.musteri_masrafi, 0.0)), 0) as total_debt,
-                           COUNT(r.id) as record_count
-                    FROM creditors c
-                    LEFT JOIN records r ON c.id = r.creditor_id
-                    GROUP BY c.id, c.name, c.created_at, c.updated_at
-                    ORDER BY c.name
-                ''')
-                
-                creditors = []
-                for row in cursor.fetchall():
-                    creditors.append({
-                        'id': row[0],
-                        'name': row[1],
-                        'created_at': row[2],
-                        'updated_at': row[3],
-                        'total_debt': row[4],
-                        'record_count': row[5]
-                    })
-                
-                return creditors
+            return self._cached_query('get_all_creditors', None, self._load_all_creditors)
         except Exception as e:
             print(f"Borçlular getirme hatası: {e}")
             return []
-    
+
+    def _load_all_creditors(self) -> List[Dict[str, Any]]:
+        """Tüm borçluları bakiyeleriyle birlikte veritabanından oku"""
+        cursor = self._get_connection().cursor()
+        cursor.execute('''
+            SELECT c.id, c.name, c.created_at, c.updated_at,
+                   COALESCE(b.total_debt, 0) as total_debt,
+                   COALESCE(b.record_count, 0) as record_count
+            FROM creditors c
+            LEFT JOIN creditor_balances b ON b.creditor_id = c.id
+            ORDER BY c.name
+        ''')
+
+        return [self._creditor_from_row(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _creditor_from_row(row) -> Dict[str, Any]:
+        """Borçlu sorgusu satırını sözlüğe çevir (id, ad, tarihler, bakiye, kayıt sayısı)"""
+        return {
+            'id': row[0],
+            'name': row[1],
+            'created_at': row[2],
+            'updated_at': row[3],
+            'total_debt': from_minor_units(row[4]),
+            'record_count': row[5]
+        }
+
     def get_creditor_records(self, creditor_id: int) -> List[Dict[str, Any]]:
-        """Belirli bir borçlunun kayıtlarını getir"""
+        """Belirli bir borçlunun kayıtlarını getir (değişiklik yoksa önbellekten)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT id, date, description, debt_amount, payment_amount, payment_status, kod1, kod2, birim, 
-                           COALESCE(iskonto, 0.0) as iskonto, COALESCE(musteri_masrafi, 0.0) as musteri_masrafi, created_at
-                    FROM records 
-                    WHERE creditor_id = ? 
-                    ORDER BY date, created_at
-                ''', (creditor_id,))
-                
-                records = []
-                running_debt = 0.0
-                
-                for row in cursor.fetchall():
-                    # İskonto ve müşteri masrafını da bakiye hesaplamasına dahil et
-                    net_debt = row[3] - row[4] - row[9] + row[10]  # debt_amount - payment_amount - iskonto + musteri_masrafi
-                    running_debt += net_debt
-
-                    records.append({
-                        'id': row[0],
-                        'date': row[1],
-                        'description': row[2],
-                        'debt_amount': row[3],
-                        'payment_amount': row[4],
-                        'payment_status': row[5],
-                        'kod1': row[6] if row[6] else '',
-                        'kod2': row[7] if row[7] else '',
-                        'birim': row[8] if row[8] else '',
-                        'iskonto': row[9],
-                        'musteri_masrafi': row[10],
-                        'created_at': row[11],
-                        'remaining_debt': running_debt
-                    })
-                
-                return records
+            return self._cached_query('get_creditor_records', creditor_id,
+                                      lambda: self._load_creditor_records(creditor_id))
         except Exception as e:
             print(f"Kayıtları getirme hatası: {e}")
             return []
+
+    def _load_creditor_records(self, creditor_id: int) -> List[Dict[str, Any]]:
+        """Borçlunun tüm kayıtlarını kalan borçla birlikte veritabanından oku"""
+        cursor = self._get_connection().cursor()
+        # Kalan borç, SQL pencere fonksiyonu ile kümülatif toplam olarak hesaplanır
+        cursor.execute(f'''
+            SELECT id, date, description, debt_amount, payment_amount, payment_status, kod1, kod2, birim,
+                   iskonto, musteri_masrafi, created_at,
+                   SUM({BALANCE_DELTA_SQL.format(row='records')}) OVER (
+                       ORDER BY date, created_at, id ROWS UNBOUNDED PRECEDING
+                   ) as remaining_debt
+            FROM records 
+            WHERE creditor_id = ? 
+            ORDER BY date, created_at, id
+        ''', (creditor_id,))
+
+        return [self._record_from_row(row) for row in cursor.fetchall()]
+
+    def get_creditor_records_page(self, creditor_id: int, limit: int = 200, cursor_key: tuple = None,
+                                  newest_first: bool = True) -> Optional[Dict[str, Any]]:
+        """Borçlunun kayıtlarını (date, created_at, id) anahtarına göre sayfa sayfa getir
+
+        İlk sayfa için cursor_key verilmez; sonraki sayfalar için bir önceki
+        sonucun 'next_cursor' değeri geçilir. Kalan borç sayfa içinde pencere
+        fonksiyonu ile hesaplanır; sayfanın başlangıç bakiyesi imleçte taşındığı
+        için hiçbir sayfa önceki kayıtların tamamını taramaz.
+        """
+        try:
+            if newest_first:
+                order = 'date DESC, created_at DESC, id DESC'
+                comparison = '<'
+                # Yeniden eskiye: satır bakiyesi = başlangıç - kendisinden yeni satırların etkisi
+                balance_sql = f'? - COALESCE(SUM(net) OVER (ORDER BY {order} ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0)'
+            else:
+                order = 'date, created_at, id'
+                comparison = '>'
+                # Eskiden yeniye: satır bakiyesi = başlangıç + kendisi dahil önceki satırların etkisi
+                balance_sql = f'? + SUM(net) OVER (ORDER BY {order} ROWS UNBOUNDED PRECEDING)'
+
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            if cursor_key is None:
+                start_balance = 0
+                if newest_first:
+                    cursor.execute('SELECT total_debt FROM creditor_balances WHERE creditor_id = ?', (creditor_id,))
+                    row = cursor.fetchone()
+                    start_balance = row[0] if row else 0
+                key_filter = ''
+                params = [start_balance, creditor_id]
+            else:
+                start_balance = cursor_key[3]
+                key_filter = f'AND (date, created_at, id) {comparison} (?, ?, ?)'
+                params = [start_balance, creditor_id, cursor_key[0], cursor_key[1], cursor_key[2]]
+
+            cursor.execute(f'''
+                SELECT id, date, description, debt_amount, payment_amount, payment_status, kod1, kod2, birim,
+                       iskonto, musteri_masrafi, created_at, {balance_sql} as remaining_debt, net
+                FROM (
+                    SELECT id, date, description, debt_amount, payment_amount, payment_status, kod1, kod2, birim,
+                           iskonto, musteri_masrafi, created_at, {BALANCE_DELTA_SQL.format(row='records')} as net
+                    FROM records
+                    WHERE creditor_id = ? {key_filter}
+                    ORDER BY {order}
+                    LIMIT ?
+                )
+                ORDER BY {order}
+            ''', params + [limit + 1])
+            rows = cursor.fetchall()
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = None
+            if has_more:
+                last = rows[-1]
+                # Sonraki sayfanın başlangıç bakiyesi (imleç ham gün numarası ve kuruş taşır)
+                next_balance = last[12] - last[13] if newest_first else last[12]
+                next_cursor = (last[1], last[11], last[0], next_balance)
+
+            return {
+                'records': [self._record_from_row(row) for row in rows],
+                'next_cursor': next_cursor
+            }
+        except Exception as e:
+            print(f"Kayıt sayfası getirme hatası: {e}")
+            return None
+
+    def get_creditor_balance(self, creditor_id: int) -> float:
+        """Borçlunun güncel bakiyesini özet tablodan getir"""
+        try:
+            cursor = self._get_connection().cursor()
+            cursor.execute('SELECT total_debt FROM creditor_balances WHERE creditor_id = ?', (creditor_id,))
+            row = cursor.fetchone()
+            return from_minor_units(row[0]) if row else 0.0
+        except Exception as e:
+            print(f"Bakiye getirme hatası: {e}")
+            return 0.0
+
+    def _balances_as_of(self, cursor: sqlite3.Cursor, day: int, creditor_id: int = None) -> Dict[int, int]:
+        """Borçluların verilen günün sonundaki bakiyeleri (kuruş), id'ye göre
+
+        Günün ayından önceki son aylık kontrol noktasının kümülatif bakiyesi
+        (creditor_id, month) anahtarında tek aramayla okunur ve üzerine o ayın
+        güne kadarki kayıtları eklenir; tarama en fazla bir aylık kayıttır.
+        """
+        month = month_number(day)
+        creditor_filter = 'WHERE c.id = ?' if creditor_id is not None else ''
+        cursor.execute(f'''
+            SELECT c.id,
+                   COALESCE((SELECT m.balance FROM monthly_totals m
+                             WHERE m.creditor_id = c.id AND m.month < ?
+                             ORDER BY m.month DESC LIMIT 1), 0)
+                   + COALESCE((SELECT SUM({BALANCE_DELTA_SQL.format(row='r')}) FROM records r
+                               WHERE r.creditor_id = c.id AND r.date >= ? AND r.date <= ?), 0)
+            FROM creditors c
+            {creditor_filter}
+        ''', [month, month_start_day(month), day] + ([creditor_id] if creditor_id is not None else []))
+        return dict(cursor.fetchall())
+
+    @staticmethod
+    def _latest_compaction(cursor: sqlite3.Cursor, creditor_id: int = None) -> Optional[tuple]:
+        """En geç kesimli sıkıştırılmış borçlunun (ad, kesim günü); sıkıştırma yoksa None"""
+        creditor_filter = 'AND id = ?' if creditor_id is not None else ''
+        cursor.execute(f'''
+            SELECT name, compacted_before FROM creditors
+            WHERE compacted_before IS NOT NULL {creditor_filter}
+            ORDER BY compacted_before DESC LIMIT 1
+        ''', [creditor_id] if creditor_id is not None else [])
+        return cursor.fetchone()
+
+    def _check_history_available(self, cursor: sqlite3.Cursor, day: int, creditor_id: int = None):
+        """Günün sonundaki bakiye sıkıştırılmış döneme düşüyorsa CompactedHistoryError fırlat
+
+        Devir kaydı kesimden bir gün önceye tarihlidir; o günün bakiyesi doğrudur,
+        daha önceki günlerin kayıtları ise yalnızca arşivde bulunur. creditor_id
+        verilmezse sıkıştırılmış borçluların hepsi denetlenir.
+        """
+        compaction = self._latest_compaction(cursor, creditor_id)
+        if compaction is not None and day < compaction[1] - 1:
+            name, cutoff_day = compaction
+            raise CompactedHistoryError(
+                f"'{name}' borçlusunun kayıtları {date.fromordinal(cutoff_day - 1).strftime('%d.%m.%Y')} tarihinde "
+                f"devir kaydına sıkıştırıldı; daha önceki tarihler için rapor alınamaz (eski kayıtlar arşivdedir)")
+
+    def get_compacted_before(self, creditor_id: int = None) -> Optional[str]:
+        """Raporların başlayabileceği ilk gün (devir kaydının tarihi); sıkıştırma yoksa None
+
+        creditor_id verilmezse tüm borçlular için geçerli olan en geç gün döner.
+        """
+        try:
+            compaction = self._latest_compaction(self._get_connection().cursor(), creditor_id)
+            return from_day_number(compaction[1] - 1) if compaction is not None else None
+        except Exception as e:
+            print(f"Sıkıştırma tarihi getirme hatası: {e}")
+            return None
+
+    def get_balance_as_of(self, creditor_id: int, as_of_date) -> float:
+        """Borçlunun verilen tarihin sonundaki bakiyesi
+
+        Tarih sıkıştırılmış döneme düşüyorsa CompactedHistoryError fırlatılır.
+        """
+        try:
+            day = to_day_number(as_of_date)
+            cursor = self._get_connection().cursor()
+            self._check_history_available(cursor, day, creditor_id)
+            balances = self._balances_as_of(cursor, day, creditor_id)
+            return from_minor_units(balances.get(creditor_id, 0))
+        except CompactedHistoryError:
+            raise
+        except Exception as e:
+            print(f"Tarihe göre bakiye hatası: {e}")
+            return 0.0
+
+    def get_balances_as_of(self, as_of_date, include_zero: bool = False) -> List[Dict[str, Any]]:
+        """Tüm borçluların verilen tarihin sonundaki bakiyeleri (ada göre sıralı)
+
+        Tarih sıkıştırılmış döneme düşüyorsa CompactedHistoryError fırlatılır.
+        """
+        try:
+            day = to_day_number(as_of_date)
+            cursor = self._get_connection().cursor()
+            self._check_history_available(cursor, day)
+            balances = self._balances_as_of(cursor, day)
+            cursor.execute('SELECT id, name FROM creditors ORDER BY name')
+            return [{'id': creditor_id, 'name': name, 'balance': from_minor_units(balances.get(creditor_id, 0))}
+                    for creditor_id, name in cursor.fetchall()
+                    if include_zero or balances.get(creditor_id, 0) != 0]
+        except CompactedHistoryError:
+            raise
+        except Exception as e:
+            print(f"Tarihe göre bakiye hatası: {e}")
+            return []
+
+    def get_movements(self, start_date, end_date, creditor_id: int = None,
+                      limit: int = None) -> List[Dict[str, Any]]:
+        """İki tarih arasındaki (ikisi de dahil) hareketleri tarih sırasıyla getir
+
+        Her hareketin 'remaining_debt' değeri, borçlunun başlangıçtan önceki
+        bakiyesi üzerine o borçlunun aralıktaki hareketleri eklenerek hesaplanır.
+        Başlangıç sıkıştırılmış döneme düşüyorsa CompactedHistoryError fırlatılır.
+        """
+        try:
+            start_day, end_day = to_day_number(start_date), to_day_number(end_date)
+            cursor = self._get_connection().cursor()
+            self._check_history_available(cursor, start_day - 1, creditor_id)
+            opening = self._balances_as_of(cursor, start_day - 1, creditor_id)
+
+            # Tek borçlu (creditor_id, date, ...) indeksiyle, tüm borçlular tarih indeksiyle taranır
+            conditions = ['r.date BETWEEN ? AND ?']
+            params = [start_day, end_day]
+            if creditor_id is not None:
+                conditions.insert(0, 'r.creditor_id = ?')
+                params.insert(0, creditor_id)
+            sql = f'''
+                SELECT r.id, r.date, r.description, r.debt_amount, r.payment_amount, r.payment_status,
+                       r.kod1, r.kod2, r.birim, r.iskonto, r.musteri_masrafi, r.created_at,
+                       SUM({BALANCE_DELTA_SQL.format(row='r')}) OVER (
+                           PARTITION BY r.creditor_id ORDER BY r.date, r.created_at, r.id ROWS UNBOUNDED PRECEDING
+                       ),
+                       r.creditor_id, c.name
+                FROM records r
+                JOIN creditors c ON c.id = r.creditor_id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY r.date, r.created_at, r.id
+            '''
+            if limit is not None:
+                sql += ' LIMIT ?'
+                params.append(limit)
+            cursor.execute(sql, params)
+
+            movements = []
+            for row in cursor.fetchall():
+                row = list(row)
+                row[12] += opening.get(row[13], 0)
+                movement = self._record_from_row(row)
+                movement['creditor_id'] = row[13]
+                movement['creditor_name'] = row[14]
+                movements.append(movement)
+            return movements
+        except CompactedHistoryError:
+            raise
+        except Exception as e:
+            print(f"Tarih aralığı sorgu hatası: {e}")
+            return []
+
+    def _record_from_row(self, row) -> Dict[str, Any]:
+        """Kayıt sorgusu satırını API biçiminde sözlüğe çevir (ilk 13 sütun ortak düzendedir)"""
+        return {
+            'id': row[0],
+            'date': from_day_number(row[1]),
+            'description': row[2],
+            'debt_amount': from_minor_units(row[3]),
+            'payment_amount': from_minor_units(row[4]),
+            'payment_status': self._payment_status_name(row[5]),
+            'kod1': row[6],
+            'kod2': row[7],
+            'birim': row[8],
+            'iskonto': from_minor_units(row[9]),
+            'musteri_masrafi': from_minor_units(row[10]),
+            'created_at': row[11],
+            'remaining_debt': from_minor_units(row[12])
+        }
     
     def get_creditor_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        """İsme göre borçlu getir"""
+        """İsme göre borçlu getir (değişiklik yoksa önbellekten)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT id, name, created_at, updated_at FROM creditors WHERE name = ?', (name,))
-                row = cursor.fetchone()
-                
-                if row:
-                    return {
-                        'id': row[0],
-                        'name': row[1],
-                        'created_at': row[2],
-                        'updated_at': row[3]
-                    }
-                return None
+            return self._cached_query('get_creditor_by_name', name, lambda: self._load_creditor_by_name(name))
         except Exception as e:
             print(f"Borçlu arama hatası: {e}")
             return None
-    
-    def migrate_from_json(self, json_file: str) -> bool:
-        """JSON dosyasından veritabanına geçiş yap"""
+
+    def _load_creditor_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """İsme göre borçluyu veritabanından oku"""
+        cursor = self._get_connection().cursor()
+        cursor.execute('SELECT id, name, created_at, updated_at FROM creditors WHERE name = ?', (name,))
+        row = cursor.fetchone()
+
+        if row:
+            return {
+                'id': row[0],
+                'name': row[1],
+                'created_at': row[2],
+                'updated_at': row[3]
+            }
+        return None
+
+    def import_from_json(self, json_file: str, progress_callback=None,
+                         batch_size: int = 1000) -> Optional[Dict[str, int]]:
+        """JSON dosyasını tek transaction içinde toplu olarak içe aktar
+
+        progress_callback(islenen, toplam) her partiden sonra çağrılır; False
+        döndürürse içe aktarma iptal edilir ve tüm değişiklikler geri alınır.
+        """
         try:
             if not os.path.exists(json_file):
-                return False
-                
-            with open(json_file, 'r', encoding='utf-8') as f:
+                return None
+
+            opener = gzip.open if json_file.endswith('.gz') else open
+            with opener(json_file, 'rt', encoding='utf-8') as f:
                 data = json.load(f)
-            
-            creditors_data = data.get('creditors', [])
-            
+
+            creditors_data = [c for c in data.get('creditors', []) if c.get('name')]
+            total_records = sum(len(c.get('records', [])) for c in creditors_data)
+
+            # Yeni ödeme durumları içe aktarma transaction'ından önce eklenir
+            status_codes = {}
             for creditor_data in creditors_data:
-                # Borçluyu ekle
-                creditor_id = self.add_creditor(creditor_data['name'])
-                if not creditor_id:
-                    # Zaten varsa ID'sini al
-                    existing = self.get_creditor_by_name(creditor_data['name'])
-                    if existing:
-                        creditor_id = existing['id']
-                    else:
-                        continue
-                
-                # Kayıtları ekle
                 for record in creditor_data.get('records', []):
-                    self.add_record(
-                        creditor_id=creditor_id,
-                        date=record['date'],
-                        description=record['description'],
-                        debt_amount=record['debt_amount'],
-                        payment_amount=record['payment_amount'],
-                        payment_status=record['payment_status'],
-                        kod1=record.get('kod1', ''),
-                        kod2=record.get('kod2', ''),
-                        birim=record.get('birim', '')
-                    )
-            
-            print("✅ JSON'dan veritabanına geçiş tamamlandı")
-            return True
-            
+                    name = record.get('payment_status') or PAYMENT_STATUSES[0][1]
+                    if name not in status_codes:
+                        status_codes[name] = self._payment_status_code(name)
+
+            conn = self._get_connection()
+            with conn:
+                cursor = conn.cursor()
+
+                # Mevcut borçluları tek sorguda al, eksik olanları toplu ekle
+                cursor.execute('SELECT name, id FROM creditors')
+                creditor_ids = dict(cursor.fetchall())
+                new_creditors = {}
+                for creditor_data in creditors_data:
+                    name = creditor_data['name']
+                    if name not in creditor_ids and name not in new_creditors:
+                        new_creditors[name] = creditor_data.get('created_at')
+
+                cursor.executemany('''
+                    INSERT INTO creditors (name, created_at)
+                    VALUES (?, COALESCE(?, CURRENT_TIMESTAMP))
+                ''', list(new_creditors.items()))
+
+                cursor.execute('SELECT name, id FROM creditors')
+                creditor_ids = dict(cursor.fetchall())
+
+                insert_sql = '''
+                    INSERT INTO records (creditor_id, date, description, debt_amount, payment_amount, payment_status,
+                                         kod1, kod2, birim, iskonto, musteri_masrafi, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                '''
+                batch = []
+                imported_records = 0
+
+                for creditor_data in creditors_data:
+                    creditor_id = creditor_ids[creditor_data['name']]
+                    for record in creditor_data.get('records', []):
+                        batch.append((
+                            creditor_id,
+                            to_day_number(record['date']),
+                            record['description'] or '',
+                            to_minor_units(record.get('debt_amount')),
+                            to_minor_units(record.get('payment_amount')),
+                            status_codes[record.get('payment_status') or PAYMENT_STATUSES[0][1]],
+                            record.get('kod1') or '',
+                            record.get('kod2') or '',
+                            record.get('birim') or '',
+                            to_minor_units(record.get('iskonto')),
+                            to_minor_units(record.get('musteri_masrafi')),
+                            record.get('created_at')
+                        ))
+
+                        if len(batch) >= batch_size:
+                            cursor.executemany(insert_sql, batch)
+                            imported_records += len(batch)
+                            batch = []
+                            if progress_callback and progress_callback(imported_records, total_records) is False:
+                                raise ImportCancelledError()
+
+                if batch:
+                    cursor.executemany(insert_sql, batch)
+                    imported_records += len(batch)
+
+                cursor.executemany('UPDATE creditors SET updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                                   [(creditor_ids[name],) for name in {c['name'] for c in creditors_data}])
+
+            if progress_callback:
+                progress_callback(imported_records, total_records)
+
+            # Tüm içe aktarma için tek yedek
+            self.create_backup("import")
+
+            print(f"✅ JSON içe aktarma tamamlandı: {len(new_creditors)} borçlu, {imported_records} kayıt")
+            return {
+                'creditor_count': len(new_creditors),
+                'record_count': imported_records
+            }
+
+        except ImportCancelledError:
+            print("⚠️ JSON içe aktarma iptal edildi, değişiklikler geri alındı")
+            return None
         except Exception as e:
-            print(f"JSON geçiş hatası: {e}")
-            return False
+            print(f"JSON içe aktarma hatası: {e}")
+            return None
+
+    def search(self, query: str, limit: int = 50) -> Dict[str, List[Dict[str, Any]]]:
+        """Borçlu adlarında ve kayıt metinlerinde (açıklama, kod1, kod2, birim) ara
+
+        Her kelime önek olarak eşleşir ("meh yıl" → "Mehmet Yılmaz"); büyük/küçük
+        harf Türkçe kurallarına göre katlanır. Kayıt sonuçları yeniden eskiye sıralanır.
+        """
+        results = {'creditors': [], 'records': []}
+        terms = re.findall(r'\w+', turkish_casefold(query))
+        if not terms:
+            return results
+
+        try:
+            cursor = self._get_connection().cursor()
+            if self.fts_enabled:
+                match = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+                cursor.execute('''
+                    SELECT c.id, c.name, c.created_at, c.updated_at,
+                           COALESCE(b.total_debt, 0), COALESCE(b.record_count, 0)
+                    FROM creditors_fts f
+                    JOIN creditors c ON c.id = f.rowid
+                    LEFT JOIN creditor_balances b ON b.creditor_id = c.id
+                    WHERE creditors_fts MATCH ?
+                    ORDER BY f.rank
+                    LIMIT ?
+                ''', (match, limit))
+                creditors = [self._creditor_from_row(row) for row in cursor.fetchall()]
+
+                cursor.execute('''
+                    SELECT r.id, r.creditor_id, c.name, r.date, r.description, r.kod1, r.kod2, r.birim,
+                           r.debt_amount, r.payment_amount
+                    FROM records_fts f
+                    JOIN records r ON r.id = f.rowid
+                    JOIN creditors c ON c.id = r.creditor_id
+                    WHERE records_fts MATCH ?
+                    ORDER BY f.rowid DESC
+                    LIMIT ?
+                ''', (match, limit))
+                record_rows = cursor.fetchall()
+            else:
+                # FTS5 yoksa: borçlu adları Python'da, kayıtlar LIKE ile taranır
+                creditors = [
+                    c for c in self.get_all_creditors()
+                    if all(term in turkish_casefold(c['name']) for term in terms)
+                ][:limit]
+                like_terms = ' AND '.join(
+                    "(r.description || ' ' || r.kod1 || ' ' || r.kod2 || ' ' || r.birim) LIKE ?" for _ in terms)
+                cursor.execute(f'''
+                    SELECT r.id, r.creditor_id, c.name, r.date, r.description, r.kod1, r.kod2, r.birim,
+                           r.debt_amount, r.payment_amount
+                    FROM records r
+                    JOIN creditors c ON c.id = r.creditor_id
+                    WHERE {like_terms}
+                    ORDER BY r.id DESC
+                    LIMIT ?
+                ''', [f'%{term}%' for term in terms] + [limit])
+                record_rows = cursor.fetchall()
+
+            results['creditors'] = creditors
+            results['records'] = [{
+                'id': row[0],
+                'creditor_id': row[1],
+                'creditor_name': row[2],
+                'date': from_day_number(row[3]),
+                'description': row[4],
+                'kod1': row[5],
+                'kod2': row[6],
+                'birim': row[7],
+                'debt_amount': from_minor_units(row[8]),
+                'payment_amount': from_minor_units(row[9])
+            } for row in record_rows]
+            return results
+        except Exception as e:
+            print(f"Arama hatası: {e}")
+            return results
+
+    def migrate_from_json(self, json_file: str) -> bool:
+        """JSON dosyasından veritabanına geçiş yap"""
+        return self.import_from_json(json_file) is not None
+
+    def _rebuild_database_stats(self, cursor: sqlite3.Cursor):
+        """İstatistik sayaçlarını tablolardan baştan hesapla (açık transaction içinde)"""
+        totals = ', '.join(total for total, _ in STATS_AMOUNT_COLUMNS)
+        sums = ', '.join(f'COALESCE(SUM({column}), 0)' for _, column in STATS_AMOUNT_COLUMNS)
+        cursor.execute(f'''
+            UPDATE db_stats
+            SET (record_count, {totals}) = (SELECT COUNT(*), {sums} FROM records),
+                creditor_count = (SELECT COUNT(*) FROM creditors)
+            WHERE id = 1
+        ''')
 
     def get_database_stats(self):
-        """Veritabanı istatistiklerini getir"""
+        """Veritabanı istatistiklerini getir
+
+        Sayılar ve toplamlar trigger'larla güncel tutulan db_stats satırından, en eski
+        ve en yeni tarih tarih indeksinden, yedek bilgileri önbellekten okunur; hiçbir
+        tablo taranmaz.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            cursor = self._get_connection().cursor()
+            cursor.execute(f'''
+                SELECT creditor_count, record_count, {', '.join(total for total, _ in STATS_AMOUNT_COLUMNS)}
+                FROM db_stats WHERE id = 1
+            ''')
+            creditor_count, record_count, total_debt, total_payment, total_iskonto, total_masraf = cursor.fetchone()
+
+            # Net bakiye hesaplama (iskonto ve masraf dahil), kuruş cinsinden
+            net_balance = total_debt - total_payment - total_iskonto + total_masraf
+
+            # En eski ve en yeni kayıt tarihi (MIN/MAX ayrı sorgularda indeksle tek adımda bulunur)
+            cursor.execute('SELECT MIN(date) FROM records')
+            oldest_day = cursor.fetchone()[0]
+            cursor.execute('SELECT MAX(date) FROM records')
+            newest_day = cursor.fetchone()[0]
+
+            # Veritabanı dosya boyutu
+            db_size = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+            backup_stats = self._get_backup_stats()
+            cache_stats = self._query_cache.get_stats()
 
-                # Toplam borçlu sayısı
-                cursor.execute('SELECT COUNT(*) FROM creditors')
-                creditor_count = cursor.fetchone()[0]
-
-                # Toplam kayıt sayısı
-                cursor.execute('SELECT COUNT(*) FROM records')
-                record_count = cursor.fetchone()[0]
-
-                # Toplam borç, ödeme, iskonto ve masraf
-                cursor.execute('SELECT SUM(debt_amount), SUM(payment_amount), SUM(COALESCE(iskonto, 0.0)), SUM(COALESCE(musteri_masrafi, 0.0)) FROM records')
-                amounts = cursor.fetchone()
-                total_debt = amounts[0] or 0
-                total_payment = amounts[1] or 0
-                total_iskonto = amounts[2] or 0
-                total_masraf = amounts[3] or 0
-
-                # Net bakiye hesaplama (iskonto ve masraf dahil)
-                net_balance = total_debt - total_payment - total_iskonto + total_masraf
-
-                # En eski kayıt tarihi
-                cursor.execute('SELECT MIN(date) FROM records')
-                oldest_date = cursor.fetchone()[0]
-
-                # En yeni kayıt tarihi
-                cursor.execute('SELECT MAX(date) FROM records')
-                newest_date = cursor.fetchone()[0]
-
-                # Veritabanı dosya boyutu
-                db_size = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
-
-                return {
-                    'creditor_count': creditor_count,
-                    'record_count': record_count,
-                    'total_debt': total_debt,
-                    'total_payment': total_payment,
-                    'total_iskonto': total_iskonto,
-                    'total_masraf': total_masraf,
-                    'net_balance': net_balance,
-                    'oldest_date': oldest_date,
-                    'newest_date': newest_date,
-                    'db_size_mb': db_size / (1024 * 1024),
-                    'backup_count': len([f for f in os.listdir(self.backup_dir)
-                                       if f.endswith('.db')]) if os.path.exists(self.backup_dir) else 0
-                }
+            return {
+                'creditor_count': creditor_count,
+                'record_count': record_count,
+                'total_debt': from_minor_units(total_debt),
+                'total_payment': from_minor_units(total_payment),
+                'total_iskonto': from_minor_units(total_iskonto),
+                'total_masraf': from_minor_units(total_masraf),
+                'net_balance': from_minor_units(net_balance),
+                'oldest_date': from_day_number(oldest_day) if oldest_day is not None else None,
+                'newest_date': from_day_number(newest_day) if newest_day is not None else None,
+                'db_size_mb': db_size / (1024 * 1024),
+                'backup_count': backup_stats['count'],
+                'backup_size_mb': backup_stats['size'] / (1024 * 1024),
+                'cache_hits': sum(stats['hits'] for stats in cache_stats.values()),
+                'cache_misses': sum(stats['misses'] for stats in cache_stats.values())
+            }
 
         except Exception as e:
             print(f"İstatistik alınırken hata: {e}")
             return None
+
+    def verify_database_stats(self) -> Optional[List[Dict[str, Any]]]:
+        """İstatistik sayaçlarını tabloların tam taramasıyla karşılaştır, tutarsızlıkları döndür"""
+        try:
+            cursor = self._get_connection().cursor()
+            fields = ['creditor_count', 'record_count'] + [total for total, _ in STATS_AMOUNT_COLUMNS]
+            cursor.execute(f"SELECT {', '.join(fields)} FROM db_stats WHERE id = 1")
+            stored = cursor.fetchone()
+
+            cursor.execute('SELECT COUNT(*) FROM creditors')
+            actual = list(cursor.fetchone())
+            sums = ', '.join(f'COALESCE(SUM({column}), 0)' for _, column in STATS_AMOUNT_COLUMNS)
+            cursor.execute(f'SELECT COUNT(*), {sums} FROM records')
+            actual.extend(cursor.fetchone())
+
+            mismatches = []
+            for field, stored_value, actual_value in zip(fields, stored, actual):
+                if stored_value != actual_value:
+                    if field.startswith('total_'):
+                        stored_value, actual_value = from_minor_units(stored_value), from_minor_units(actual_value)
+                    mismatches.append({'field': field, 'stored': stored_value, 'actual': actual_value})
+            return mismatches
+        except Exception as e:
+            print(f"İstatistik doğrulama hatası: {e}")
+            return None
+
+    def rebuild_database_stats(self) -> bool:
+        """İstatistik sayaçlarını ve yedek kataloğunu baştan hesapla"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN')
+                self._rebuild_database_stats(cursor)
+            return self.rebuild_backup_catalog()
+        except Exception as e:
+            print(f"İstatistikler yeniden hesaplanırken hata: {e}")
+            return False
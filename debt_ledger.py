@@ -4,16 +4,23 @@ Ana Veresiye Defteri Uygulaması - Veritabanı Destekli
 
 import sys
 import json
+import queue
+from collections import OrderedDict
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from pathlib import Path
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QListWidget, QPushButton, QLabel, QStackedWidget,
+                             QPushButton, QLabel, QStackedWidget,
                              QMessageBox, QInputDialog, QTableWidget, QTableWidgetItem,
                              QHeaderView, QDialog, QFormLayout, QLineEdit, QComboBox,
                              QDateEdit, QTextEdit, QDialogButtonBox, QApplication,
-                             QProgressDialog, QSpinBox, QGroupBox, QDoubleSpinBox)
-from PyQt6.QtCore import Qt, QDate, QThread, pyqtSignal
-from PyQt6.QtGui import QFont, QAction
+                             QProgressDialog, QSpinBox, QGroupBox, QDoubleSpinBox, QFileDialog,
+                             QCheckBox, QDateTimeEdit, QTabWidget, QTableView, QListView,
+                             QProgressBar)
+from PyQt6 import sip
+from PyQt6.QtCore import (Qt, QDate, QDateTime, QObject, QThread, QTimer, pyqtSignal,
+                          QAbstractTableModel, QAbstractListModel, QModelIndex)
+from PyQt6.QtGui import QFont, QAction, QColor
 from PyQt6.QtPrintSupport import QPrintDialog, QPrinter
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
@@ -21,7 +28,8 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.fonts import addMapping
 import os
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, SimilarCreditorWarning
+from creditor_search import CreditorSearchIndex
 from download_fonts import FontDownloader
 
 class PDFGenerator:
@@ -247,15 +255,16 @@ class DebtRecord:
         self.id = record_id
         self.date = date
         self.description = description
-        self.debt_amount = float(debt_amount) if debt_amount else 0.0
-        self.payment_amount = float(payment_amount) if payment_amount else 0.0
+        # Tutarlar veritabanı katmanından lira cinsinden float olarak gelir
+        self.debt_amount = debt_amount or 0.0
+        self.payment_amount = payment_amount or 0.0
         self.payment_status = payment_status
-        self.remaining_debt = float(remaining_debt) if remaining_debt else 0.0
+        self.remaining_debt = remaining_debt or 0.0
         self.kod1 = kod1
         self.kod2 = kod2
         self.birim = birim
-        self.iskonto = float(iskonto) if iskonto else 0.0
-        self.musteri_masrafi = float(musteri_masrafi) if musteri_masrafi else 0.0
+        self.iskonto = iskonto or 0.0
+        self.musteri_masrafi = musteri_masrafi or 0.0
 
     def to_dict(self):
         return {
@@ -292,11 +301,15 @@ class DebtRecord:
 
 class Creditor:
     """Borçlu sınıfı - artık veritabanından gelecek"""
+    PAGE_SIZE = 200  # Detay ekranında bir seferde yüklenen kayıt sayısı
+
     def __init__(self, creditor_id, name, db_manager):
         self.id = creditor_id
         self.name = name
         self.db_manager = db_manager
         self._records = None
+        self._recent_records = None  # Ekranda gösterilen son kayıtlar (kronolojik sırada)
+        self._older_cursor = None
 
     @property
     def records(self):
@@ -323,13 +336,80 @@ class Creditor:
             musteri_masrafi=r.get('musteri_masrafi', 0.0)
         ) for r in records_data]
 
+    @property
+    def recent_records(self):
+        """Son kayıt sayfasını lazy loading ile yükle"""
+        if self._recent_records is None:
+            self._recent_records = []
+            self._older_cursor = None
+            self._load_page(None)
+        return self._recent_records
+
+    @property
+    def has_older_records(self):
+        """Henüz yüklenmemiş daha eski kayıt var mı"""
+        return self._older_cursor is not None
+
+    @property
+    def older_cursor(self):
+        """Bir sonraki (daha eski) sayfanın imleci"""
+        return self._older_cursor
+
+    def load_older_records(self):
+        """Bir önceki kayıt sayfasını yükle, yüklenen kayıt sayısını döndür"""
+        if self._recent_records is None:
+            return len(self.recent_records)
+        if self._older_cursor is None:
+            return 0
+        return self._load_page(self._older_cursor)
+
+    def fetch_page(self, cursor_key=None):
+        """Yeniden eskiye bir kayıt sayfasını veritabanından al (durumu değiştirmez)
+
+        Arka plan işçisinde çalıştırılıp sonucu apply_page() ile uygulanabilir.
+        """
+        return self.db_manager.get_creditor_records_page(self.id, self.PAGE_SIZE, cursor_key)
+
+    def apply_page(self, page, replace=False):
+        """Alınan sayfayı gösterilen kayıtların başına ekle, eklenen kayıt sayısını döndür
+
+        Kayıtlar yenilendikten sonra gelen eski sayfa (replace=False) yok sayılır.
+        """
+        if replace:
+            self._recent_records = []
+            self._older_cursor = None
+        elif self._recent_records is None:
+            return 0
+        if page is None:
+            return 0
+        older = [DebtRecord.from_dict(r) for r in reversed(page['records'])]
+        self._recent_records[:0] = older
+        self._older_cursor = page['next_cursor']
+        return len(older)
+
+    def _load_page(self, cursor_key):
+        """Yeniden eskiye bir sayfa al ve gösterilen kayıtların başına ekle"""
+        return self.apply_page(self.fetch_page(cursor_key))
+
     def refresh_records(self):
         """Kayıtları yeniden yükle"""
         self._records = None
+        self._recent_records = None
+        self._older_cursor = None
 
     def add_record(self, record_data):
         """Yeni kayıt ekle"""
-        record_id = self.db_manager.add_record(
+        try:
+            self.save_record(record_data).result()
+        except Exception as e:
+            print(f"Kayıt ekleme hatası: {e}")
+            return False
+        self.refresh_records()
+        return True
+
+    def save_record(self, record_data):
+        """Kaydı yazma kuyruğuna ekle; Future yeni kaydın id'si ile sonuçlanır (durumu değiştirmez)"""
+        return self.db_manager.add_record_async(
             creditor_id=self.id,
             date=record_data.date,
             description=record_data.description,
@@ -341,17 +421,11 @@ class Creditor:
             birim=record_data.birim
         )
 
-        if record_id:
-            self.refresh_records()
-            return True
-        return False
-
     def get_total_debt(self):
-        """Toplam borcu hesapla"""
-        records = self.records
-        if not records:
-            return 0.0
-        return records[-1].remaining_debt
+        """Toplam borcu getir"""
+        if self._records is not None:
+            return self._records[-1].remaining_debt if self._records else 0.0
+        return self.db_manager.get_creditor_balance(self.id)
 
     def get_last_payment_status(self):
         """Son ödeme durumunu getir"""
@@ -381,6 +455,193 @@ class Creditor:
         creditor.refresh_records()
         return creditor
 
+class DatabaseJob:
+    """Arka plan işçisine gönderilen tek bir iş"""
+    def __init__(self, func, args, kwargs, on_result=None, on_error=None, on_progress=None, owner=None):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.owner = owner
+        self._stop_requested = False
+        self._cancelled = False
+
+    def request_stop(self):
+        """Süren işin ilerleme bildiriminde durmasını iste, sonuç yine bildirilir"""
+        self._stop_requested = True
+
+    def cancel(self):
+        """İşi iptal et: başlamadıysa atlanır, sürüyorsa durması istenir, sonucu yok sayılır"""
+        self._stop_requested = True
+        self._cancelled = True
+
+    @property
+    def stop_requested(self):
+        return self._stop_requested
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled
+
+class DatabaseWorker(QThread):
+    """Veritabanı, yedekleme ve dışa aktarma işlerini sırayla çalıştıran arka plan thread'i
+
+    İşler submit() ile kuyruğa eklenir; sonuç, hata ve ilerleme bildirimleri
+    sinyaller aracılığıyla GUI thread'inde ilgili geri çağrılara iletilir.
+    Future döndüren işlerin (yazma kuyruğu) sonucu Future tamamlanınca
+    bildirilir; işçi bu sırada sıradaki işlere geçer, böylece art arda gelen
+    kayıtlar aynı grup commit'inde yazılabilir.
+    """
+    job_finished = pyqtSignal(object, object)
+    job_failed = pyqtSignal(object, str)
+    job_progress = pyqtSignal(object, int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = queue.Queue()
+        self.job_finished.connect(self._on_job_finished)
+        self.job_failed.connect(self._on_job_failed)
+        self.job_progress.connect(self._on_job_progress)
+
+    def submit(self, func, *args, on_result=None, on_error=None, on_progress=None, owner=None, **kwargs):
+        """İşi kuyruğa ekle
+
+        on_progress verilirse fonksiyona progress_callback parametresi geçilir;
+        işin durması istendiğinde bu geri çağrı False döndürür. owner olarak
+        verilen widget silinmişse sonuç geri çağrıları çalıştırılmaz.
+        """
+        job = DatabaseJob(func, args, kwargs, on_result, on_error, on_progress, owner)
+        if on_progress is not None:
+            def progress_callback(done, total):
+                self.job_progress.emit(job, done, total)
+                return not job.stop_requested
+            kwargs['progress_callback'] = progress_callback
+        self._queue.put(job)
+        return job
+
+    def stop(self):
+        """Kuyruktaki işler bittikten sonra thread'i durdur"""
+        self._queue.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if job.is_cancelled:
+                continue
+            try:
+                result = job.func(*job.args, **job.kwargs)
+            except Exception as e:
+                self.job_failed.emit(job, str(e))
+                continue
+            if isinstance(result, Future):
+                result.add_done_callback(lambda future, job=job: self._emit_future(job, future))
+                continue
+            self.job_finished.emit(job, result)
+
+    def _emit_future(self, job, future):
+        """Tamamlanan Future'ın sonucunu bildir (yazma kuyruğu thread'inde çağrılır)"""
+        error = future.exception()
+        if error is not None:
+            self.job_failed.emit(job, str(error))
+        else:
+            self.job_finished.emit(job, future.result())
+
+    @staticmethod
+    def _is_alive(job):
+        return not job.is_cancelled and (job.owner is None or not sip.isdeleted(job.owner))
+
+    def _on_job_finished(self, job, result):
+        if self._is_alive(job) and job.on_result:
+            job.on_result(result)
+
+    def _on_job_failed(self, job, message):
+        if not self._is_alive(job):
+            return
+        if job.on_error:
+            job.on_error(message)
+        else:
+            print(f"Arka plan işi hatası: {message}")
+
+    def _on_job_progress(self, job, done, total):
+        if self._is_alive(job) and job.on_progress:
+            job.on_progress(done, total)
+
+class ChangeWatcher(QObject):
+    """Veritabanına başka süreçlerin (diğer bilgisayarlar dahil) yazdıklarını izleyen yoklayıcı
+
+    Zamanlayıcı her turda arka plan işçisine bir yoklama işi gönderir; iş
+    yalnızca PRAGMA data_version okur, değer değişmişse değişiklik günlüğünden
+    etkilenen borçluların id'lerini alır. GUI thread'ine yalnızca sonuç gelir.
+    Bu uygulamanın kendi yazmaları günlükte işaretli olduğu için bildirilmez.
+    """
+    creditors_changed = pyqtSignal(set)
+    reload_required = pyqtSignal()
+
+    def __init__(self, db_manager, db_worker, interval_ms=1000, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.db_worker = db_worker
+        # Yoklama durumu yalnızca işçi thread'inde okunup yazılır
+        self._data_version = None
+        self._last_seq = None
+        self._job = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.poll)
+
+    def start(self):
+        self.poll()  # ilk iş başlangıç durumunu okur
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def poll(self):
+        """Yoklama işini kuyruğa ekle (önceki yoklama henüz bitmediyse atla)"""
+        if self._job is not None:
+            return
+        self._job = self.db_worker.submit(self._check_changes, owner=self,
+                                          on_result=self._on_checked, on_error=self._on_failed)
+
+    def _check_changes(self):
+        """Veri sürümü değiştiyse günlükten değişen borçluları oku (işçi thread'inde çalışır)"""
+        data_version = self.db_manager.get_data_version()
+        if self._last_seq is None:
+            self._data_version = data_version
+            self._last_seq = self.db_manager.get_last_change_seq()
+            return None
+        if data_version is None or data_version == self._data_version:
+            return None
+
+        # Sürüm yalnızca değişiklikler okunduktan sonra ilerletilir; okuma başarısız
+        # olursa bir sonraki yoklama aynı değişikliği yeniden dener
+        changes = self.db_manager.get_changed_creditor_ids(self._last_seq)
+        if changes is not None:
+            self._data_version = data_version
+            self._last_seq = changes['last_seq']
+        return changes
+
+    def _on_checked(self, changes):
+        self._job = None
+        if not changes:
+            return
+        if changes['full_reload']:
+            self.reload_required.emit()
+        elif changes['creditor_ids']:
+            self.creditors_changed.emit(changes['creditor_ids'])
+
+    def _on_failed(self, message):
+        self._job = None
+        print(f"Değişiklik yoklama hatası: {message}")
+
 class AddRecordDialog(QDialog):
     """Yeni borç veya ödeme kaydı ekleme dialog'u"""
     def __init__(self, parent=None):
@@ -506,15 +767,158 @@ class AddRecordDialog(QDialog):
             birim=self.birim_edit.text().strip()
         )
 
+class LedgerTableModel(QAbstractTableModel):
+    """Borçlu defteri için sayfalı, hücreleri yalnızca çizilirken biçimlendiren tablo modeli
+
+    Kayıtlar eskiden yeniye sıralıdır; daha eski sayfalar fetchMore() ile tablonun
+    başına eklenir. Qt görünümü son satır göründüğünde kendiliğinden fetchMore()
+    çağırdığı için yükleme yalnızca fetch_older() ile (en üste kaydırınca) istenir.
+    """
+    HEADERS = ["Tarih", "Açıklama", "Kod1", "Kod2", "Birim",
+               "Borç Tutarı", "Ödeme Tutarı", "Kalan Borç", "İşlem Türü"]
+
+    # Daha eski sayfa başa eklendi (eklenen satır sayısı)
+    older_loaded = pyqtSignal(int)
+
+    def __init__(self, creditor, db_worker, parent=None):
+        super().__init__(parent)
+        self.creditor = creditor
+        self.db_worker = db_worker
+        # Görünüme bildirilen satırlar; Creditor'un listesinden bağımsız tutulur
+        self._records = []
+        self._fetch_requested = False
+        self._fetching = False
+        self._fetch_job = None
+        # Kayıtlar geçersizleştirilmeden önce istenmiş eski sayfalar yok sayılır
+        self._generation = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self._records[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return record.date
+            if column == 1:
+                return record.description
+            if column == 2:
+                return record.kod1
+            if column == 3:
+                return record.kod2
+            if column == 4:
+                return record.birim
+            if column == 5:
+                return f"₺{record.debt_amount:.2f}"
+            if column == 6:
+                return f"₺{record.payment_amount:.2f}"
+            if column == 7:
+                return f"₺{record.remaining_debt:.2f}"
+            return self.transaction_type(record)
+        if role == Qt.ItemDataRole.BackgroundRole and column == 7 and record.remaining_debt > 0:
+            # Kalan borcu renklendir
+            return QColor(Qt.GlobalColor.lightGray)
+        return None
+
+    @staticmethod
+    def transaction_type(record):
+        """Kaydın işlem türünü belirle"""
+        if record.debt_amount > 0 and record.payment_amount == 0:
+            return "Borç"
+        if record.payment_amount > 0 and record.debt_amount == 0:
+            return "Ödeme"
+        if record.debt_amount > 0 and record.payment_amount > 0:
+            return "Borç + Ödeme"
+        return "Düzenleme"
+
+    def record_at(self, row):
+        """Satırdaki kaydı getir (geçersiz satırda None)"""
+        return self._records[row] if 0 <= row < len(self._records) else None
+
+    def invalidate(self):
+        """Borçlunun kayıtlarını geçersizleştir; bekleyen eski sayfa isteği iptal edilir
+
+        Tablo, yeniden yüklenen son sayfa set_latest_page() ile gelene kadar
+        bildirilen satırları göstermeye devam eder.
+        """
+        self._generation += 1
+        if self._fetch_job is not None:
+            self._fetch_job.cancel()
+            self._fetch_job = None
+        self._fetching = False
+        self.creditor.refresh_records()
+
+    def set_latest_page(self, page):
+        """Son kayıt sayfasını yükle ve tabloyu baştan kur"""
+        self.beginResetModel()
+        self._generation += 1
+        self.creditor.apply_page(page, replace=True)
+        self._records = list(self.creditor.recent_records)
+        self._fetching = False
+        self._fetch_job = None
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return (not parent.isValid() and self._fetch_requested and not self._fetching
+                and self.creditor.has_older_records)
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Bir önceki sayfayı arka planda al ve satır ekleme bildirimiyle başa ekle"""
+        self._fetch_requested = False
+        self._fetching = True
+        generation = self._generation
+
+        def apply_older_page(page):
+            if generation != self._generation:
+                return
+            self._fetching = False
+            self._fetch_job = None
+            loaded = self.creditor.apply_page(page)
+            if loaded:
+                self.beginInsertRows(QModelIndex(), 0, loaded - 1)
+                self._records[:0] = self.creditor.recent_records[:loaded]
+                self.endInsertRows()
+            self.older_loaded.emit(loaded)
+
+        def on_error(message):
+            if generation == self._generation:
+                self._fetching = False
+                self._fetch_job = None
+                self.older_loaded.emit(0)
+
+        self._fetch_job = self.db_worker.submit(self.creditor.fetch_page, self.creditor.older_cursor, owner=self,
+                                                on_result=apply_older_page, on_error=on_error)
+
+    def fetch_older(self):
+        """Daha eski bir sayfa varsa yüklenmesini iste, istek başladıysa True döndür"""
+        self._fetch_requested = True
+        if self.canFetchMore():
+            self.fetchMore()
+            return True
+        self._fetch_requested = False
+        return False
+
 class CreditorDetailWidget(QWidget):
     """Borçlu detayları ve kayıtları görüntüleme widget'ı"""
     def __init__(self, creditor, parent_app):
         super().__init__()
         self.creditor = creditor
         self.parent_app = parent_app
+        self.db_worker = parent_app.db_worker
         self.pdf_generator = PDFGenerator()  # PDF oluşturucu örneği
         self.setup_ui()
-        self.populate_table()
+        self.reload_records()
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -526,8 +930,7 @@ class CreditorDetailWidget(QWidget):
         header_layout.addWidget(title)
 
         # Total debt display
-        self.total_debt_label = QLabel()
-        self.update_total_debt_display()
+        self.total_debt_label = QLabel()  # bakiye reload_records() ile yüklenir
         self.total_debt_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))  # 12'den 16'ya çıkarıldı
         header_layout.addWidget(self.total_debt_label)
 
@@ -576,6 +979,12 @@ class CreditorDetailWidget(QWidget):
         backup_btn.clicked.connect(self.create_manual_backup)
         button_layout.addWidget(backup_btn)
 
+        self.load_older_btn = QPushButton("Daha Eski Kayıtlar")
+        self.load_older_btn.setFont(button_font)
+        self.load_older_btn.setMinimumHeight(40)
+        self.load_older_btn.clicked.connect(self.load_older_records)
+        button_layout.addWidget(self.load_older_btn)
+
         back_btn = QPushButton("Ana Sayfaya Dön")
         back_btn.setFont(button_font)
         back_btn.setMinimumHeight(40)
@@ -585,13 +994,15 @@ class CreditorDetailWidget(QWidget):
         button_layout.addStretch()
         layout.addLayout(button_layout)
 
-        # Records table
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels([
-                 "Tarih", "Açıklama", "Kod1", "Kod2", "Birim",
-                 "Borç Tutarı", "Ödeme Tutarı", "Kalan Borç", "İşlem Türü"
-        ])
+        # Records table (hücreler yalnızca çizilirken biçimlendirilir)
+        self.model = LedgerTableModel(self.creditor, self.db_worker, self)
+        self.model.older_loaded.connect(self.on_older_loaded)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        # En üste kaydırınca daha eski kayıtları yükle
+        self.table.verticalScrollBar().valueChanged.connect(self.on_scrolled)
 
         # Tablo başlık fontunu büyüt
         header_font = QFont("Arial", 12, QFont.Weight.Bold)
@@ -617,64 +1028,72 @@ class CreditorDetailWidget(QWidget):
         layout.addWidget(self.table)
         self.setLayout(layout)
 
+    def refresh_changed(self):
+        """Başka bir bağlantıda değişen kayıtları sessizce yeniden yükle"""
+        self.model.invalidate()
+        self.reload_records()
+
     def refresh_data(self):
         """Verileri yenile"""
-        self.creditor.refresh_records()
-        self.populate_table()
-        self.update_total_debt_display()
+        self.model.invalidate()
+        self.reload_records(on_loaded=lambda: QMessageBox.information(
+            self, "Yenileme", "Veriler başarıyla yenilendi!"))
         self.parent_app.update_creditor_list()
-        QMessageBox.information(self, "Yenileme", "Veriler başarıyla yenilendi!")
+
+    def reload_records(self, on_loaded=None):
+        """Son kayıt sayfasını ve bakiyeyi arka planda yeniden yükle"""
+        self.load_older_btn.setEnabled(False)
+
+        def apply_latest_page(page):
+            self.model.set_latest_page(page)
+            self.load_older_btn.setEnabled(self.creditor.has_older_records)
+            # En yeni kayıtlar tablonun sonunda
+            self.table.scrollToBottom()
+            if on_loaded:
+                on_loaded()
+
+        self.db_worker.submit(self.creditor.fetch_page, None, owner=self, on_result=apply_latest_page)
+        self.update_total_debt_display()
 
     def create_manual_backup(self):
         """Manuel yedek oluştur"""
-        try:
-            backup_path = self.parent_app.db_manager.create_backup("manual")
+        def on_result(backup_path):
             if backup_path:
                 QMessageBox.information(self, "Yedekleme Başarılı",
                                       "Yedek başarıyla oluşturuldu!")
             else:
                 QMessageBox.warning(self, "Yedekleme Hatası",
                                   "Yedek oluşturulamadı!")
-        except Exception as e:
+
+        def on_error(message):
             QMessageBox.critical(self, "Yedekleme Hatası",
-                               f"Yedek oluşturulurken hata: {str(e)}")
+                               f"Yedek oluşturulurken hata: {message}")
+
+        self.db_worker.submit(self.parent_app.db_manager.create_backup, "manual",
+                              owner=self, on_result=on_result, on_error=on_error)
 
     def update_total_debt_display(self):
-        """Toplam bor���� görüntüsünü güncelle"""
-        total = self.creditor.get_total_debt()
-        color = "red" if total > 0 else "green"
-        self.total_debt_label.setText(f"<span style='color: {color}'>Toplam Borç: ₺{total:.2f}</span>")
-
-    def populate_table(self):
-        """Tabloyu borçlu kayıtlarıyla doldur"""
-        self.table.setRowCount(len(self.creditor.records))
-
-        for row, record in enumerate(self.creditor.records):
-            self.table.setItem(row, 0, QTableWidgetItem(record.date))
-            self.table.setItem(row, 1, QTableWidgetItem(record.description))
-            self.table.setItem(row, 2, QTableWidgetItem(record.kod1))  # Kod1
-            self.table.setItem(row, 3, QTableWidgetItem(record.kod2))  # Kod2
-            self.table.setItem(row, 4, QTableWidgetItem(record.birim))  # Birim
-            self.table.setItem(row, 5, QTableWidgetItem(f"₺{record.debt_amount:.2f}"))  # Borç Tutarı
-            self.table.setItem(row, 6, QTableWidgetItem(f"₺{record.payment_amount:.2f}"))  # Ödeme Tutarı
-            self.table.setItem(row, 7, QTableWidgetItem(f"₺{record.remaining_debt:.2f}"))  # Kalan Borç
-
-            # İşlem türünü belirle
-            if record.debt_amount > 0 and record.payment_amount == 0:
-                transaction_type = "Borç"
-            elif record.payment_amount > 0 and record.debt_amount == 0:
-                transaction_type = "Ödeme"
-            elif record.debt_amount > 0 and record.payment_amount > 0:
-                transaction_type = "Borç + Ödeme"
-            else:
-                transaction_type = "Düzenleme"
+        """Toplam borç görüntüsünü güncelle"""
+        def show_total(total):
+            color = "red" if total > 0 else "green"
+            self.total_debt_label.setText(f"<span style='color: {color}'>Toplam Borç: ₺{total:.2f}</span>")
 
-            self.table.setItem(row, 8, QTableWidgetItem(transaction_type))  # İşlem Türü
+        self.db_worker.submit(self.creditor.get_total_debt, owner=self, on_result=show_total)
 
-            # Color code the remaining debt
-            remaining_item = self.table.item(row, 7)  # Kalan borç sütunu artık 7. sütun
-            if record.remaining_debt > 0:
-                remaining_item.setBackground(Qt.GlobalColor.lightGray)
+    def load_older_records(self):
+        """Bir önceki kayıt sayfasını tablonun başına ekle"""
+        if self.model.fetch_older():
+            self.load_older_btn.setEnabled(False)
+
+    def on_scrolled(self, value):
+        if value == self.table.verticalScrollBar().minimum() and self.model.rowCount() > 0:
+            self.load_older_records()
+
+    def on_older_loaded(self, loaded):
+        self.load_older_btn.setEnabled(self.creditor.has_older_records)
+        if loaded:
+            # Kullanıcının baktığı yer kaymasın: yeni yüklenen sayfanın sonuna git
+            self.table.scrollTo(self.model.index(loaded - 1, 0))
 
     def add_record(self):
         """Borçluya yeni kayıt ekle"""
@@ -686,26 +1105,36 @@ class CreditorDetailWidget(QWidget):
             if record_data is None:
                 return
 
-            # Veritabanına ekle
-            success = self.creditor.add_record(record_data)
+            def on_result(record_id):
+                if record_id:
+                    self.model.invalidate()
+                    self.reload_records()
+                    self.parent_app.update_creditor_list()
+                    QMessageBox.information(self, "Başarılı", "Kayıt başarıyla eklendi!")
+                else:
+                    QMessageBox.critical(self, "Hata", "Kayıt eklenirken hata oluştu!")
 
-            if success:
-                self.populate_table()
-                self.update_total_debt_display()
-                self.parent_app.update_creditor_list()
-                QMessageBox.information(self, "Başarılı", "Kayıt başarıyla eklendi!")
-            else:
-                QMessageBox.critical(self, "Hata", "Kayıt eklenirken hata oluştu!")
+            def on_error(message):
+                QMessageBox.critical(self, "Hata", f"Kayıt eklenirken hata oluştu: {message}")
+
+            # Kayıt yazma kuyruğuna eklenir, sonuç grup commit'inden sonra gelir
+            self.db_worker.submit(self.creditor.save_record, record_data, owner=self,
+                                  on_result=on_result, on_error=on_error)
 
     def print_ledger(self):
         """Borçlunun defterini yazdır"""
         printer = QPrinter()
         dialog = QPrintDialog(printer, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.render_to_printer(printer)
+            # Kayıtlar arka planda yüklenir, yazdırma GUI thread'inde yapılır
+            self.db_worker.submit(self.creditor.load_records, owner=self,
+                                  on_result=lambda records: self.render_to_printer(printer, records))
 
-    def render_to_printer(self, printer):
+    def render_to_printer(self, printer, records=None):
         """Yazıcıya render et"""
+        if records is None:
+            records = self.creditor.records
+        total_debt = records[-1].remaining_debt if records else 0.0
         try:
             # Basit bir HTML tablosu oluştur ve yazdır
             from PyQt6.QtGui import QTextDocument
@@ -726,7 +1155,7 @@ class CreditorDetailWidget(QWidget):
             </head>
             <body>
                 <h1>{self.creditor.name} - Veresiye Defteri</h1>
-                <p><strong>Toplam Borç:</strong> ₺{self.creditor.get_total_debt():.2f}</p>
+                <p><strong>Toplam Borç:</strong> ₺{total_debt:.2f}</p>
                 <table>
                     <tr>
                         <th>Tarih</th>
@@ -741,7 +1170,7 @@ class CreditorDetailWidget(QWidget):
                     </tr>
             """
 
-            for record in self.creditor.records:
+            for record in records:
                 debt_class = "debt" if record.debt_amount > 0 else ""
                 payment_class = "payment" if record.payment_amount > 0 else ""
 
@@ -778,18 +1207,18 @@ class CreditorDetailWidget(QWidget):
         filename = f"{self.creditor.name}_defter.pdf"
         filepath = os.path.join(os.path.expanduser("~"), "Desktop", filename)
 
-        try:
-            # Yeni PDFGenerator sınıfını kullan
-            self.pdf_generator.create_ledger_pdf(filepath, self.creditor.name, self.creditor.records)
-            QMessageBox.information(self, "Dışa Aktarma Başarılı",
-                                  f"Defter şu konuma aktarıldı: {filepath}")
-        except Exception as e:
+        def on_error(message):
             QMessageBox.critical(self, "Dışa Aktarma Hatası",
-                               f"PDF dışa aktarma başarısız: {str(e)}")
+                               f"PDF dışa aktarma başarısız: {message}")
+
+        # Kayıtların yüklenmesi ve PDF oluşturma arka planda
+        self.db_worker.submit(self.create_pdf, filepath, owner=self, on_error=on_error,
+                              on_result=lambda _: QMessageBox.information(
+                                  self, "Dışa Aktarma Başarılı", f"Defter şu konuma aktarıldı: {filepath}"))
 
     def create_pdf(self, filepath):
-        """Eski fonksiyon - artık PDFGenerator kullanıyor"""
-        self.pdf_generator.create_ledger_pdf(filepath, self.creditor.name, self.creditor.records)
+        """Defter PDF'ini oluştur (kayıtları veritabanından yeniden okur, arka planda çalışabilir)"""
+        self.pdf_generator.create_ledger_pdf(filepath, self.creditor.name, self.creditor.load_records())
 
     def create_receipt_pdf(self, record, receipt_number=None):
         """Tek bir kayıt için fiş formatında PDF oluştur"""
@@ -805,22 +1234,22 @@ class CreditorDetailWidget(QWidget):
 
     def export_receipt_for_record(self):
         """Seçili kayıt için fiş çıktısı al"""
-        current_row = self.table.currentRow()
+        current_row = self.table.currentIndex().row()
         if current_row < 0:
             QMessageBox.warning(self, "Seçim Hatası", "Lütfen fiş çıktısı almak istediğiniz kaydı seçin!")
             return
-        if current_row >= len(self.creditor.records):
+        record = self.model.record_at(current_row)
+        if record is None:
             QMessageBox.warning(self, "Hata", "Geçersiz kayıt seçimi!")
             return
-        record = self.creditor.records[current_row]
 
-        try:
-            filepath = self.create_receipt_pdf(record)
-            QMessageBox.information(self, "Fiş Oluşturuldu",
-                                  f"Fiş başarıyla oluşturuldu: {filepath}")
-        except Exception as e:
+        def on_error(message):
             QMessageBox.critical(self, "Fiş Oluşturma Hatası",
-                               f"Fiş oluşturulurken hata: {str(e)}")
+                               f"Fiş oluşturulurken hata: {message}")
+
+        self.db_worker.submit(self.create_receipt_pdf, record, owner=self, on_error=on_error,
+                              on_result=lambda filepath: QMessageBox.information(
+                                  self, "Fiş Oluşturuldu", f"Fiş başarıyla oluşturuldu: {filepath}"))
 
 class ReceiptOptionsDialog(QDialog):
     """Fiş çıktısı için iskonto ve müşteri masrafı girişi"""
@@ -855,11 +1284,242 @@ class ReceiptOptionsDialog(QDialog):
     def get_values(self):
         return self.iskonto_spin.value(), self.masraf_spin.value()
 
+class BackupRestoreDialog(QDialog):
+    """Yedek kataloğunu listeleyen ve geri yükleme yapan dialog"""
+    def __init__(self, db_manager, db_worker, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.db_worker = db_worker
+        self.backups = []
+        self.restored = False
+        self.setWindowTitle("Yedekten Geri Yükle")
+        self.setModal(True)
+        self.resize(760, 480)
+        self.setFont(QFont("Arial", 12))
+
+        layout = QVBoxLayout()
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Tarih", "Tür", "Borçlu", "Kayıt", "Boyut"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.restore_btn = QPushButton("Seçili Yedeğe Geri Yükle")
+        self.restore_btn.setMinimumHeight(35)
+        self.restore_btn.clicked.connect(self.restore_selected)
+        layout.addWidget(self.restore_btn)
+
+        # Değişiklik günlüğüyle belirli bir ana geri dönüş
+        pitr_layout = QHBoxLayout()
+        self.time_edit = QDateTimeEdit(QDateTime.currentDateTime())
+        self.time_edit.setDisplayFormat("dd.MM.yyyy HH:mm:ss")
+        self.time_edit.setCalendarPopup(True)
+        pitr_layout.addWidget(self.time_edit)
+        self.pitr_btn = QPushButton("Bu Zamana Geri Dön")
+        self.pitr_btn.setMinimumHeight(35)
+        self.pitr_btn.clicked.connect(self.restore_to_time)
+        pitr_layout.addWidget(self.pitr_btn)
+        layout.addLayout(pitr_layout)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+
+        self.load_catalog()
+
+    def load_catalog(self):
+        """Yedek kataloğunu arka planda yükle"""
+        def on_loaded(backups):
+            self.backups = backups
+            self.table.setRowCount(len(backups))
+            for row, backup in enumerate(backups):
+                created_at = datetime.fromisoformat(backup['created_at']).strftime('%d.%m.%Y %H:%M:%S')
+                values = [created_at, backup['operation_type'],
+                          '' if backup['creditor_count'] is None else str(backup['creditor_count']),
+                          '' if backup['record_count'] is None else str(backup['record_count']),
+                          f"{backup['size'] / 1024:.0f} KB"]
+                for column, value in enumerate(values):
+                    self.table.setItem(row, column, QTableWidgetItem(value))
+
+        self.db_worker.submit(self.db_manager.get_backup_catalog, owner=self, on_result=on_loaded)
+
+    def _set_busy(self, busy):
+        self.restore_btn.setEnabled(not busy)
+        self.pitr_btn.setEnabled(not busy)
+
+    def _on_restored(self, success):
+        self._set_busy(False)
+        if success:
+            self.restored = True
+            QMessageBox.information(self, "Geri Yükleme Tamamlandı",
+                                  "Veritabanı geri yüklendi.\nÖnceki hal de yedek olarak saklandı.")
+            self.load_catalog()
+        else:
+            QMessageBox.critical(self, "Geri Yükleme Hatası", "Geri yükleme yapılamadı!")
+
+    def restore_selected(self):
+        row = self.table.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "Uyarı", "Lütfen geri yüklenecek yedeği seçin!")
+            return
+        backup = self.backups[row]
+        reply = QMessageBox.question(self, "Geri Yükleme",
+                                   f"Veritabanı {self.table.item(row, 0).text()} tarihli yedeğe döndürülecek.\n"
+                                   "Devam etmek istiyor musunuz?",
+                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self._set_busy(True)
+            self.db_worker.submit(self.db_manager.restore_backup, backup['filename'], owner=self,
+                                  on_result=self._on_restored)
+
+    def restore_to_time(self):
+        target = self.time_edit.dateTime().toPyDateTime()
+        reply = QMessageBox.question(self, "Geri Yükleme",
+                                   f"Veritabanı {target.strftime('%d.%m.%Y %H:%M:%S')} anındaki haline döndürülecek.\n"
+                                   "Devam etmek istiyor musunuz?",
+                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self._set_busy(True)
+            self.db_worker.submit(self.db_manager.rollback_to_point_in_time, target, owner=self,
+                                  on_result=self._on_restored)
+
+class ReportDialog(QDialog):
+    """Tarihe göre bakiye ve tarih aralığındaki hareketler raporu"""
+    def __init__(self, db_manager, db_worker, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.db_worker = db_worker
+        self.setWindowTitle("Raporlar")
+        self.setModal(True)
+        self.resize(900, 600)
+        self.setFont(QFont("Arial", 12))
+
+        layout = QVBoxLayout()
+        tabs = QTabWidget()
+
+        # --- Belirli bir tarihteki bakiyeler
+        balances_page = QWidget()
+        balances_layout = QVBoxLayout(balances_page)
+        as_of_layout = QHBoxLayout()
+        as_of_layout.addWidget(QLabel("Tarih:"))
+        self.as_of_edit = QDateEdit(QDate.currentDate())
+        self.as_of_edit.setDisplayFormat("dd.MM.yyyy")
+        self.as_of_edit.setCalendarPopup(True)
+        as_of_layout.addWidget(self.as_of_edit)
+        self.balances_btn = QPushButton("Bakiyeleri Göster")
+        self.balances_btn.clicked.connect(self.load_balances)
+        as_of_layout.addWidget(self.balances_btn)
+        as_of_layout.addStretch()
+        balances_layout.addLayout(as_of_layout)
+
+        self.balances_table = self._create_table(["Borçlu", "Bakiye"])
+        balances_layout.addWidget(self.balances_table)
+        self.balances_total_label = QLabel()
+        self.balances_total_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        balances_layout.addWidget(self.balances_total_label)
+        tabs.addTab(balances_page, "Tarihe Göre Bakiye")
+
+        # --- Tarih aralığındaki hareketler
+        movements_page = QWidget()
+        movements_layout = QVBoxLayout(movements_page)
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(QLabel("Başlangıç:"))
+        self.start_edit = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.start_edit.setDisplayFormat("dd.MM.yyyy")
+        self.start_edit.setCalendarPopup(True)
+        range_layout.addWidget(self.start_edit)
+        range_layout.addWidget(QLabel("Bitiş:"))
+        self.end_edit = QDateEdit(QDate.currentDate())
+        self.end_edit.setDisplayFormat("dd.MM.yyyy")
+        self.end_edit.setCalendarPopup(True)
+        range_layout.addWidget(self.end_edit)
+        self.movements_btn = QPushButton("Hareketleri Göster")
+        self.movements_btn.clicked.connect(self.load_movements)
+        range_layout.addWidget(self.movements_btn)
+        range_layout.addStretch()
+        movements_layout.addLayout(range_layout)
+
+        self.movements_table = self._create_table(["Tarih", "Borçlu", "Açıklama", "Borç", "Ödeme", "Kalan Borç"])
+        movements_layout.addWidget(self.movements_table)
+        self.movements_total_label = QLabel()
+        self.movements_total_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        movements_layout.addWidget(self.movements_total_label)
+        tabs.addTab(movements_page, "Hareketler")
+
+        layout.addWidget(tabs)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+
+    @staticmethod
+    def _create_table(headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        return table
+
+    @staticmethod
+    def _fill_table(table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(value))
+
+    def load_balances(self):
+        """Seçilen günün sonundaki borçlu bakiyelerini arka planda getir"""
+        as_of = self.as_of_edit.date().toString("yyyy-MM-dd")
+
+        def on_loaded(balances):
+            self.balances_btn.setEnabled(True)
+            self._fill_table(self.balances_table,
+                             [[b['name'], f"₺{b['balance']:.2f}"] for b in balances])
+            total = sum(b['balance'] for b in balances)
+            self.balances_total_label.setText(f"{len(balances)} borçlu, toplam bakiye: ₺{total:.2f}")
+
+        self.balances_btn.setEnabled(False)
+        self.db_worker.submit(self.db_manager.get_balances_as_of, as_of, owner=self, on_result=on_loaded,
+                              on_error=lambda message: self._on_report_failed(self.balances_btn, message))
+
+    def load_movements(self):
+        """Seçilen tarih aralığındaki hareketleri arka planda getir"""
+        start = self.start_edit.date().toString("yyyy-MM-dd")
+        end = self.end_edit.date().toString("yyyy-MM-dd")
+        if start > end:
+            QMessageBox.warning(self, "Uyarı", "Başlangıç tarihi bitiş tarihinden sonra olamaz!")
+            return
+
+        def on_loaded(movements):
+            self.movements_btn.setEnabled(True)
+            self._fill_table(self.movements_table, [
+                [m['date'], m['creditor_name'], m['description'], f"₺{m['debt_amount']:.2f}",
+                 f"₺{m['payment_amount']:.2f}", f"₺{m['remaining_debt']:.2f}"]
+                for m in movements])
+            total_debt = sum(m['debt_amount'] for m in movements)
+            total_payment = sum(m['payment_amount'] for m in movements)
+            self.movements_total_label.setText(
+                f"{len(movements)} hareket, borç: ₺{total_debt:.2f}, ödeme: ₺{total_payment:.2f}")
+
+        self.movements_btn.setEnabled(False)
+        self.db_worker.submit(self.db_manager.get_movements, start, end, owner=self, on_result=on_loaded,
+                              on_error=lambda message: self._on_report_failed(self.movements_btn, message))
+
+    def _on_report_failed(self, button, message):
+        """Rapor alınamadı (ör. tarih sıkıştırılmış döneme düşüyor)"""
+        button.setEnabled(True)
+        QMessageBox.warning(self, "Rapor Alınamadı", message)
+
 class DatabaseSettingsDialog(QDialog):
     """Veritabanı ayarları ve yönetimi dialog'u"""
-    def __init__(self, db_manager, parent=None):
+    def __init__(self, db_manager, db_worker, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.db_worker = db_worker
         self.setWindowTitle("Veritabanı Ayarları")
         self.setModal(True)
         self.resize(600, 500)
@@ -901,6 +1561,11 @@ class DatabaseSettingsDialog(QDialog):
         manual_backup_btn.clicked.connect(self.create_manual_backup)
         backup_layout.addWidget(manual_backup_btn)
 
+        restore_backup_btn = QPushButton("Yedekten Geri Yükle")
+        restore_backup_btn.setMinimumHeight(35)
+        restore_backup_btn.clicked.connect(self.show_restore_dialog)
+        backup_layout.addWidget(restore_backup_btn)
+
         # Eski yedekleri temizle
         cleanup_backups_layout = QHBoxLayout()
         cleanup_backups_btn = QPushButton("Eski Yedekleri Temizle")
@@ -910,8 +1575,8 @@ class DatabaseSettingsDialog(QDialog):
 
         self.backup_count_spin = QSpinBox()
         self.backup_count_spin.setMinimum(1)
-        self.backup_count_spin.setMaximum(100)
-        self.backup_count_spin.setValue(10)
+        self.backup_count_spin.setMaximum(1000)
+        self.backup_count_spin.setValue(200)
         self.backup_count_spin.setSuffix(" adet sakla")
         cleanup_backups_layout.addWidget(self.backup_count_spin)
 
@@ -925,7 +1590,7 @@ class DatabaseSettingsDialog(QDialog):
 
         # Eski kayıtları temizle
         cleanup_records_layout = QHBoxLayout()
-        cleanup_records_btn = QPushButton("Eski Kayıtları Temizle")
+        cleanup_records_btn = QPushButton("Eski Kayıtları Arşivle")
         cleanup_records_btn.setMinimumHeight(35)
         cleanup_records_btn.clicked.connect(self.cleanup_old_records)
         cleanup_records_layout.addWidget(cleanup_records_btn)
@@ -938,11 +1603,34 @@ class DatabaseSettingsDialog(QDialog):
         cleanup_records_layout.addWidget(self.days_spin)
 
         cleanup_layout.addLayout(cleanup_records_layout)
+
+        # Eski kayıtları devir kaydına sıkıştır (aynı gün sınırıyla)
+        compact_records_btn = QPushButton("Eski Kayıtları Devreden Bakiyeye Sıkıştır")
+        compact_records_btn.setMinimumHeight(35)
+        compact_records_btn.clicked.connect(self.compact_old_records)
+        cleanup_layout.addWidget(compact_records_btn)
         cleanup_group.setLayout(cleanup_layout)
         layout.addWidget(cleanup_group)
 
-        # JSON dışa aktarma
-        export_group = QGroupBox("Dışa Aktarma")
+        # Bakım grubu
+        maintenance_group = QGroupBox("Bakım")
+        maintenance_layout = QVBoxLayout()
+
+        verify_balances_btn = QPushButton("Bakiyeleri Doğrula ve Onar")
+        verify_balances_btn.setMinimumHeight(35)
+        verify_balances_btn.clicked.connect(self.verify_balances)
+        maintenance_layout.addWidget(verify_balances_btn)
+
+        verify_stats_btn = QPushButton("İstatistikleri Doğrula ve Yeniden Hesapla")
+        verify_stats_btn.setMinimumHeight(35)
+        verify_stats_btn.clicked.connect(self.verify_stats)
+        maintenance_layout.addWidget(verify_stats_btn)
+
+        maintenance_group.setLayout(maintenance_layout)
+        layout.addWidget(maintenance_group)
+
+        # JSON içe / dışa aktarma
+        export_group = QGroupBox("İçe / Dışa Aktarma")
         export_layout = QVBoxLayout()
 
         export_json_btn = QPushButton("Verileri JSON'a Aktar")
@@ -950,6 +1638,11 @@ class DatabaseSettingsDialog(QDialog):
         export_json_btn.clicked.connect(self.export_to_json)
         export_layout.addWidget(export_json_btn)
 
+        import_json_btn = QPushButton("JSON'dan İçe Aktar")
+        import_json_btn.setMinimumHeight(35)
+        import_json_btn.clicked.connect(self.import_from_json)
+        export_layout.addWidget(import_json_btn)
+
         export_group.setLayout(export_layout)
         layout.addWidget(export_group)
 
@@ -968,9 +1661,11 @@ class DatabaseSettingsDialog(QDialog):
         self.setLayout(layout)
 
     def update_stats(self):
-        """Veritabanı istatistiklerini güncelle"""
-        try:
-            stats = self.db_manager.get_database_stats()
+        """Veritabanı istatistiklerini arka planda güncelle"""
+        def show_stats(stats):
+            if stats is None:
+                self.stats_label.setText("İstatistik yüklenirken hata oluştu.")
+                return
             stats_text = f"""
 Toplam Borçlu Sayısı: {stats['creditor_count']}
 Toplam Kayıt Sayısı: {stats['record_count']}
@@ -979,16 +1674,19 @@ Toplam Ödeme: ₺{stats['total_payment']:.2f}
 Net Bakiye: ₺{stats['net_balance']:.2f}
 
 Veritabanı Boyutu: {stats['db_size_mb']:.2f} MB
+Yedekler: {stats['backup_count']} adet, {stats['backup_size_mb']:.2f} MB
+Sorgu Önbelleği: {stats['cache_hits']} isabet, {stats['cache_misses']} ıska
 Son Güncelleme: {datetime.now().strftime('%d.%m.%Y %H:%M')}
             """.strip()
             self.stats_label.setText(stats_text)
-        except Exception as e:
-            self.stats_label.setText(f"İstatistik yüklenirken hata: {str(e)}")
+
+        self.db_worker.submit(self.db_manager.get_database_stats, owner=self, on_result=show_stats,
+                              on_error=lambda message: self.stats_label.setText(
+                                  f"İstatistik yüklenirken hata: {message}"))
 
     def create_manual_backup(self):
         """Manuel yedek oluştur"""
-        try:
-            backup_path = self.db_manager.create_backup("manual")
+        def on_result(backup_path):
             if backup_path:
                 QMessageBox.information(self, "Yedekleme Başarılı",
                                       f"Yedek başarıyla oluşturuldu!\n\n{backup_path}")
@@ -996,9 +1694,17 @@ Son Güncelleme: {datetime.now().strftime('%d.%m.%Y %H:%M')}
             else:
                 QMessageBox.warning(self, "Yedekleme Hatası",
                                   "Yedek oluşturulamadı!")
-        except Exception as e:
-            QMessageBox.critical(self, "Yedekleme Hatası",
-                               f"Yedek oluşturulurken hata: {str(e)}")
+
+        self.db_worker.submit(self.db_manager.create_backup, "manual", owner=self, on_result=on_result,
+                              on_error=lambda message: QMessageBox.critical(
+                                  self, "Yedekleme Hatası", f"Yedek oluşturulurken hata: {message}"))
+
+    def show_restore_dialog(self):
+        """Yedek kataloğunu aç, geri yükleme yapıldıysa istatistikleri yenile"""
+        dlg = BackupRestoreDialog(self.db_manager, self.db_worker, self)
+        dlg.exec()
+        if dlg.restored:
+            self.update_stats()
 
     def cleanup_old_backups(self):
         """Eski yedekleri temizle"""
@@ -1009,69 +1715,389 @@ Son Güncelleme: {datetime.now().strftime('%d.%m.%Y %H:%M')}
                                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            try:
-                deleted_count = self.db_manager.cleanup_old_backups(keep_count)
+            def on_result(deleted_count):
                 QMessageBox.information(self, "Temizlik Tamamlandı",
                                       f"{deleted_count} eski yedek dosyası silindi.")
                 self.update_stats()
-            except Exception as e:
-                QMessageBox.critical(self, "Temizlik Hatası",
-                                   f"Yedek temizliği sırasında hata: {str(e)}")
+
+            self.db_worker.submit(self.db_manager.cleanup_old_backups, keep_count, owner=self, on_result=on_result,
+                                  on_error=lambda message: QMessageBox.critical(
+                                      self, "Temizlik Hatası", f"Yedek temizliği sırasında hata: {message}"))
 
     def cleanup_old_records(self):
-        """Eski kayıtları temizle"""
+        """Eski kayıtları arşiv veritabanına taşı"""
         keep_days = self.days_spin.value()
         cutoff_date = datetime.now() - timedelta(days=keep_days)
 
         reply = QMessageBox.question(self, "Kayıt Temizliği",
-                                   f"{cutoff_date.strftime('%d.%m.%Y')} tarihinden önceki kayıtlar silinecek.\n"
-                                   "Bu işlem geri alınamaz!\n\n"
+                                   f"{cutoff_date.strftime('%d.%m.%Y')} tarihinden önceki kayıtlar\n"
+                                   "arşiv veritabanına taşınacak ve ana defterden kaldırılacak.\n\n"
                                    "Devam etmek istiyor musunuz?",
                                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            try:
-                # Önce yedek oluştur
-                backup_path = self.db_manager.create_backup("before_cleanup")
-                if not backup_path:
-                    QMessageBox.warning(self, "Yedekleme Hatası",
-                                      "Güvenlik yedeği oluşturulamadı! İşlem iptal edildi.")
+            def on_result(result):
+                if result is None:
+                    QMessageBox.critical(self, "Temizlik Hatası", "Kayıtlar arşivlenirken hata oluştu!")
                     return
-
-                deleted_count = self.db_manager.cleanup_old_records(keep_days)
                 QMessageBox.information(self, "Temizlik Tamamlandı",
-                                      f"{deleted_count} eski kayıt silindi.\n"
-                                      f"Güvenlik yedeği: {backup_path}")
+                                      f"{result['archived_count']} eski kayıt arşive taşındı.\n"
+                                      f"{result['deleted_creditors']} boş borçlu kaldırıldı.\n"
+                                      f"Geri kazanılan alan: {result['reclaimed_bytes'] / 1024:.1f} KB\n"
+                                      f"Arşiv: {self.db_manager.archive_path}")
                 self.update_stats()
-            except Exception as e:
-                QMessageBox.critical(self, "Temizlik Hatası",
-                                   f"Kayıt temizliği sırasında hata: {str(e)}")
+
+            self.db_worker.submit(self.db_manager.archive_old_records, keep_days, owner=self, on_result=on_result,
+                                  on_error=lambda message: QMessageBox.critical(
+                                      self, "Temizlik Hatası", f"Kayıt temizliği sırasında hata: {message}"))
+
+    def compact_old_records(self):
+        """Eski kayıtları borçlu başına tek bir devir kaydında topla"""
+        keep_days = self.days_spin.value()
+        cutoff_date = datetime.now() - timedelta(days=keep_days)
+
+        reply = QMessageBox.question(self, "Kayıt Sıkıştırma",
+                                   f"{cutoff_date.strftime('%d.%m.%Y')} tarihinden önceki kayıtlar her borçlu için\n"
+                                   "tek bir \"Devreden Bakiye\" kaydında toplanacak, asılları arşive taşınacak.\n"
+                                   "Güncel bakiyeler değişmez; ancak bu tarihten önceki günler için\n"
+                                   "tarihe göre bakiye ve hareket raporu alınamaz (eski kayıtlar arşivde kalır).\n\n"
+                                   "Devam etmek istiyor musunuz?",
+                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+
+        if reply == QMessageBox.StandardButton.Yes:
+            def on_result(result):
+                if result is None:
+                    QMessageBox.critical(self, "Sıkıştırma Hatası", "Kayıtlar sıkıştırılırken hata oluştu!")
+                    return
+                QMessageBox.information(self, "Sıkıştırma Tamamlandı",
+                                      f"{result['compacted_creditors']} borçlunun {result['archived_count']} eski kaydı\n"
+                                      "devir kaydına sıkıştırıldı.\n"
+                                      f"Geri kazanılan alan: {result['reclaimed_bytes'] / 1024:.1f} KB\n"
+                                      f"Arşiv: {self.db_manager.archive_path}")
+                self.update_stats()
+
+            self.db_worker.submit(self.db_manager.compact_opening_balances, keep_days, owner=self, on_result=on_result,
+                                  on_error=lambda message: QMessageBox.critical(
+                                      self, "Sıkıştırma Hatası", f"Kayıt sıkıştırma sırasında hata: {message}"))
+
+    def verify_balances(self):
+        """Bakiye özet tablosunu doğrula, tutarsızlık varsa yeniden hesapla"""
+        def verify_and_repair():
+            mismatches = self.db_manager.verify_creditor_balances()
+            repaired = bool(mismatches) and self.db_manager.rebuild_creditor_balances()
+            return mismatches, repaired
+
+        def on_result(result):
+            mismatches, repaired = result
+            if mismatches is None:
+                QMessageBox.critical(self, "Doğrulama Hatası", "Bakiyeler doğrulanamadı!")
+            elif not mismatches:
+                QMessageBox.information(self, "Doğrulama Tamamlandı", "Tüm borçlu bakiyeleri doğru.")
+            elif repaired:
+                names = "\n".join(m['name'] for m in mismatches[:10])
+                QMessageBox.information(self, "Bakiyeler Onarıldı",
+                                      f"{len(mismatches)} borçlunun bakiyesi tutarsızdı ve yeniden hesaplandı:\n\n{names}")
+            else:
+                QMessageBox.critical(self, "Onarım Hatası", "Bakiyeler yeniden hesaplanamadı!")
+
+        self.db_worker.submit(verify_and_repair, owner=self, on_result=on_result)
+
+    def verify_stats(self):
+        """İstatistik sayaçlarını tam taramayla doğrula ve yeniden hesapla"""
+        def verify_and_rebuild():
+            mismatches = self.db_manager.verify_database_stats()
+            rebuilt = mismatches is not None and self.db_manager.rebuild_database_stats()
+            return mismatches, rebuilt
+
+        def on_result(result):
+            mismatches, rebuilt = result
+            if mismatches is None or not rebuilt:
+                QMessageBox.critical(self, "Doğrulama Hatası", "İstatistikler doğrulanamadı!")
+            elif not mismatches:
+                QMessageBox.information(self, "Doğrulama Tamamlandı", "Tüm istatistik sayaçları doğru.")
+            else:
+                fields = "\n".join(f"{m['field']}: {m['stored']} → {m['actual']}" for m in mismatches)
+                QMessageBox.information(self, "İstatistikler Onarıldı",
+                                      f"{len(mismatches)} sayaç tutarsızdı ve yeniden hesaplandı:\n\n{fields}")
+            self.update_stats()
+
+        self.db_worker.submit(verify_and_rebuild, owner=self, on_result=on_result)
 
     def export_to_json(self):
         """Verileri JSON formatında dışa aktar"""
-        try:
-            filename = f"veresiye_defteri_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            filepath = os.path.join(os.path.expanduser("~"), "Desktop", filename)
+        filename = f"veresiye_defteri_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        filepath = os.path.join(os.path.expanduser("~"), "Desktop", filename)
 
-            self.db_manager.export_to_json(filepath)
-            QMessageBox.information(self, "Dışa Aktarma Başarılı",
-                                  f"Veriler başarıyla dışa aktarıldı:\n\n{filepath}")
-        except Exception as e:
-            QMessageBox.critical(self, "Dışa Aktarma Hatası",
-                               f"JSON dışa aktarma sırasında hata: {str(e)}")
+        def on_result(success):
+            if success:
+                QMessageBox.information(self, "Dışa Aktarma Başarılı",
+                                      f"Veriler başarıyla dışa aktarıldı:\n\n{filepath}")
+            else:
+                QMessageBox.warning(self, "Dışa Aktarma Hatası",
+                                  "Veriler dışa aktarılamadı!")
+
+        self.db_worker.submit(self.db_manager.export_to_json, filepath, owner=self, on_result=on_result,
+                              on_error=lambda message: QMessageBox.critical(
+                                  self, "Dışa Aktarma Hatası", f"JSON dışa aktarma sırasında hata: {message}"))
+
+    def import_from_json(self):
+        """JSON dosyasındaki verileri toplu olarak içe aktar"""
+        filepath, _ = QFileDialog.getOpenFileName(self, "JSON Dosyası Seç",
+                                                  os.path.expanduser("~"), "JSON Dosyaları (*.json *.json.gz)")
+        if not filepath:
+            return
+
+        progress = QProgressDialog("Kayıtlar içe aktarılıyor...", "İptal", 0, 100, self)
+        progress.setWindowTitle("JSON İçe Aktarma")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+
+        def on_progress(done, total):
+            progress.setMaximum(max(total, 1))
+            progress.setValue(done)
+
+        def on_finished(result):
+            canceled = progress.wasCanceled()
+            progress.close()
+            if result is not None:
+                QMessageBox.information(self, "İçe Aktarma Başarılı",
+                                      f"{result['creditor_count']} yeni borçlu ve "
+                                      f"{result['record_count']} kayıt içe aktarıldı.")
+                self.update_stats()
+            elif canceled:
+                QMessageBox.information(self, "İçe Aktarma İptal Edildi",
+                                      "İçe aktarma iptal edildi, hiçbir kayıt eklenmedi.")
+            else:
+                QMessageBox.critical(self, "İçe Aktarma Hatası",
+                                   "JSON içe aktarma başarısız oldu, hiçbir kayıt eklenmedi.")
+
+        job = self.db_worker.submit(self.db_manager.import_from_json, filepath, owner=self,
+                                    on_result=on_finished, on_progress=on_progress)
+        # İptal: içe aktarma bir sonraki partide durur ve geri alınır, sonuç yine bildirilir
+        progress.canceled.connect(job.request_stop)
+
+
+class CreditorListModel(QAbstractListModel):
+    """Borçlu id'siyle anahtarlanan, yalnızca değişen satırları güncelleyen liste modeli
+
+    Satırlar borçlu sözlükleridir (id, ad, bakiye). Arama sonucundaki kayıt
+    eşleşmeleri de aynı modelde 'label' alanlı satırlar olarak tutulur; her
+    satırın UserRole verisi açılacak borçlunun id'sidir.
+    """
+    # Bu kadar satır eklenip çıkacaksa tek tek bildirmek yerine model sıfırlanır
+    RESET_THRESHOLD = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._row_of = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if 'label' in entry:
+                return entry['label']
+            return f"{entry['name']} - ₺{entry['total_debt']:.2f}"
+        if role == Qt.ItemDataRole.UserRole:
+            return entry['id']
+        return None
+
+    def entry(self, row):
+        """Satırdaki borçlu bilgisini getir (geçersiz satırda None)"""
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+    def row_of(self, creditor_id):
+        """Borçlunun satır numarasını getir (listede yoksa None)"""
+        return self._row_of.get(creditor_id)
+
+    def _reindex(self):
+        self._row_of = {entry['id']: row for row, entry in enumerate(self._rows) if 'label' not in entry}
+
+    def reset(self, creditors, record_rows=()):
+        """Listeyi baştan kur (arama sonuçları gibi tamamen değişen içerik için)"""
+        self.beginResetModel()
+        self._rows = [dict(c) for c in creditors] + [dict(r) for r in record_rows]
+        self._reindex()
+        self.endResetModel()
+
+    def set_creditors(self, creditors):
+        """Ada göre sıralı borçlu listesini mevcut satırlarla birleştir
+
+        Silinen borçlular satır olarak çıkarılır, yenileri yerine eklenir, bakiyesi
+        ya da adı değişenler için yalnızca dataChanged yayınlanır.
+        """
+        new_ids = [c['id'] for c in creditors]
+        new_set = set(new_ids)
+        removed = [row for row, entry in enumerate(self._rows)
+                   if 'label' in entry or entry['id'] not in new_set]
+        removed_set = set(removed)
+        kept = [entry['id'] for row, entry in enumerate(self._rows) if row not in removed_set]
+        inserted = len(new_ids) - len(kept)
+        # Sıralaması değişen satırlar (yeniden adlandırma) taşımak yerine sıfırlamayla kurulur
+        kept_set = set(kept)
+        if (len(removed) + inserted > self.RESET_THRESHOLD
+                or kept != [creditor_id for creditor_id in new_ids if creditor_id in kept_set]):
+            self.reset(creditors)
+            return
+
+        for row in reversed(removed):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._rows[row]
+            self.endRemoveRows()
+
+        for row, c in enumerate(creditors):
+            if row < len(self._rows) and self._rows[row]['id'] == c['id']:
+                entry = self._rows[row]
+                if entry['name'] != c['name'] or entry['total_debt'] != c['total_debt']:
+                    self._rows[row] = dict(c)
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+            else:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._rows.insert(row, dict(c))
+                self.endInsertRows()
+        self._reindex()
+
+    def update_creditors(self, creditors):
+        """Bakiyesi değişen borçluların satırlarını güncelle
+
+        Listede bulunmayan ya da adı değişen (sırası bozulan) borçluların id'leri döndürülür.
+        """
+        missing = []
+        for c in creditors:
+            row = self._row_of.get(c['id'])
+            if row is None or self._rows[row]['name'] != c['name']:
+                missing.append(c['id'])
+                continue
+            entry = self._rows[row]
+            if entry['total_debt'] != c['total_debt']:
+                self._rows[row] = dict(c)
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+        return missing
+
+class DetailViewCache:
+    """Son açılan borçlu detay sayfalarının LRU önbelleği (borçlu id'si → sayfa)
+
+    Sayfalar yüklenmiş kayıtlarıyla birlikte yığında (QStackedWidget) saklanır;
+    yakın zamanda bakılan bir borçluya dönmek kayıtları yeniden yüklemez. Sayfa
+    sayısı ve toplam yüklü kayıt sayısı sınırı aşılınca en uzun süredir
+    bakılmayan sayfalar kaldırılır. Görünen sayfa hiçbir zaman kaldırılmaz.
+    """
+    def __init__(self, stacked_widget, max_views=10, max_records=20000):
+        self._stack = stacked_widget
+        self.max_views = max_views
+        self.max_records = max_records
+        self._views = OrderedDict()
+
+    def __len__(self):
+        return len(self._views)
+
+    def get(self, creditor_id):
+        """Önbellekteki sayfayı getir ve en son kullanılan olarak işaretle"""
+        view = self._views.get(creditor_id)
+        if view is not None:
+            self._views.move_to_end(creditor_id)
+        return view
+
+    def put(self, creditor_id, view):
+        """Yeni sayfayı yığına ve önbelleğe ekle"""
+        self._stack.addWidget(view)
+        self._views[creditor_id] = view
+        self._views.move_to_end(creditor_id)
+
+    def loaded_records(self):
+        """Önbellekteki sayfalarda yüklü toplam kayıt sayısı"""
+        return sum(view.model.rowCount() for view in self._views.values())
+
+    def trim(self):
+        """Sınırlar aşıldıysa en uzun süredir bakılmayan sayfaları kaldır"""
+        current = self._stack.currentWidget()
+        while len(self._views) > self.max_views or self.loaded_records() > self.max_records:
+            oldest = next((creditor_id for creditor_id, view in self._views.items() if view is not current), None)
+            if oldest is None:
+                break
+            self._remove(oldest)
+
+    def invalidate(self, creditor_ids=None):
+        """Verilen (None ise tüm) borçluların görünmeyen sayfalarını kaldır; görünen sayfa kendini yeniler"""
+        current = self._stack.currentWidget()
+        for creditor_id in list(self._views if creditor_ids is None else creditor_ids):
+            view = self._views.get(creditor_id)
+            if view is not None and view is not current:
+                self._remove(creditor_id)
+
+    def _remove(self, creditor_id):
+        view = self._views.pop(creditor_id)
+        self._stack.removeWidget(view)
+        view.deleteLater()
 
 class DebtLedgerApp(QMainWindow):
+    # Ad aramasında alt dize eşleşmelerinin ardından gösterilen benzer ad sayısı
+    FUZZY_RESULTS = 20
+
     def __init__(self):
         super().__init__()
-        self.db_manager = DatabaseManager()
+        # Veritabanı arka planda açılır; hazır olana kadar None
+        self.db_manager = None
+        self.change_watcher = None
         FontDownloader().setup_fonts()
 
         self.setWindowTitle("Veresiye Defteri Uygulaması")
         self.setGeometry(100, 100, 1400, 1000)
 
+        # Veritabanı işleri arayüzü dondurmamak için arka plan iş parçacığında çalışır
+        self.db_worker = DatabaseWorker(self)
+        self.db_worker.start()
+        self._list_job = None
+        self._search_job = None
+
+        # Ad araması bellekteki dizinde yapılır, SQLite'a gitmez
+        self.search_index = CreditorSearchIndex()
+
         self.setup_ui()
+
+        # Veritabanını açmak ve şema göçlerini uygulamak büyük dosyalarda uzun
+        # sürebilir; pencere bu sırada bekleme durumunda gösterilir
+        self.db_worker.submit(DatabaseManager, on_result=self.on_database_opened,
+                              on_error=self.on_database_failed)
+
+    def on_database_opened(self, db_manager):
+        """Veritabanı hazır: arayüzü etkinleştir, listeyi yükle ve değişiklik izlemeyi başlat"""
+        self.db_manager = db_manager
+        self.loading_label.hide()
+        self.loading_bar.hide()
+        self.left_panel.setEnabled(True)
         self.update_creditor_list()
 
+        # Diğer bilgisayarların yazmaları yalnızca değişen satırları yeniler
+        self.change_watcher = ChangeWatcher(self.db_manager, self.db_worker, parent=self)
+        self.change_watcher.creditors_changed.connect(self.on_creditors_changed)
+        self.change_watcher.reload_required.connect(self.on_database_reloaded)
+        self.change_watcher.start()
+
+    def on_database_failed(self, message):
+        """Veritabanı açılamadı: kullanıcıyı bilgilendir"""
+        self.loading_bar.hide()
+        self.loading_label.setText("Veritabanı açılamadı!")
+        QMessageBox.critical(self, "Veritabanı Hatası", f"Veritabanı açılırken hata: {message}")
+
+    def closeEvent(self, event):
+        """Pencere kapanırken arka plan işlerini bitir ve veritabanı bağlantılarını kapat"""
+        if self.change_watcher is not None:
+            self.change_watcher.stop()
+        self.db_worker.stop()
+        if self.db_manager is not None:
+            self.db_manager.close()
+        super().closeEvent(event)
+
     # ---------- YARDIMCI METOTLAR ----------
     # DebtLedgerApp i��inde  ───────────────────────────────────────────────���
     def setup_ui(self):
@@ -1079,8 +2105,10 @@ class DebtLedgerApp(QMainWindow):
         central = QWidget();
         layout = QHBoxLayout(central)
 
-        # --- Sol panel ---
+        # --- Sol panel (veritabanı açılana kadar devre dışı) ---
         left_panel = QWidget()
+        left_panel.setEnabled(False)
+        self.left_panel = left_panel
         left_layout = QVBoxLayout(left_panel)
 
         title = QLabel("Borçlular")
@@ -1116,14 +2144,29 @@ class DebtLedgerApp(QMainWindow):
                 border-color: #4CAF50;
             }
         """)
-        self.search_input.textChanged.connect(self.filter_creditors)
+        # Yazarken her tuşta değil, kısa bir duraksamadan sonra filtrele
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.filter_creditors)
+        self.search_input.textChanged.connect(self.search_timer.start)
         left_layout.addWidget(self.search_input)
 
-        # Borçlu listesi
-        self.creditor_list = QListWidget()
+        # Kayıt açıklamalarında / kodlarda da ara (tam metin arama)
+        self.search_records_check = QCheckBox("Kayıtlarda da ara")
+        self.search_records_check.setFont(QFont("Arial", 11))
+        self.search_records_check.toggled.connect(self.filter_creditors)
+        left_layout.addWidget(self.search_records_check)
+
+        # Borçlu listesi (satırlar borçlu id'siyle tutulur, yalnızca değişenler çizilir)
+        self.creditor_model = CreditorListModel(self)
+        self.creditor_list = QListView()
+        self.creditor_list.setModel(self.creditor_model)
+        self.creditor_list.setUniformItemSizes(True)
         self.creditor_list.setFont(QFont("Arial", 12))
-        self.creditor_list.setStyleSheet("QListWidget::item { padding: 6px }")
-        self.creditor_list.itemDoubleClicked.connect(self.show_creditor_details)
+        self.creditor_list.setStyleSheet("QListView::item { padding: 6px }")
+        self.creditor_list.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.creditor_list.doubleClicked.connect(self.show_creditor_details)
         left_layout.addWidget(self.creditor_list, 1)  # stretch
 
         # Seçili borçluyu sil
@@ -1136,6 +2179,13 @@ class DebtLedgerApp(QMainWindow):
         # Spacer
         left_layout.addStretch()
 
+        # Tarihe göre bakiye ve hareket raporları
+        report_btn = QPushButton("Raporlar")
+        report_btn.setFont(btn_font);
+        report_btn.setMinimumHeight(40)
+        report_btn.clicked.connect(self.show_reports)
+        left_layout.addWidget(report_btn)
+
         # Veritabanı ayarları (yedek, temizlik)
         db_btn = QPushButton("Veritabanı Ayarları")
         db_btn.setFont(btn_font);
@@ -1157,10 +2207,22 @@ class DebtLedgerApp(QMainWindow):
         info.setFont(QFont("Arial", 14));
         info.setAlignment(Qt.AlignmentFlag.AlignCenter)
         v.addWidget(info);
+        # Veritabanı açılırken (şema göçleri dahil) gösterilen bekleme durumu
+        self.loading_label = QLabel("Veritabanı açılıyor...")
+        self.loading_label.setFont(QFont("Arial", 12))
+        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        v.addWidget(self.loading_label)
+        self.loading_bar = QProgressBar()
+        self.loading_bar.setRange(0, 0)  # süresi belirsiz
+        self.loading_bar.setMaximumWidth(300)
+        v.addWidget(self.loading_bar, 0, Qt.AlignmentFlag.AlignHCenter)
         v.addStretch()
         self.stacked_widget.addWidget(main_page)  # index 0
         layout.addWidget(self.stacked_widget, 1)
 
+        # Açılan borçlu sayfaları yüklü kayıtlarıyla saklanır, geri dönüş anında olur
+        self.detail_cache = DetailViewCache(self.stacked_widget)
+
         self.setCentralWidget(central)
 
     # ───────────────────────────────────────────────────────────────��──────
@@ -1169,76 +2231,182 @@ class DebtLedgerApp(QMainWindow):
     def add_creditor(self):
         name, ok = QInputDialog.getText(self, "Borçlu Ekle", "Borçlu adını girin:")
         if ok and name.strip():
-            if self.db_manager.add_creditor(name.strip()):
-                self.update_creditor_list()
-            else:
-                QMessageBox.warning(self, "Hata", "Bu isimde borçlu zaten var!")
+            name = name.strip()
+
+            def add(warn_similar):
+                """Borçluyu ekle (işçi thread'inde); benzer adlar varsa (None, eşleşmeler) döner"""
+                try:
+                    return self.db_manager.add_creditor(name, warn_similar=warn_similar), None
+                except SimilarCreditorWarning as warning:
+                    return None, warning.matches
+
+            def on_added(result):
+                creditor_id, similar = result
+                if similar:
+                    # Yazımı farklı aynı kişi (ör. "Mehmet Yilmaz") için onay alınıp yeniden denenir
+                    names = "\n".join(f"• {c['name']} (%{c['similarity'] * 100:.0f} benzer)" for c in similar)
+                    if QMessageBox.question(
+                            self, "Benzer Borçlu",
+                            f"Bu ada benzeyen borçlular var:\n\n{names}\n\n'{name}' yine de eklensin mi?",
+                            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No) == QMessageBox.StandardButton.Yes:
+                        self.db_worker.submit(add, False, owner=self, on_result=on_added)
+                elif creditor_id:
+                    self.update_creditor_list()
+                else:
+                    QMessageBox.warning(self, "Hata", "Bu isimde borçlu zaten var!")
+
+            self.db_worker.submit(add, True, owner=self, on_result=on_added)
 
     def delete_creditor(self):
-        item = self.creditor_list.currentItem()
-        if not item: return
-        name = item.text().split(" - ")[0]
+        entry = self.creditor_model.entry(self.creditor_list.currentIndex().row())
+        if not entry: return
+        name = entry['name']
         if QMessageBox.question(
                 self, "Borçlu Sil",
                 f"'{name}' ve tüm kayıtlarını silmek istediğinizden emin misiniz?",
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No) == QMessageBox.StandardButton.Yes:
 
-            data = self.db_manager.get_creditor_by_name(name)
-            if data and self.db_manager.delete_creditor(data['id']):
-                self.update_creditor_list()
-                self.show_main_page()
+            def on_deleted(success):
+                if success:
+                    self.update_creditor_list()
+                    self.show_main_page()
+                    self.detail_cache.invalidate({entry['id']})
+
+            self.db_worker.submit(self.db_manager.delete_creditor, entry['id'], owner=self, on_result=on_deleted)
+
+    def show_reports(self):
+        ReportDialog(self.db_manager, self.db_worker, self).exec()
 
     def show_database_settings(self):
-        dlg = DatabaseSettingsDialog(self.db_manager, self)
+        dlg = DatabaseSettingsDialog(self.db_manager, self.db_worker, self)
         dlg.exec()
-        self.update_creditor_list()
+        # Bu uygulamanın kendi yazmaları izleyiciye gelmez: içe aktarma, arşivleme,
+        # sıkıştırma ya da geri yükleme sonrası liste ve açık sayfalar burada yenilenir
+        self.on_database_reloaded()
 
     # ─────────────────────────────────────────────────────────────────────
 
+    def _submit_list_job(self, func, *args, on_result=None):
+        """Liste sorgusunu arka planda çalıştır, önceki bekleyen sorguyu iptal et"""
+        if self._list_job is not None:
+            self._list_job.cancel()
+        self._list_job = self.db_worker.submit(func, *args, owner=self, on_result=on_result)
+
+    def _fill_creditor_list(self, creditors):
+        # Satırlar borçlu id'siyle eşleştirilir; yalnızca eklenen, silinen ve değişenler bildirilir
+        self.creditor_model.set_creditors(creditors)
+
+    def on_creditors_changed(self, creditor_ids):
+        """Değişen borçluların yalnızca liste satırlarını ve açık detay sayfasını yenile"""
+        def apply_changes(creditors):
+            found = {c['id']: c for c in creditors}
+
+            detail = self.stacked_widget.currentWidget()
+            if isinstance(detail, CreditorDetailWidget) and detail.creditor.id in creditor_ids:
+                if detail.creditor.id in found:
+                    detail.refresh_changed()
+                else:
+                    self.show_main_page()
+
+            # Değişen borçluların önbellekteki (görünmeyen) sayfaları bir sonraki açılışta yeniden kurulur
+            self.detail_cache.invalidate(creditor_ids)
+
+            # Eklenen, silinen ya da adı değişen borçlu sıralamayı bozar: liste birleştirilerek yenilenir
+            if len(found) != len(creditor_ids) or self.search_index.update_creditors(found.values()):
+                self.update_creditor_list()
+                return
+
+            # Kayıt araması sonuçları veritabanından gelir, arama yeniden çalıştırılır
+            if self.search_records_check.isChecked() and self.search_input.text().strip():
+                self.filter_creditors()
+                return
+
+            # Filtre dışında kalan borçluların satırı yoktur, yalnızca görünenler güncellenir
+            self.creditor_model.update_creditors(found.values())
+
+        self.db_worker.submit(self.db_manager.get_creditors_by_ids, creditor_ids,
+                              owner=self, on_result=apply_changes)
+
+    def on_database_reloaded(self):
+        """Veritabanı toptan değiştiğinde (geri yükleme) listeyi ve açık detayı yenile"""
+        detail = self.stacked_widget.currentWidget()
+        if isinstance(detail, CreditorDetailWidget):
+            detail.refresh_changed()
+        self.detail_cache.invalidate()
+        self.update_creditor_list()
+
     def update_creditor_list(self):
-        self.creditor_list.clear()
-        for c in self.db_manager.get_all_creditors():
-            total = c["total_debt"]
-            self.creditor_list.addItem(f"{c['name']} - ₺{total:.2f}")
-
-    def show_creditor_details(self, item):
-        # Borçlu adı, listede "Ad - ₺tutar" formatında → adı al
-        creditor_name = item.text().split(" - ")[0]
-        creditor_data = self.db_manager.get_creditor_by_name(creditor_name)
-        if not creditor_data:
-            QMessageBox.warning(self, "Hata", "Borçlu bulunamadı!")
-            return
+        """Borçluları veritabanından yeniden oku, arama dizinini güncelle ve filtreyi uygula"""
+        # İlk dizin arka planda sıfırdan kurulur; sonraki yenilemeler yalnızca farkları dizinler
+        new_index = CreditorSearchIndex() if not len(self.search_index) else None
+
+        def load_creditors():
+            creditors = self.db_manager.get_all_creditors()
+            if new_index is not None:
+                new_index.set_creditors(creditors)
+            return creditors
+
+        def on_loaded(creditors):
+            if new_index is not None:
+                self.search_index = new_index
+            else:
+                self.search_index.set_creditors(creditors)
+            self.filter_creditors()
 
-        # Daha önce eklenmiş detay sayfasını temizle
-        while self.stacked_widget.count() > 1:
-            old = self.stacked_widget.widget(1)
-            self.stacked_widget.removeWidget(old)
-            old.deleteLater()
+        self._submit_list_job(load_creditors, on_result=on_loaded)
 
-        # Yeni detay sayfasını ekle
-        creditor = Creditor(creditor_data["id"], creditor_data["name"], self.db_manager)
-        detail_widget = CreditorDetailWidget(creditor, self)
-        self.stacked_widget.addWidget(detail_widget)
+    def show_creditor_details(self, index):
+        # Satır borçlunun id'sini ve adını taşır, ayrıca ad sorgusu gerekmez
+        entry = self.creditor_model.entry(index.row())
+        if not entry:
+            return
+
+        # Yakın zamanda açılmış sayfa yüklü kayıtlarıyla önbellekten gelir
+        detail_widget = self.detail_cache.get(entry["id"])
+        if detail_widget is None:
+            creditor = Creditor(entry["id"], entry["name"], self.db_manager)
+            detail_widget = CreditorDetailWidget(creditor, self)
+            self.detail_cache.put(entry["id"], detail_widget)
         self.stacked_widget.setCurrentWidget(detail_widget)
+        self.detail_cache.trim()
 
     def show_main_page(self):
         self.stacked_widget.setCurrentIndex(0)
 
     def filter_creditors(self):
         """Borçluları arama çubuğuna göre filtrele"""
-        search_text = self.search_input.text().strip().lower()
+        self.search_timer.stop()
+        search_text = self.search_input.text().strip()
 
-        # Tüm borçluları göster
-        if not search_text:
-            self.update_creditor_list()
+        if search_text and self.search_records_check.isChecked():
+            # Türkçe harf katlaması veritabanı tarafında yapılır, ham metni gönder
+            self.search_records(search_text)
             return
 
-        filtered_creditors = []
-        for c in self.db_manager.get_all_creditors():
-            if search_text in c["name"].lower():
-                filtered_creditors.append(c)
-
-        self.creditor_list.clear()
-        for c in filtered_creditors:
-            total = c["total_debt"]
-            self.creditor_list.addItem(f"{c['name']} - ₺{total:.2f}")
+        # Ad araması bellekteki dizinde Türkçe harf katlamasıyla yapılır (boş metin: tüm borçlular)
+        if self._search_job is not None:
+            self._search_job.cancel()
+            self._search_job = None
+        creditors = self.search_index.search(search_text)
+        if len(search_text) >= 3:
+            # Yazımı farklı adlar (ör. "Yilmaz", "M. Yılmaz") benzerliğe göre sona eklenir
+            found = {c['id'] for c in creditors}
+            creditors += [c for c, _ in self.search_index.fuzzy_search(search_text, self.FUZZY_RESULTS)
+                          if c['id'] not in found]
+        self._fill_creditor_list(creditors)
+
+    def search_records(self, search_text):
+        """Borçlu adlarında ve kayıt metinlerinde tam metin arama yap"""
+        def on_results(results):
+            # Eşleşen kayıtlar: çift tıklayınca borçlunun detayı açılır
+            record_rows = []
+            for r in results['records']:
+                amount = r['debt_amount'] if r['debt_amount'] else r['payment_amount']
+                record_rows.append({'id': r['creditor_id'], 'name': r['creditor_name'],
+                                    'label': f"{r['creditor_name']} - {r['date']} · {r['description']} (₺{amount:.2f})"})
+            self.creditor_model.reset(results['creditors'], record_rows)
+
+        if self._search_job is not None:
+            self._search_job.cancel()
+        self._search_job = self.db_worker.submit(self.db_manager.search, search_text,
+                                                 owner=self, on_result=on_results)